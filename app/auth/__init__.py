@@ -1,10 +1,22 @@
 from app.auth.jwt import create_access_token, verify_password, get_password_hash
-from app.auth.dependencies import get_current_user, require_admin
+from app.auth.password_hasher import password_hasher
+from app.auth.principal_cache import Principal, principal_cache
+from app.auth.dependencies import (
+    get_current_user,
+    get_current_user_async,
+    require_admin,
+    require_admin_async,
+)
 
 __all__ = [
     "create_access_token",
     "verify_password",
     "get_password_hash",
+    "password_hasher",
+    "Principal",
+    "principal_cache",
     "get_current_user",
     "require_admin",
+    "get_current_user_async",
+    "require_admin_async",
 ]
@@ -1,52 +1,133 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.auth.jwt import decode_access_token
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_async_db, SessionLocal
+from app.auth.jwt import decode_access_token, STREAM_TICKET_SCOPE
 from app.models.user import User, UserRole
+from app.auth.principal_cache import Principal, principal_cache
+from typing import Optional, Tuple
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """
-    Dependency to get current authenticated user from JWT token
-    
-    Raises:
-        HTTPException: If token is invalid or user not found
-    """
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _claims_from_token(token: str, scope: Optional[str] = None) -> Tuple[int, Optional[int]]:
+    """
+    Decode JWT and extract (user id, expiry timestamp)
     
+    Only tokens of the given scope are accepted: access tokens have none,
+    so a stream ticket can never be used as a bearer token or vice versa.
+    
+    Raises:
+        HTTPException: If token is invalid
+    """
     payload = decode_access_token(token)
     
-    if payload is None:
-        raise credentials_exception
+    if payload is None or payload.get("scope") != scope:
+        raise _credentials_exception()
     
     user_id_str: str = payload.get("sub")
     
     if user_id_str is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
     try:
-        user_id = int(user_id_str)
+        return int(user_id_str), payload.get("exp")
     except (ValueError, TypeError):
-        raise credentials_exception
+        raise _credentials_exception()
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """
+    Dependency to get current authenticated user from JWT token
+    
+    Served from the principal cache when possible; the users lookup only
+    runs on a cache miss (the session connects lazily, so a hit costs no
+    database round trip).
+    
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    user_id, token_exp = _claims_from_token(token)
+    
+    principal = principal_cache.get(user_id, token_exp)
+    if principal is not None:
+        return principal
     
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    
+    return principal_cache.put(Principal.from_user(user), token_exp)
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """
+    Async variant of get_current_user for ASYNC_MODE routes
+    
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    user_id, token_exp = _claims_from_token(token)
+    
+    principal = principal_cache.get(user_id, token_exp)
+    if principal is not None:
+        return principal
+    
+    user = await db.get(User, user_id)
+    if user is None:
+        raise _credentials_exception()
+    
+    return principal_cache.put(Principal.from_user(user), token_exp)
+
+
+def get_stream_user(
+    ticket: str = Query(..., description="Stream ticket from POST /api/events/ticket")
+) -> Principal:
+    """
+    Authenticate a long-lived stream from a ?ticket= query parameter
+    
+    EventSource cannot send headers, so instead of the access token the
+    URL carries a short-lived ticket that is good for nothing else.
     
-    return user
+    Unlike get_current_user it holds no request-scoped session: a
+    dependency's session would stay open (and, after a cache miss, keep
+    its pooled connection) for as long as the stream does.
+    
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    user_id, token_exp = _claims_from_token(ticket, STREAM_TICKET_SCOPE)
+    
+    principal = principal_cache.get(user_id, token_exp)
+    if principal is not None:
+        return principal
+    
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        if user is None:
+            raise _credentials_exception()
+        return principal_cache.put(Principal.from_user(user), token_exp)
+    finally:
+        db.close()
 
 
-def require_admin(current_user: User = Depends(get_current_user)) -> User:
+def require_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     """
     Dependency to ensure current user has ADMIN role
     
@@ -59,3 +140,15 @@ def require_admin(current_user: User = Depends(get_current_user)) -> User:
             detail="Admin access required"
         )
     return current_user
+
+
+async def require_admin_async(
+    current_user: Principal = Depends(get_current_user_async)
+) -> Principal:
+    """Async variant of require_admin for ASYNC_MODE routes"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
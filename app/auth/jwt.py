@@ -6,6 +6,9 @@ from app.database import get_settings
 
 settings = get_settings()
 
+# "scope" claim of event stream tickets; access tokens carry none
+STREAM_TICKET_SCOPE = "event-stream"
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plaintext password against hashed password"""
@@ -48,6 +51,21 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def create_stream_ticket(user_id: int) -> str:
+    """
+    Create a short-lived, single-purpose token for opening an event stream
+    
+    EventSource cannot send headers, so the stream is authenticated from
+    the query string, where URLs end up in access logs, proxy logs and
+    browser history. A ticket only opens /api/events/stream (never a
+    bearer token) and expires after EVENT_TICKET_TTL_SECONDS.
+    """
+    return create_access_token(
+        data={"sub": str(user_id), "scope": STREAM_TICKET_SCOPE},
+        expires_delta=timedelta(seconds=settings.event_ticket_ttl_seconds)
+    )
+
+
 def decode_access_token(token: str) -> Optional[dict]:
     """
     Decode and verify JWT token
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from app.auth.jwt import verify_password, get_password_hash
+from app.database import get_settings
+
+settings = get_settings()
+
+
+class PasswordHasher:
+    """
+    Bounded worker pool for bcrypt hashing and verification
+    
+    bcrypt costs ~200 ms of CPU per call but releases the GIL, so a
+    dedicated thread pool keeps login/register bursts off the request
+    threadpool and the event loop.
+    
+    Key Principles:
+    1. Fixed number of workers and a hard queue limit
+    2. When saturated, fail fast with 503 instead of queueing without bound
+    3. Queue depth and hash latency are tracked for monitoring
+    """
+
+    def __init__(self, max_workers: int, queue_limit: int):
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="password-hasher"
+        )
+        # One slot per running or queued job
+        self._slots = threading.BoundedSemaphore(max_workers + queue_limit)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._hash_seconds_total = 0.0
+        self._hash_seconds_max = 0.0
+        self._wait_seconds_total = 0.0
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on the worker pool"""
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        """Hash a password on the worker pool"""
+        return await self._submit(get_password_hash, password)
+
+    async def _submit(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        with self._lock:
+            self._queued += 1
+        try:
+            future = self._executor.submit(self._run, time.perf_counter(), func, *args)
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+            self._slots.release()
+            raise
+        # Release the slot when the work finishes, even if the caller went away
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def _run(self, submitted_at: float, func, *args):
+        started = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_seconds_total += started - submitted_at
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._hash_seconds_total += elapsed
+                self._hash_seconds_max = max(self._hash_seconds_max, elapsed)
+
+    def stats(self) -> dict:
+        """Snapshot of pool utilisation and latency"""
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self.max_workers,
+                "queue_limit": self.queue_limit,
+                "queue_depth": self._queued,
+                "in_flight": self._running,
+                "completed": completed,
+                "rejected": self._rejected,
+                "avg_hash_ms": round(self._hash_seconds_total / completed * 1000, 2) if completed else 0.0,
+                "max_hash_ms": round(self._hash_seconds_max * 1000, 2),
+                "avg_queue_wait_ms": round(self._wait_seconds_total / completed * 1000, 2) if completed else 0.0,
+            }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.password_hash_workers,
+    queue_limit=settings.password_hash_queue_limit,
+)
@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models.user import User, UserRole
+from app.database import get_settings
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Immutable snapshot of an authenticated user
+    
+    Returned by get_current_user instead of an ORM instance so it can be
+    shared safely across requests and threads.
+    """
+    id: int
+    name: str
+    email: str
+    role: UserRole
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, name=user.name, email=user.email, role=user.role)
+
+
+class PrincipalCache:
+    """
+    TTL + LRU cache of authenticated principals
+    
+    Keyed by (user_id, token exp) so each token gets its own entry, which
+    never outlives the token itself. Removes the users lookup from the
+    hot path of every authenticated request.
+    
+    Entries for a user are invalidated whenever that user row is updated
+    or deleted (role changes included).
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple, tuple[Principal, float]]" = OrderedDict()
+        self._keys_by_user: dict[int, set] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def get(self, user_id: int, token_exp: Optional[int]) -> Optional[Principal]:
+        key = (user_id, token_exp)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    self._remove(key)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, principal: Principal, token_exp: Optional[int]) -> Principal:
+        key = (principal.id, token_exp)
+        expires_at = time.monotonic() + self.ttl_seconds
+        if token_exp is not None:
+            # Never cache past the token's own expiry
+            expires_at = min(expires_at, time.monotonic() + (token_exp - time.time()))
+        with self._lock:
+            self._entries[key] = (principal, expires_at)
+            self._entries.move_to_end(key)
+            self._keys_by_user.setdefault(principal.id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+        return principal
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for key in self._keys_by_user.pop(user_id, ()):
+                self._entries.pop(key, None)
+            self._invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _remove(self, key: tuple) -> None:
+        self._entries.pop(key, None)
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self._invalidations,
+            }
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.principal_cache_max_entries,
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+)
+
+
+# Invalidation: drop cached principals as soon as a user row changes, and
+# again after commit so a concurrent miss cannot re-cache the old row.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_change(mapper, connection, target):
+    principal_cache.invalidate_user(target.id)
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        principal_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("changed_user_ids", None)
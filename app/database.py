@@ -1,8 +1,17 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
+from fastapi import Request
+from jose import jwt, JWTError
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from contextvars import ContextVar
+from collections import Counter
+from typing import List, Optional
+import itertools
 import os
+import time
 
 
 class Base(DeclarativeBase):
@@ -14,6 +23,69 @@ class Settings(BaseSettings):
     secret_key: str = "change-me-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    # Opt-in: serve hot routes from async handlers on an AsyncEngine
+    async_mode: bool = False
+    # bcrypt worker pool: concurrent hashes and how many may wait before 503
+    password_hash_workers: int = 4
+    password_hash_queue_limit: int = 32
+    # Authenticated-principal cache used by get_current_user
+    principal_cache_ttl_seconds: int = 60
+    principal_cache_max_entries: int = 10000
+    # Memoised amortisation schedules (distinct principal/rate/tenure combos)
+    schedule_cache_size: int = 4096
+    # Loans per transaction in bulk admin approval
+    bulk_approval_chunk_size: int = 500
+    # Completed repayment responses kept for client retries
+    idempotency_cache_size: int = 10000
+    idempotency_cache_ttl_seconds: int = 3600
+    # Bloom filter of known idempotency keys (0 disables it)
+    idempotency_bloom_capacity: int = 0
+    # Per-request SQL instrumentation: flag repeated statements (N+1)
+    sql_debug: bool = False
+    sql_n_plus_one_threshold: int = 3
+    # Readiness probe: SELECT 1 budget, result cache, and saturation thresholds
+    readiness_timeout_seconds: float = 1.0
+    readiness_cache_seconds: float = 2.0
+    readiness_max_checkout_wait_ms: float = 250.0
+    readiness_max_pool_utilisation: float = 0.9
+    # Connection pool (not used for in-memory SQLite)
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800  # seconds; -1 disables
+    # Server-side statement timeout in ms (PostgreSQL; 0 disables)
+    statement_timeout_ms: int = 0
+    # SQLite PRAGMAs applied to every new connection (file databases only)
+    sqlite_pragmas: bool = True
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 268435456  # bytes
+    sqlite_cache_size_kib: int = 65536
+    # Comma-separated read replica URLs for get_read_db (empty = primary only)
+    read_replica_urls: str = ""
+    # Seconds a replica that failed its connection check is skipped
+    replica_retry_seconds: float = 30.0
+    # Read-your-writes: seconds a user's reads stay on the primary after a write
+    read_your_writes_seconds: float = 5.0
+    # Balance checkpoints: ledger entries younger than this are left for the
+    # next run (in-flight transactions may still commit older timestamps)
+    balance_checkpoint_settle_seconds: int = 60
+    # Write a user's next checkpoint only after this many new ledger entries
+    balance_checkpoint_min_transactions: int = 1
+    # HMAC key signing ledger hash-chain seals (empty: use secret_key)
+    ledger_signing_key: str = ""
+    # Push events (/api/events/stream): broker factory as "module:callable"
+    # (empty: in-process), limits, and seconds between keepalive comments
+    event_broker: str = ""
+    event_max_connections: int = 10000
+    event_max_connections_per_user: int = 5
+    event_buffer_size: int = 64  # events queued per connection before a resync
+    event_heartbeat_seconds: float = 15.0
+    event_ticket_ttl_seconds: int = 60  # lifetime of a stream ticket (only needed to connect)
+    # Response compression: bodies smaller than this go out uncompressed
+    gzip_minimum_size: int = 1024  # bytes
+    gzip_compresslevel: int = 6
 
     class Config:
         env_file = ".env"
@@ -26,19 +98,313 @@ def get_settings():
 
 settings = get_settings()
 
-# Configure engine with connection args for SQLite compatibility
-connect_args = {}
-if settings.database_url.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+def is_memory_sqlite(database_url: str) -> bool:
+    """In-memory SQLite uses a single shared connection, not a QueuePool"""
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+    )
 
-engine = create_engine(
-    settings.database_url,
-    connect_args=connect_args,
-    pool_pre_ping=True  # Verify connections before using
-)
+
+def engine_options(database_url: str, async_driver: bool = False) -> dict:
+    """
+    create_engine keyword arguments for a database URL
+    
+    Pool sizing applies to every pooled backend; in-memory SQLite keeps
+    SQLAlchemy's single-connection pool, which takes no size or timeout.
+    """
+    backend = make_url(database_url).get_backend_name()
+    connect_args = {}
+    if backend == "sqlite" and not async_driver:
+        connect_args["check_same_thread"] = False
+    elif backend == "postgresql" and settings.statement_timeout_ms > 0:
+        if async_driver:
+            connect_args["server_settings"] = {"statement_timeout": str(settings.statement_timeout_ms)}
+        else:
+            connect_args["options"] = f"-c statement_timeout={settings.statement_timeout_ms}"
+
+    options = {
+        "connect_args": connect_args,
+        "pool_pre_ping": True,  # Verify connections before using
+    }
+    if not is_memory_sqlite(database_url):
+        if backend == "sqlite" and async_driver:
+            # aiosqlite defaults to NullPool (a new connection, and a fresh
+            # round of PRAGMAs, per checkout); pool it like the sync engine
+            from sqlalchemy.pool import AsyncAdaptedQueuePool
+            options["poolclass"] = AsyncAdaptedQueuePool
+        options.update(
+            pool_size=settings.pool_size,
+            max_overflow=settings.max_overflow,
+            pool_timeout=settings.pool_timeout,
+            pool_recycle=settings.pool_recycle,
+        )
+    return options
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Production SQLite settings, applied once per pooled connection:
+    WAL lets readers run alongside the single writer, synchronous=NORMAL
+    drops the fsync per commit (safe under WAL), busy_timeout waits for
+    the write lock instead of failing, and mmap/cache sizes keep hot
+    pages in memory.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        # Negative cache_size is in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kib)}")
+    finally:
+        cursor.close()
+
+
+def _configure_sqlite(sync_engine: Engine, database_url: str) -> None:
+    if (
+        settings.sqlite_pragmas
+        and make_url(database_url).get_backend_name() == "sqlite"
+        and not is_memory_sqlite(database_url)
+    ):
+        event.listen(sync_engine, "connect", _apply_sqlite_pragmas)
+
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+_configure_sqlite(engine, settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+# Optional async engine (aiosqlite locally, asyncpg for PostgreSQL)
+async_engine = None
+AsyncSessionLocal = None
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Map a sync database URL onto its async driver"""
+    if database_url.startswith("sqlite:"):
+        return database_url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    for prefix in ("postgresql+psycopg2:", "postgresql:", "postgres:"):
+        if database_url.startswith(prefix):
+            return database_url.replace(prefix, "postgresql+asyncpg:", 1)
+    return database_url
+
+
+if settings.async_mode:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine(
+        get_async_database_url(settings.database_url),
+        **engine_options(settings.database_url, async_driver=True)
+    )
+    _configure_sqlite(async_engine.sync_engine, settings.database_url)
+    # expire_on_commit=False: attributes stay readable after commit without
+    # an implicit (and, under asyncio, illegal) lazy refresh
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+
+class QueryStats:
+    """
+    SQL activity of a single request
+    
+    Filled in by engine events while a request is active (see
+    track_queries); rows counts rows affected by DML plus ORM instances
+    loaded by SELECTs.
+    """
+
+    __slots__ = ("statements", "db_seconds", "rows", "statement_counts")
+
+    def __init__(self, track_statements: bool = False):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+        self.statement_counts = Counter() if track_statements else None
+
+    def repeated_statements(self, threshold: int) -> dict:
+        """Identical statements issued at least `threshold` times (N+1 suspects)"""
+        if self.statement_counts is None:
+            return {}
+        return {sql: n for sql, n in self.statement_counts.items() if n >= threshold}
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def track_queries() -> tuple:
+    """Start collecting QueryStats for the current context (request)"""
+    stats = QueryStats(track_statements=settings.sql_debug)
+    return stats, _query_stats.set(stats)
+
+
+def stop_tracking(token) -> None:
+    _query_stats.reset(token)
+
+
+# Listening on the Engine class covers every engine, including the sync
+# engine behind the async one
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _query_stats.get() is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _query_stats.get()
+    if stats is None:
+        return
+    stats.statements += 1
+    stats.db_seconds += time.perf_counter() - getattr(context, "_query_started", time.perf_counter())
+    if (context.isinsert or context.isupdate or context.isdelete) and cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+    if stats.statement_counts is not None:
+        stats.statement_counts[statement] += 1
+
+
+@event.listens_for(Base, "load", propagate=True)
+def _count_loaded_row(target, context):
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.rows += 1
+
+
+class _Replica:
+    __slots__ = ("url", "session_factory", "down_until", "served", "failures")
+
+    def __init__(self, url: str):
+        replica_engine = create_engine(url, **engine_options(url))
+        _configure_sqlite(replica_engine, url)
+        self.url = url
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+        self.down_until = 0.0
+        self.served = 0
+        self.failures = 0
+
+
+class ReadReplicaRouter:
+    """
+    Read-only session routing across replicas
+    
+    Key Principles:
+    1. Round-robin over the replicas that are currently healthy
+    2. A replica failing its connection check (pool pre-ping) is skipped
+       for REPLICA_RETRY_SECONDS and the next one is tried
+    3. Falls back to the primary when no replica is usable
+    4. Read-your-writes: after a write, that user's reads are pinned to
+       the primary for READ_YOUR_WRITES_SECONDS so replica lag never
+       hides their own payment. Pins are per process.
+    """
+
+    # Expired pins are swept once this many users are pinned
+    PIN_SWEEP_THRESHOLD = 10000
+
+    def __init__(self, urls: List[str], retry_seconds: float, sticky_seconds: float):
+        self.replicas = [_Replica(url) for url in urls]
+        self.retry_seconds = retry_seconds
+        self.sticky_seconds = sticky_seconds
+        self._next = itertools.count()
+        self._pinned = {}
+        self._primary_reads = 0
+
+    def pin_to_primary(self, *user_ids: int) -> None:
+        """Route these users' reads to the primary for the read-your-writes window"""
+        if not self.replicas:
+            return
+        deadline = time.monotonic() + self.sticky_seconds
+        for user_id in user_ids:
+            self._pinned[user_id] = deadline
+        if len(self._pinned) > self.PIN_SWEEP_THRESHOLD:
+            now = time.monotonic()
+            self._pinned = {uid: until for uid, until in list(self._pinned.items()) if until > now}
+
+    def has_pins(self) -> bool:
+        """Whether any user is (or recently was) pinned to the primary"""
+        return bool(self._pinned)
+
+    def is_pinned(self, user_id: Optional[int]) -> bool:
+        """Whether this user's reads must go to the primary right now"""
+        if user_id is None:
+            return False
+        deadline = self._pinned.get(user_id)
+        return deadline is not None and deadline > time.monotonic()
+
+    def session(self, user_id: Optional[int] = None) -> Session:
+        """A session on the next healthy replica, or on the primary"""
+        if self.replicas and not self.is_pinned(user_id):
+            now = time.monotonic()
+            start = next(self._next)
+            for offset in range(len(self.replicas)):
+                replica = self.replicas[(start + offset) % len(self.replicas)]
+                if replica.down_until > now:
+                    continue
+                db = replica.session_factory()
+                try:
+                    # Check out (and pre-ping) the connection now, so a dead
+                    # replica is skipped before the route runs
+                    db.connection()
+                except DBAPIError:
+                    db.close()
+                    replica.failures += 1
+                    replica.down_until = now + self.retry_seconds
+                    continue
+                replica.served += 1
+                return db
+
+        self._primary_reads += 1
+        return SessionLocal()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "replicas": [
+                {
+                    "url": make_url(replica.url).render_as_string(hide_password=True),
+                    "healthy": replica.down_until <= now,
+                    "served": replica.served,
+                    "failures": replica.failures,
+                }
+                for replica in self.replicas
+            ],
+            "primary_reads": self._primary_reads,
+            "pinned_users": len(self._pinned),
+        }
+
+
+read_replicas = ReadReplicaRouter(
+    urls=[url.strip() for url in settings.read_replica_urls.split(",") if url.strip()],
+    retry_seconds=settings.replica_retry_seconds,
+    sticky_seconds=settings.read_your_writes_seconds,
+)
+
+
+def _routing_user_id(request: Request) -> Optional[int]:
+    """
+    User id from the bearer token, used only to honour read-your-writes
+    pins
+    
+    The token's signature is NOT verified here, and the result must
+    never be used for anything but picking primary vs replica. That is
+    safe only because routing grants nothing: authentication and
+    authorisation still happen in get_current_user, and a forged `sub`
+    can at worst send a read to the primary (same data, more load).
+    """
+    if not read_replicas.has_pins():
+        # Nobody is pinned: skip decoding the token
+        return None
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return int(jwt.get_unverified_claims(token)["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
+
 def get_db():
     """
     Database dependency for FastAPI routes.
@@ -51,6 +417,32 @@ def get_db():
         db.close()
 
 
+def get_read_db(request: Request):
+    """
+    Read-only database dependency: a replica session when replicas are
+    configured and healthy, otherwise the primary.
+    """
+    db = read_replicas.session(_routing_user_id(request))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """
+    Async database dependency for FastAPI routes (ASYNC_MODE only).
+    """
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database is not configured; set ASYNC_MODE=true")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
+    # create_all skips existing tables; add any indexes introduced since
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
@@ -0,0 +1,217 @@
+import asyncio
+import importlib
+import itertools
+import json
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Dict, List, Optional, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.database import get_settings
+
+settings = get_settings()
+
+# Session.info key: events staged by services, published after commit
+PENDING_EVENTS = "pending_events"
+
+# Sent in place of events a slow consumer had no room for
+RESYNC = {"type": "resync"}
+
+
+class SubscriptionLimitReached(Exception):
+    """Raised by subscribe() when a connection limit is reached"""
+
+
+class Subscription:
+    """
+    One push connection: a bounded buffer of events for one user
+
+    Written only on the event loop (brokers hop threads before calling
+    offer), so no lock is needed. When the client reads slower than
+    events arrive the buffer is replaced by a single RESYNC event:
+    memory stays bounded and the client learns it must re-fetch.
+    """
+
+    def __init__(self, user_id: int, max_buffer: int):
+        self.user_id = user_id
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self._buffer: deque = deque()
+        self._ready = asyncio.Event()
+
+    def offer(self, event: dict) -> None:
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += len(self._buffer)
+            self._buffer.clear()
+            event = RESYNC
+        self._buffer.append(event)
+        self._ready.set()
+
+    async def next(self, timeout: float) -> Optional[dict]:
+        """Next event, or None after `timeout` seconds without one"""
+        if not self._buffer:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._buffer.popleft()
+
+
+class EventBroker(ABC):
+    """
+    Pub/sub interface behind /api/events/stream
+
+    publish() may be called from any thread (sync handlers run in the
+    threadpool); subscribe()/unsubscribe() run on the event loop.
+    Implementations for an external broker (Redis, NATS, ...) forward
+    publish() to it and feed what they receive to the local subscribers.
+    """
+
+    @abstractmethod
+    def subscribe(self, user_id: int) -> Subscription:
+        """Open a subscription; raises SubscriptionLimitReached when full"""
+
+    @abstractmethod
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Close a subscription (idempotent)"""
+
+    @abstractmethod
+    def publish(self, events: List[dict]) -> None:
+        """Deliver committed events to their users' subscriptions"""
+
+    def stats(self) -> dict:
+        return {}
+
+
+class InProcessBroker(EventBroker):
+    """
+    Fan-out to the subscribers of this process (default broker)
+
+    Events committed by other processes (other API workers, the
+    auto-debit pool) are not seen; plug an external broker through
+    EVENT_BROKER for multi-worker deployments.
+
+    Key Principles:
+    1. Publishing for a user nobody is subscribed to costs one dict lookup
+    2. Delivery always happens on the event loop (call_soon_threadsafe
+       from worker threads), so subscriptions need no locks
+    3. Bounded everywhere: connections in total and per user, and events
+       buffered per connection
+    """
+
+    def __init__(self, max_buffer: int, max_connections: int, max_connections_per_user: int):
+        self.max_buffer = max_buffer
+        self.max_connections = max_connections
+        self.max_connections_per_user = max_connections_per_user
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._connections = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+        self._published = 0
+        self._delivered = 0
+        self._rejected = 0
+
+    def subscribe(self, user_id: int) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        subscribers = self._subscribers.get(user_id, ())
+        if self._connections >= self.max_connections or len(subscribers) >= self.max_connections_per_user:
+            self._rejected += 1
+            raise SubscriptionLimitReached()
+        subscription = Subscription(user_id, self.max_buffer)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        self._connections += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.user_id]
+        self._connections -= 1
+
+    def publish(self, events: List[dict]) -> None:
+        # Membership tests on a dict are atomic under the GIL
+        events = [event for event in events if event["user_id"] in self._subscribers]
+        loop = self._loop
+        if not events or loop is None:
+            return
+        with self._lock:
+            for event in events:
+                event["id"] = next(self._sequence)
+            self._published += len(events)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(events)
+        else:
+            try:
+                loop.call_soon_threadsafe(self._deliver, events)
+            except RuntimeError:
+                pass  # loop closed (shutdown): nobody left to deliver to
+
+    def _deliver(self, events: List[dict]) -> None:
+        for event in events:
+            for subscription in self._subscribers.get(event["user_id"], ()):
+                subscription.offer(event)
+                self._delivered += 1
+
+    def stats(self) -> dict:
+        return {
+            "connections": self._connections,
+            "users": len(self._subscribers),
+            "max_connections": self.max_connections,
+            "published": self._published,
+            "delivered": self._delivered,
+            "rejected": self._rejected,
+        }
+
+
+def _create_broker() -> EventBroker:
+    """EVENT_BROKER: empty for in-process, else "module:factory" called with settings"""
+    if not settings.event_broker:
+        return InProcessBroker(
+            max_buffer=settings.event_buffer_size,
+            max_connections=settings.event_max_connections,
+            max_connections_per_user=settings.event_max_connections_per_user,
+        )
+    module_name, _, attribute = settings.event_broker.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)(settings)
+
+
+broker = _create_broker()
+
+
+def stage_event(db: Session, user_id: int, event_type: str, **data) -> None:
+    """
+    Queue an event on the session; it is published only if and when the
+    session's transaction commits, and discarded on rollback
+    """
+    db.info.setdefault(PENDING_EVENTS, []).append({"type": event_type, "user_id": user_id, **data})
+
+
+def format_sse(event: dict) -> str:
+    """Render an event in the text/event-stream wire format"""
+    data = {key: value for key, value in event.items() if key not in ("id", "type")}
+    lines = f"event: {event['type']}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+    if "id" in event:
+        return f"id: {event['id']}\n" + lines
+    return lines
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session):
+    events = session.info.pop(PENDING_EVENTS, None)
+    if events:
+        broker.publish(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(PENDING_EVENTS, None)
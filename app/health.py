@@ -0,0 +1,129 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from sqlalchemy import text
+from app.database import engine, get_settings
+
+settings = get_settings()
+
+
+class ReadinessProbe:
+    """
+    Database readiness check for load balancer probes
+
+    Checks out a pooled connection and runs SELECT 1, timing the
+    checkout wait and the round trip separately. The instance is unready
+    when the ping fails or times out, when the checkout wait exceeds its
+    budget, or when the pool is close to exhausted.
+
+    Key Principles:
+    1. Results are cached briefly so frequent probes don't add DB load
+    2. The probe has its own single worker thread: it never competes with
+       request handlers for threadpool slots, and at most one ping is in
+       flight at any time
+    3. Hard timeout on the whole check (the latency budget)
+    """
+
+    def __init__(
+        self,
+        timeout_seconds: float,
+        cache_seconds: float,
+        max_checkout_wait_ms: float,
+        max_pool_utilisation: float,
+    ):
+        self.timeout_seconds = timeout_seconds
+        self.cache_seconds = cache_seconds
+        self.max_checkout_wait_ms = max_checkout_wait_ms
+        self.max_pool_utilisation = max_pool_utilisation
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="readiness-probe")
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+        self._in_flight: Optional[asyncio.Future] = None
+
+    async def check(self) -> dict:
+        """Latest readiness report, refreshed at most every cache_seconds"""
+        if self._result is not None and time.monotonic() - self._checked_at < self.cache_seconds:
+            return self._result
+
+        # Concurrent callers share the ping already running; a ping stuck
+        # past its timeout is awaited again instead of starting another
+        loop = asyncio.get_running_loop()
+        if (
+            self._in_flight is None
+            or self._in_flight.done()
+            or self._in_flight.get_loop() is not loop
+        ):
+            self._in_flight = loop.run_in_executor(self._executor, self._ping)
+
+        try:
+            ping = await asyncio.wait_for(asyncio.shield(self._in_flight), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            ping = {"ok": False, "error": f"database check exceeded {self.timeout_seconds}s"}
+        except Exception as e:
+            ping = {"ok": False, "error": str(e)}
+
+        self._result = self._evaluate(ping)
+        self._checked_at = time.monotonic()
+        return self._result
+
+    @staticmethod
+    def _ping() -> dict:
+        started = time.perf_counter()
+        with engine.connect() as conn:
+            checked_out = time.perf_counter()
+            conn.execute(text("SELECT 1"))
+            finished = time.perf_counter()
+        return {
+            "ok": True,
+            "checkout_wait_ms": round((checked_out - started) * 1000, 2),
+            "ping_ms": round((finished - checked_out) * 1000, 2),
+        }
+
+    def _evaluate(self, ping: dict) -> dict:
+        pool = self.pool_stats()
+        reasons = []
+        if not ping["ok"]:
+            reasons.append(ping["error"])
+        elif ping["checkout_wait_ms"] > self.max_checkout_wait_ms:
+            reasons.append(
+                f"pool checkout wait {ping['checkout_wait_ms']}ms exceeds {self.max_checkout_wait_ms}ms"
+            )
+        utilisation = pool.get("utilisation")
+        if utilisation is not None and utilisation >= self.max_pool_utilisation:
+            reasons.append(f"pool utilisation {utilisation} at or above {self.max_pool_utilisation}")
+
+        return {
+            "ready": not reasons,
+            "database": "connected" if ping["ok"] else "unavailable",
+            "reasons": reasons,
+            "checkout_wait_ms": ping.get("checkout_wait_ms"),
+            "ping_ms": ping.get("ping_ms"),
+            "pool": pool,
+        }
+
+    @staticmethod
+    def pool_stats() -> dict:
+        """Checked-out connections against capacity (QueuePool-style pools only)"""
+        pool = engine.pool
+        if not callable(getattr(pool, "checkedout", None)) or not callable(getattr(pool, "size", None)):
+            return {}
+        checked_out = pool.checkedout()
+        max_overflow = getattr(pool, "_max_overflow", 0)
+        if max_overflow < 0:
+            # Unlimited overflow: the pool can't be exhausted
+            return {"checked_out": checked_out, "capacity": None, "utilisation": None}
+        capacity = pool.size() + max_overflow
+        return {
+            "checked_out": checked_out,
+            "capacity": capacity,
+            "utilisation": round(checked_out / capacity, 4) if capacity else None,
+        }
+
+
+readiness_probe = ReadinessProbe(
+    timeout_seconds=settings.readiness_timeout_seconds,
+    cache_seconds=settings.readiness_cache_seconds,
+    max_checkout_wait_ms=settings.readiness_max_checkout_wait_ms,
+    max_pool_utilisation=settings.readiness_max_pool_utilisation,
+)
@@ -0,0 +1,76 @@
+import hashlib
+from typing import Any, Optional
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Responses are per user: browsers may keep them (never shared caches) but
+# must revalidate each time, which is a cheap 304 when nothing changed
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Weak ETag over the given version parts (or a response body)
+
+    Weak because CompressionMiddleware may send the same response gzipped
+    or as-is: a strong validator would have to differ per content-coding,
+    a weak one names the (semantically equal) content.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\x1f")
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    if etag[:2] == "W/":
+        etag = etag[2:]
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag[:2] == "W/":
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def conditional_response(request: Request, content: Any, etag: Optional[str] = None) -> Response:
+    """
+    JSON response carrying an ETag, or 304 when the client already has it
+
+    `content` is either already-serialised JSON (bytes, e.g. from a
+    TypeAdapter's dump_json) or anything jsonable_encoder accepts.
+
+    With `etag` (a version computed without loading the data) callers
+    should check etag_matches() first and skip the query entirely; here
+    it only labels the rendered body. Without it the ETag is a digest of
+    the body, which saves the transfer but not the query.
+    """
+    if etag is not None and etag_matches(request, etag):
+        return not_modified(etag)
+    if isinstance(content, bytes):
+        response = Response(content=content, media_type="application/json")
+    else:
+        response = JSONResponse(content=jsonable_encoder(content))
+    if etag is None:
+        etag = make_etag(response.body)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
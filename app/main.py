@@ -1,17 +1,42 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import init_db, get_settings
-from app.routers import auth_router, loan_router, wallet_router, repayment_router
+from app.database import init_db, get_settings, SessionLocal, engine, read_replicas
+from app.middleware import QueryStatsMiddleware, MetricsMiddleware, CompressionMiddleware
+from app.health import readiness_probe
+from app.metrics import registry, stats_collector, pool_collector, CONTENT_TYPE
+from app.auth.password_hasher import password_hasher
+from app.auth.principal_cache import principal_cache
+from app.services.repayment_service import RepaymentService
+from app.services.idempotency_service import idempotency_index
+from app.events import broker
+from app.routers import (
+    auth_router, loan_router, wallet_router, repayment_router, dashboard_router, events_router,
+    async_router,
+)
 
 settings = get_settings()
 
+# Point-in-time gauges read on each /metrics scrape
+registry.add_collector(pool_collector(engine))
+registry.add_collector(stats_collector("password_hashing", password_hasher.stats, "Password hashing pool"))
+registry.add_collector(stats_collector("principal_cache", principal_cache.stats, "Authenticated principal cache"))
+registry.add_collector(stats_collector("schedule_cache", RepaymentService.schedule_cache_stats, "Amortisation schedule cache"))
+registry.add_collector(stats_collector("idempotency_cache", idempotency_index.stats, "Repayment idempotency cache"))
+registry.add_collector(stats_collector("event_stream", broker.stats, "Server-sent event streams"))
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize database on startup"""
     init_db()
+    if idempotency_index.bloom is not None:
+        db = SessionLocal()
+        try:
+            idempotency_index.warm(db)
+        finally:
+            db.close()
     yield
 
 
@@ -32,8 +57,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "ETag"],
+)
+
+# gzip for larger JSON bodies (transaction pages, loan lists, exports)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.gzip_minimum_size,
+    compresslevel=settings.gzip_compresslevel,
 )
 
+# Per-request SQL counts/time -> Server-Timing header and structured logs
+app.add_middleware(QueryStatsMiddleware)
+
+# Route latency histograms and in-flight gauge for /metrics
+app.add_middleware(MetricsMiddleware)
+
 
 # Global exception handler
 @app.exception_handler(Exception)
@@ -51,10 +90,15 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 
 # Include routers
+if settings.async_mode:
+    # Async handlers are matched first and shadow their sync counterparts
+    app.include_router(async_router)
 app.include_router(auth_router)
 app.include_router(loan_router)
 app.include_router(wallet_router)
 app.include_router(repayment_router)
+app.include_router(dashboard_router)
+app.include_router(events_router)
 
 
 @app.get("/")
@@ -68,20 +112,53 @@ def root():
 
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Detailed health check"""
+    readiness = await readiness_probe.check()
     return {
-        "status": "healthy",
-        "database": "connected",
+        "status": "healthy" if readiness["ready"] else "degraded",
+        "database": readiness["database"],
         "services": {
             "auth": "operational",
             "loans": "operational",
             "wallet": "operational",
             "repayments": "operational"
-        }
+        },
+        "readiness": readiness,
+        "read_replicas": read_replicas.stats(),
+        "password_hashing": password_hasher.stats(),
+        "principal_cache": principal_cache.stats(),
+        "schedule_cache": RepaymentService.schedule_cache_stats(),
+        "idempotency_cache": idempotency_index.stats(),
+        "event_stream": broker.stats()
     }
 
 
+@app.get("/health/live")
+def liveness():
+    """Liveness probe: the process is up and serving (no dependencies checked)"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """
+    Readiness probe: 503 when the database is unreachable or the
+    connection pool is saturated, so load balancers shed traffic
+    """
+    result = await readiness_probe.check()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if result["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if result["ready"] else "unready", **result},
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics in the text exposition format"""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,284 @@
+import itertools
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Request latency buckets in seconds (Prometheus client defaults)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# Shards per metric. Each thread is assigned a slot once, round-robin,
+# and keeps it for every metric, so threads seldom share a shard
+SHARD_COUNT = 16
+_thread_slot = threading.local()
+_next_slot = itertools.count()
+
+
+class _Sharded:
+    """
+    Lock-striped storage for a metric
+
+    A fixed set of SHARD_COUNT shards, each behind its own lock. Threads
+    rarely share a shard, so the lock is almost never contended, and the
+    shard count stays the same however often the threadpool retires and
+    starts threads. Scrapes sum the shards.
+    """
+
+    def __init__(self):
+        self._shards: List[Tuple[dict, threading.Lock]] = [
+            ({}, threading.Lock()) for _ in range(SHARD_COUNT)
+        ]
+
+    def _shard(self) -> Tuple[dict, threading.Lock]:
+        slot = getattr(_thread_slot, "index", None)
+        if slot is None:
+            # next() on itertools.count is atomic under the GIL
+            slot = _thread_slot.index = next(_next_slot) % SHARD_COUNT
+        return self._shards[slot]
+
+    def _snapshots(self) -> List[list]:
+        snapshots = []
+        for values, lock in self._shards:
+            with lock:
+                # Histogram series are mutated in place: copy them too
+                snapshots.append([
+                    (labelvalues, list(value) if isinstance(value, list) else value)
+                    for labelvalues, value in values.items()
+                ])
+        return snapshots
+
+
+class Counter(_Sharded):
+    """Monotonic counter with optional labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__()
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def inc(self, amount: float = 1.0, *labelvalues) -> None:
+        values, lock = self._shard()
+        with lock:
+            values[labelvalues] = values.get(labelvalues, 0.0) + amount
+
+    def samples(self) -> Iterable[Tuple[str, dict, float]]:
+        totals: Dict[tuple, float] = {}
+        for items in self._snapshots():
+            for labelvalues, value in items:
+                totals[labelvalues] = totals.get(labelvalues, 0.0) + value
+        for labelvalues, value in sorted(totals.items()):
+            yield self.name, dict(zip(self.labelnames, labelvalues)), value
+
+
+class Gauge(Counter):
+    """
+    Up/down gauge
+
+    Stored as per-shard deltas, so inc() and dec() may happen on
+    different threads and still sum to the right value.
+    """
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, *labelvalues) -> None:
+        self.inc(-amount, *labelvalues)
+
+
+class Histogram(_Sharded):
+    """Cumulative-bucket histogram with optional labels"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__()
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues) -> None:
+        # First bucket whose upper bound is >= value; len(buckets) is +Inf
+        bucket = bisect_left(self.buckets, value)
+        values, lock = self._shard()
+        with lock:
+            series = values.get(labelvalues)
+            if series is None:
+                # [per-bucket counts..., +Inf count, sum]
+                series = [0] * (len(self.buckets) + 1) + [0.0]
+                values[labelvalues] = series
+            series[bucket] += 1
+            series[-1] += value
+
+    def samples(self) -> Iterable[Tuple[str, dict, float]]:
+        totals: Dict[tuple, list] = {}
+        for items in self._snapshots():
+            for labelvalues, series in items:
+                merged = totals.get(labelvalues)
+                if merged is None:
+                    totals[labelvalues] = series
+                else:
+                    for i, value in enumerate(series):
+                        merged[i] += value
+
+        for labelvalues, series in sorted(totals.items()):
+            labels = dict(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, series[-1]
+            yield f"{self.name}_count", labels, cumulative
+
+
+class MetricsRegistry:
+    """
+    Metric registry rendered in the Prometheus text exposition format
+
+    Key Principles:
+    1. Recording takes one uncontended lock: metrics are lock-striped
+       over a fixed set of shards
+    2. Aggregation happens only at scrape time
+    3. Point-in-time values (pool usage, cache stats) are read by
+       collectors when scraped instead of being pushed on every change
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, float]]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, str, float]]]) -> None:
+        """Register a callable yielding (name, help, value) gauges at scrape time"""
+        self._collectors.append(collector)
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for collector in self._collectors:
+            for name, documentation, value in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+registry = MetricsRegistry()
+
+# HTTP
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+
+# Business
+repayments_total = registry.counter(
+    "loan_repayments_total",
+    "Successful loan repayments",
+    ("type",),
+)
+repayment_amount_total = registry.counter(
+    "loan_repayment_amount_total",
+    "Total amount repaid",
+)
+loans_disbursed_total = registry.counter(
+    "loans_disbursed_total",
+    "Loans approved and disbursed to wallets",
+)
+disbursed_amount_total = registry.counter(
+    "loan_disbursed_amount_total",
+    "Total principal disbursed to wallets",
+)
+wallet_debits_rejected_total = registry.counter(
+    "wallet_debits_rejected_total",
+    "Wallet debits rejected",
+    ("reason",),
+)
+
+
+def stats_collector(prefix: str, stats: Callable[[], dict], documentation: str):
+    """Expose the numeric fields of a component's stats() dict as gauges"""
+
+    def collect():
+        for key, value in stats().items():
+            if isinstance(value, (bool, int, float)):
+                yield f"{prefix}_{key}", f"{documentation} ({key})", float(value)
+
+    return collect
+
+
+def pool_collector(engine):
+    """Checked-out / overflow / idle connections of a SQLAlchemy pool"""
+
+    def collect():
+        pool = engine.pool
+        for key, documentation in (
+            ("size", "Configured pool size"),
+            ("checkedout", "Connections currently checked out"),
+            ("overflow", "Connections open beyond the pool size"),
+            ("checkedin", "Idle connections in the pool"),
+        ):
+            # Only QueuePool-style pools report these; SQLite's may not
+            method = getattr(pool, key, None)
+            if callable(method):
+                yield f"db_pool_{key}", documentation, float(method())
+
+    return collect
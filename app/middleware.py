@@ -0,0 +1,152 @@
+import json
+import logging
+import time
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from app.database import get_settings, track_queries, stop_tracking
+from app.metrics import http_requests_in_flight, http_request_duration_seconds
+
+settings = get_settings()
+logger = logging.getLogger("app.sql")
+
+
+class QueryStatsMiddleware:
+    """
+    Per-request SQL instrumentation
+    
+    Counts statements, DB time and rows for each HTTP request, exposes
+    them in a Server-Timing header and logs one structured line per
+    request. With SQL_DEBUG on, statements repeated at least
+    SQL_N_PLUS_ONE_THRESHOLD times are logged as N+1 suspects.
+    
+    Pure ASGI (no BaseHTTPMiddleware) so streaming responses pass
+    straight through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = track_queries()
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} queries", '
+                    f'app;dur={(time.perf_counter() - started) * 1000:.2f}'
+                )
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", timing.encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_tracking(token)
+            self._log(scope, status_code, stats, time.perf_counter() - started)
+
+    @staticmethod
+    def _log(scope, status_code, stats, elapsed):
+        repeated = stats.repeated_statements(settings.sql_n_plus_one_threshold)
+        for statement, count in repeated.items():
+            logger.warning(json.dumps({
+                "event": "n_plus_one_suspect",
+                "method": scope["method"],
+                "path": scope["path"],
+                "count": count,
+                "statement": statement,
+            }))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                "event": "request",
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round(elapsed * 1000, 2),
+                "db_statements": stats.statements,
+                "db_ms": round(stats.db_seconds * 1000, 2),
+                "db_rows": stats.rows,
+            }))
+
+
+class MetricsMiddleware:
+    """
+    Request metrics for /metrics
+
+    Tracks in-flight requests and a latency histogram per route. Requests
+    are labelled with the matched route template (e.g. /api/loans/{loan_id})
+    rather than the raw path, which keeps label cardinality bounded;
+    requests that match no route share the "unmatched" label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            http_request_duration_seconds.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            )
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    GZip for response bodies of at least GZIP_MINIMUM_SIZE bytes
+
+    Event streams are passed through untouched: the gzip writer buffers
+    output, so a compressed stream would hold events back until enough
+    of them accumulated. That is decided from the response's
+    Content-Type, not the request's Accept header, which curl and
+    fetch-based SSE clients don't send. ETags from app.http_cache are
+    weak, so the gzipped and identity forms of a response may share one.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or "gzip" not in Headers(scope=scope).get("accept-encoding", ""):
+            await self.app(scope, receive, send)
+            return
+
+        responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        responder.send = send
+        forward = responder.send_with_gzip
+
+        async def send_unless_event_stream(message):
+            nonlocal forward
+            if message["type"] == "http.response.start":
+                media_type = Headers(raw=message["headers"]).get("content-type", "").split(";")[0]
+                if media_type.strip().lower() == "text/event-stream":
+                    forward = send
+            await forward(message)
+
+        await self.app(scope, receive, send_unless_event_stream)
@@ -4,6 +4,9 @@ from app.models.wallet import Wallet
 from app.models.loan import Loan, LoanStatus
 from app.models.repayment import Repayment, RepaymentType, RepaymentStatus
 from app.models.transaction import Transaction, TransactionType, TransactionSource
+from app.models.balance_checkpoint import BalanceCheckpoint
+from app.models.reconciliation_state import ReconciliationState
+from app.models.ledger_seal import LedgerSeal
 
 __all__ = [
     "User",
@@ -17,4 +20,7 @@ __all__ = [
     "Transaction",
     "TransactionType",
     "TransactionSource",
+    "BalanceCheckpoint",
+    "ReconciliationState",
+    "LedgerSeal",
 ]
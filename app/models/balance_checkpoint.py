@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint, func
+from app.database import Base
+from app.models.transaction import LedgerTimestamp
+from app.money import MoneyType
+
+
+class BalanceCheckpoint(Base):
+    """
+    Ledger-derived balance of one user at a point in time
+
+    balance is the signed sum of every transaction of the user with
+    created_at <= as_of; last_transaction_id is the newest of them.
+    Rows are append-only and written by BalanceCheckpointService, never
+    by request handlers.
+    """
+    __tablename__ = "balance_checkpoints"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    as_of = Column(LedgerTimestamp, nullable=False)
+    balance = Column(MoneyType(), nullable=False)
+    last_transaction_id = Column(Integer)
+    transaction_count = Column(Integer, nullable=False)  # ledger entries folded in
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        # Nearest checkpoint at or before a time: (user_id, as_of DESC)
+        UniqueConstraint("user_id", "as_of", name="uq_balance_checkpoints_user_as_of"),
+    )
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, ForeignKey, String, DateTime
+from app.database import Base
+
+
+class LedgerSeal(Base):
+    """
+    Signed checkpoint of a user's ledger hash chain
+
+    States that the user's chain verified up to last_transaction_id and
+    that its head there was `hash`. signature is an HMAC over those
+    fields, so a seal cannot be forged or moved without the signing key.
+    Verification resumes from the seal instead of re-hashing the user's
+    whole history. Written only by LedgerAuditService.
+    """
+    __tablename__ = "ledger_seals"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    last_transaction_id = Column(Integer, nullable=False)
+    hash = Column(String(64))  # chain head at last_transaction_id
+    transaction_count = Column(Integer, nullable=False)  # rows verified so far
+    signature = Column(String(64), nullable=False)
+    sealed_at = Column(DateTime, nullable=False)
@@ -1,6 +1,7 @@
 from sqlalchemy import Column, Integer, ForeignKey, Numeric, String, Enum as SQLEnum, DateTime, func
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.money import MoneyType
 import enum
 
 
@@ -17,11 +18,11 @@ class Loan(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    principal_amount = Column(Numeric(15, 2), nullable=False)
+    principal_amount = Column(MoneyType(), nullable=False)
     tenure_months = Column(Integer, nullable=False)
     interest_rate = Column(Numeric(5, 2), nullable=False)  # Annual interest rate
     status = Column(SQLEnum(LoanStatus), default=LoanStatus.APPLIED, nullable=False)
-    outstanding_amount = Column(Numeric(15, 2), nullable=False)
+    outstanding_amount = Column(MoneyType(), nullable=False)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from app.database import Base
+from app.money import Money, MoneyType
+
+
+class ReconciliationState(Base):
+    """
+    Per-user high-water mark of the ledger reconciliation
+
+    ledger_balance is the signed sum of the user's transactions with
+    id <= last_transaction_id, so the next run only folds in newer rows.
+    drift is wallets.balance minus the ledger at the last check (0 when
+    they agree). Written only by ReconciliationService.
+    """
+    __tablename__ = "reconciliation_state"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    last_transaction_id = Column(Integer, default=0, nullable=False)
+    ledger_balance = Column(MoneyType(), default=Money(0), nullable=False)
+    drift = Column(MoneyType(), default=Money(0), nullable=False)
+    updated_at = Column(DateTime, nullable=False)
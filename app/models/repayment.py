@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, ForeignKey, Numeric, Enum as SQLEnum, DateTime, String, func
+from sqlalchemy import Column, Integer, ForeignKey, Enum as SQLEnum, DateTime, String, func
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.money import MoneyType
 import enum
 
 
@@ -20,7 +21,7 @@ class Repayment(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     loan_id = Column(Integer, ForeignKey("loans.id"), nullable=False)
-    amount = Column(Numeric(15, 2), nullable=False)
+    amount = Column(MoneyType(), nullable=False)
     type = Column(SQLEnum(RepaymentType), nullable=False)
     status = Column(SQLEnum(RepaymentStatus), default=RepaymentStatus.PENDING, nullable=False)
     idempotency_key = Column(String, unique=True, index=True)  # Prevent duplicate payments
@@ -1,9 +1,21 @@
-from sqlalchemy import Column, Integer, ForeignKey, Numeric, String, Enum as SQLEnum, DateTime, func
+from sqlalchemy import Column, Integer, ForeignKey, String, Enum as SQLEnum, DateTime, Index, func
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.money import MoneyType
 import enum
 
 
+# SQLite stores server_default CURRENT_TIMESTAMP with second precision; bind
+# datetimes in the same format so keyset comparisons on created_at are exact.
+LedgerTimestamp = DateTime().with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite",
+)
+
+
 class TransactionType(str, enum.Enum):
     CREDIT = "CREDIT"
     DEBIT = "DEBIT"
@@ -20,17 +32,38 @@ class Transaction(Base):
     IMMUTABLE LEDGER - NO UPDATES ALLOWED
     Every money movement creates a transaction.
     This is the source of truth for all financial operations.
+
+    Tamper-evident: each row carries the SHA-256 `hash` of its own fields
+    (created_at included) and `prev_hash`, the hash of the user's previous
+    row (NULL for the first), so editing, re-dating or deleting any row
+    breaks the user's chain.
     """
     __tablename__ = "transactions"
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    amount = Column(Numeric(15, 2), nullable=False)
+    amount = Column(MoneyType(), nullable=False)
     type = Column(SQLEnum(TransactionType), nullable=False)
     source = Column(SQLEnum(TransactionSource), nullable=False)
     reference_id = Column(String, index=True)  # loan_id or repayment_id
     description = Column(String)
-    created_at = Column(DateTime, server_default=func.now(), index=True)
+    # Set by the application (transaction_service.ledger_timestamp) so it is
+    # covered by the hash; the server default only serves out-of-band inserts
+    created_at = Column(LedgerTimestamp, server_default=func.now(), index=True)
+    prev_hash = Column(String(64))  # hash of the user's previous row
+    hash = Column(String(64))  # see transaction_service.ledger_hash
+
+    __table_args__ = (
+        # Keyset pagination of a user's history: (created_at, id) DESC
+        Index(
+            "ix_transactions_user_created_id",
+            "user_id",
+            created_at.desc(),
+            id.desc(),
+        ),
+        # Folding a user's ledger past a high-water mark: user_id, id > :mark
+        Index("ix_transactions_user_id_id", "user_id", "id"),
+    )
 
     # Relationships
     user = relationship("User", back_populates="transactions")
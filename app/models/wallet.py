@@ -1,13 +1,16 @@
-from sqlalchemy import Column, Integer, ForeignKey, Numeric, CheckConstraint
+from sqlalchemy import Column, Integer, ForeignKey, CheckConstraint, String
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.money import Money, MoneyType
 
 
 class Wallet(Base):
     __tablename__ = "wallets"
 
     user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
-    balance = Column(Numeric(15, 2), default=0.00, nullable=False)
+    balance = Column(MoneyType(), default=Money(0), nullable=False)
+    # Hash of the user's newest ledger row (head of the hash chain)
+    last_hash = Column(String(64))
 
     # Constraint: balance cannot be negative
     __table_args__ = (
@@ -0,0 +1,203 @@
+from decimal import Decimal, InvalidOperation
+from fractions import Fraction
+from typing import Annotated, Any, Optional, Union
+from pydantic import AfterValidator
+from pydantic_core import core_schema
+from sqlalchemy.types import BigInteger, TypeDecorator
+
+MoneyInput = Union["Money", int, str, Decimal, float]
+
+# ".00" ... ".99", so formatting is one divmod and a concatenation
+_CENTS = tuple(f".{cents:02d}" for cents in range(100))
+
+
+def format_minor(minor: int) -> str:
+    """Minor units as a 2dp string in major units (123450 -> 1234.50)"""
+    units, cents = divmod(minor, 100)
+    if units >= 0:
+        return f"{units}{_CENTS[cents]}"
+    units, cents = divmod(-minor, 100)
+    return f"-{units}{_CENTS[cents]}"
+
+
+class Money(int):
+    """
+    Amount of money in integer minor units (paise/cents)
+
+    An int subclass, so amounts add, subtract and compare at integer
+    speed and bind to the database as plain integers.
+
+    Key Principles:
+    1. Money(n) is n minor units; Money.parse("12.50") reads major units
+    2. Parsing is exact: more than 2 decimal places is an error, never
+       a silent rounding
+    3. Computed amounts (interest, EMI, splits) are rounded once, to the
+       cent, half-even (banker's rounding) - see Money.from_fraction
+    4. Integer operands in arithmetic are minor units; Money x Money is
+       not defined
+    5. Serialised as a 2dp string ("1234.50"), the same wire format as
+       the previous Decimal fields
+    """
+
+    __slots__ = ()
+
+    SCALE = 100
+
+    @classmethod
+    def parse(cls, value: MoneyInput) -> "Money":
+        """
+        Exact conversion from major units (API input, Decimal, str)
+
+        Every rejected input raises ValueError, which pydantic reports as
+        a 422; any other exception would escape validation as a 500.
+        """
+        if isinstance(value, Money):
+            return value
+        if isinstance(value, bool):
+            raise ValueError("Money amount cannot be a bool")
+        if isinstance(value, int):
+            return cls(value * cls.SCALE)
+        if isinstance(value, float):
+            # JSON request amounts arrive as floats. A float with at most 2
+            # decimals is the double nearest minor/100, so this is exact;
+            # anything else goes through its shortest repr (10.1 -> 10.10)
+            if -1e13 < value < 1e13:
+                minor = round(value * cls.SCALE)
+                if minor / cls.SCALE == value:
+                    return cls(minor)
+            value = repr(value)
+        elif not isinstance(value, (str, Decimal)):
+            # Decimal() would also accept (sign, digits, exponent) tuples
+            raise ValueError(f"Unsupported money amount type: {type(value).__name__}")
+        try:
+            amount = Decimal(value)
+        except (InvalidOperation, TypeError, ValueError):
+            raise ValueError(f"Invalid money amount: {value!r}")
+        if not amount.is_finite():
+            raise ValueError(f"Invalid money amount: {value!r}")
+        minor = amount.scaleb(2)
+        if minor != minor.to_integral_value():
+            raise ValueError(f"Money amount has more than 2 decimal places: {value}")
+        return cls(int(minor))
+
+    @classmethod
+    def from_fraction(cls, major: Union[Fraction, Decimal, int]) -> "Money":
+        """Round an exact computed amount (major units) to the cent, half-even"""
+        return cls(round(Fraction(major) * cls.SCALE))
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(int(self)).scaleb(-2)
+
+    def split(self, parts: int) -> "Money":
+        """One of `parts` equal shares, rounded half-even to the cent"""
+        return Money(round(Fraction(int(self), parts)))
+
+    # Arithmetic keeps the Money type. Operand checks compare classes and
+    # the int slots are bound as defaults: these run on every balance update
+    def __add__(self, other, _add=int.__add__):
+        if other.__class__ in _INTEGRAL:
+            return Money(_add(self, other))
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other, _sub=int.__sub__):
+        if other.__class__ in _INTEGRAL:
+            return Money(_sub(self, other))
+        return NotImplemented
+
+    def __rsub__(self, other, _sub=int.__sub__):
+        if other.__class__ in _INTEGRAL:
+            return Money(_sub(other, self))
+        return NotImplemented
+
+    def __mul__(self, other, _mul=int.__mul__):
+        if other.__class__ is int:
+            return Money(_mul(self, other))
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Money(-int(self))
+
+    def __abs__(self):
+        return Money(abs(int(self)))
+
+    __str__ = format_minor
+
+    def __repr__(self) -> str:
+        return f"Money('{self}')"
+
+    def __format__(self, spec: str) -> str:
+        return str(self) if not spec else format(self.to_decimal(), spec)
+
+    def __float__(self) -> float:
+        raise TypeError("Money is not convertible to float; use to_decimal()")
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls.parse,
+            serialization=core_schema.plain_serializer_function_ser_schema(format_minor, when_used="json"),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: Any, handler: Any) -> dict:
+        return {
+            "anyOf": [
+                {"type": "number"},
+                {"type": "string", "pattern": r"^-?\d+(\.\d{1,2})?$"},
+            ],
+            "description": "Amount in major units with at most 2 decimal places; returned as a string",
+        }
+
+
+_INTEGRAL = frozenset((int, Money))
+
+
+class MoneyType(TypeDecorator):
+    """
+    Money column: integer minor units in a BIGINT
+
+    Binds Money as-is; Decimal/str values are parsed exactly from major
+    units. Rows come back as Money.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return Money
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, Money):
+            return value
+        return Money.parse(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else Money(value)
+
+
+def bounded_money(gt: Optional[MoneyInput] = None, le: Optional[MoneyInput] = None):
+    """
+    Money field type with bounds given in major units
+
+    (pydantic's gt/le would compare against minor units and report
+    bounds in cents.)
+    """
+    lower = None if gt is None else Money.parse(gt)
+    upper = None if le is None else Money.parse(le)
+
+    def check(amount: Money) -> Money:
+        if lower is not None and amount <= lower:
+            raise ValueError(f"Amount must be greater than {lower}")
+        if upper is not None and amount > upper:
+            raise ValueError(f"Amount must be at most {upper}")
+        return amount
+
+    return Annotated[Money, AfterValidator(check)]
+
+
+PositiveMoney = bounded_money(gt=0)
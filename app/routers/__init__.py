@@ -2,10 +2,16 @@ from app.routers.auth import router as auth_router
 from app.routers.loan import router as loan_router
 from app.routers.wallet import router as wallet_router
 from app.routers.repayment import router as repayment_router
+from app.routers.dashboard import router as dashboard_router
+from app.routers.events import router as events_router
+from app.routers.async_api import router as async_router
 
 __all__ = [
     "auth_router",
     "loan_router",
     "wallet_router",
     "repayment_router",
+    "dashboard_router",
+    "events_router",
+    "async_router",
 ]
@@ -0,0 +1,215 @@
+"""
+Async route handlers (ASYNC_MODE)
+
+When ASYNC_MODE is enabled this router is mounted ahead of the sync
+routers, so these handlers take precedence for the same path and method.
+They run on the event loop with an AsyncSession instead of occupying a
+threadpool worker while waiting on the database. Routes not listed here
+keep their sync handlers.
+
+The sync handlers remain the documented versions; these are excluded from
+the OpenAPI schema to avoid duplicate operations.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.http_cache import conditional_response, etag_matches, make_etag, not_modified
+from app.models.user import UserRole
+from app.auth.principal_cache import Principal
+from app.schemas.user import UserResponse
+from app.schemas.wallet import WalletResponse
+from app.schemas.transaction import TransactionPage, TRANSACTION_PAGE_JSON
+from app.schemas.loan import LoanCreate, LoanResponse, LoanApprovalRequest, LOAN_LIST_JSON
+from app.schemas.repayment import RepaymentCreate, RepaymentResponse, RepaymentResult
+from app.schemas.dashboard import DashboardResponse
+from app.services.wallet_service import AsyncWalletService
+from app.services.transaction_service import TransactionService, AsyncTransactionService
+from app.services.loan_service import AsyncLoanService
+from app.services.idempotency_service import idempotency_index
+from app.services.repayment_service import AsyncRepaymentService
+from app.services.dashboard_service import DashboardService, AsyncDashboardService
+from app.auth.dependencies import get_current_user_async, require_admin_async
+from typing import List, Optional
+
+router = APIRouter(include_in_schema=False)
+
+
+# Auth
+@router.get("/api/auth/me", response_model=UserResponse)
+async def get_current_user_info_async(
+    current_user: Principal = Depends(get_current_user_async)
+):
+    return UserResponse.model_validate(current_user)
+
+
+# Wallet
+@router.get("/api/wallet/balance", response_model=WalletResponse)
+async def get_wallet_balance_async(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    wallet = await AsyncWalletService.get_wallet(db, current_user.id)
+    return conditional_response(request, WalletResponse.model_validate(wallet))
+
+
+@router.get("/api/wallet/transactions", response_model=TransactionPage)
+async def get_wallet_transactions_async(
+    request: Request,
+    limit: int = Query(100, ge=1, le=TransactionService.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    etag = make_etag(
+        "transactions", current_user.id, limit, cursor,
+        *(await AsyncTransactionService.ledger_version(db, current_user.id) or ())
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    items, next_cursor = await AsyncTransactionService.get_user_transaction_rows_page(
+        db, current_user.id, limit, cursor
+    )
+    return conditional_response(
+        request,
+        TRANSACTION_PAGE_JSON.dump_json({"items": items, "next_cursor": next_cursor}),
+        etag
+    )
+
+
+# Loans
+@router.post("/api/loans/apply", response_model=LoanResponse, status_code=status.HTTP_201_CREATED)
+async def apply_for_loan_async(
+    loan_data: LoanCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    loan = await AsyncLoanService.apply_for_loan(
+        db=db,
+        user_id=current_user.id,
+        principal_amount=loan_data.principal_amount,
+        tenure_months=loan_data.tenure_months,
+        interest_rate=loan_data.interest_rate
+    )
+    return LoanResponse.model_validate(loan)
+
+
+@router.get("/api/loans/my-loans", response_model=List[LoanResponse])
+async def get_my_loans_async(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    loans = await AsyncLoanService.get_user_loan_rows(db, current_user.id)
+    return conditional_response(request, LOAN_LIST_JSON.dump_json(loans))
+
+
+@router.get("/api/loans/admin/pending", response_model=List[LoanResponse])
+async def get_pending_loans_async(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin_async)
+):
+    loans = await AsyncLoanService.get_pending_loan_rows(db)
+    return conditional_response(request, LOAN_LIST_JSON.dump_json(loans))
+
+
+@router.post("/api/loans/admin/approve", response_model=LoanResponse)
+async def approve_or_reject_loan_async(
+    approval_data: LoanApprovalRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin_async)
+):
+    if approval_data.approved:
+        loan = await AsyncLoanService.approve_loan(
+            db=db,
+            loan_id=approval_data.loan_id,
+            admin_id=current_user.id
+        )
+    else:
+        loan = await AsyncLoanService.reject_loan(
+            db=db,
+            loan_id=approval_data.loan_id,
+            admin_id=current_user.id,
+            reason=approval_data.rejection_reason or ""
+        )
+    return LoanResponse.model_validate(loan)
+
+
+@router.get("/api/loans/{loan_id}", response_model=LoanResponse)
+async def get_loan_details_async(
+    loan_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    loan = await AsyncLoanService.get_loan_by_id(db, loan_id)
+    
+    # Users can only see their own loans
+    if loan.user_id != current_user.id and current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this loan"
+        )
+    
+    return conditional_response(request, LoanResponse.model_validate(loan))
+
+
+# Repayments
+@router.post("/api/repayments/make-payment", response_model=RepaymentResult, status_code=status.HTTP_201_CREATED)
+async def make_repayment_async(
+    repayment_data: RepaymentCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    # Retries of a completed payment are answered from memory
+    cached = idempotency_index.get(repayment_data.idempotency_key, current_user.id)
+    if cached is not None:
+        return cached
+    
+    repayment, loan = await AsyncRepaymentService.make_repayment(
+        db=db,
+        user_id=current_user.id,
+        loan_id=repayment_data.loan_id,
+        amount=repayment_data.amount,
+        idempotency_key=repayment_data.idempotency_key
+    )
+    
+    result = RepaymentResult(
+        repayment=RepaymentResponse.model_validate(repayment),
+        new_outstanding=loan.outstanding_amount,
+        loan_closed=(loan.outstanding_amount == 0)
+    )
+    idempotency_index.remember(repayment_data.idempotency_key, current_user.id, result)
+    return result
+
+
+@router.get("/api/repayments/loan/{loan_id}", response_model=List[RepaymentResponse])
+async def get_loan_repayments_async(
+    loan_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    # Verify user owns this loan
+    loan = await AsyncLoanService.get_loan_by_id(db, loan_id)
+    if loan.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view repayments for this loan"
+        )
+    
+    repayments = await AsyncRepaymentService.get_loan_repayments(db, loan_id)
+    return [RepaymentResponse.model_validate(r) for r in repayments]
+
+
+# Dashboard
+@router.get("/api/dashboard", response_model=DashboardResponse)
+async def get_dashboard_async(
+    transactions: int = Query(
+        DashboardService.DEFAULT_TRANSACTIONS, ge=1, le=TransactionService.MAX_PAGE_SIZE
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    dashboard = await AsyncDashboardService.get_dashboard(db, current_user.id, transactions)
+    return DashboardResponse.model_validate(dashboard, from_attributes=True)
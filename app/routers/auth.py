@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
 from app.models.wallet import Wallet
 from app.schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse
-from app.auth import create_access_token, verify_password, get_password_hash
+from app.auth import create_access_token, password_hasher
 from app.auth.dependencies import get_current_user
+from app.auth.principal_cache import Principal
 from datetime import timedelta
 from app.database import get_settings
 
@@ -14,26 +16,29 @@ router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 settings = get_settings()
 
 
-@router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    """
-    Register a new user and create wallet
-    
-    Returns JWT token for immediate login
-    """
-    # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
+def _get_user_by_email(db: Session, email: str) -> User:
+    return db.query(User).filter(User.email == email).first()
+
+
+def _ensure_email_available(db: Session, email: str) -> None:
+    if _get_user_by_email(db, email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
+
+def _create_user_with_wallet(db: Session, user_data: UserCreate, hashed_password: str) -> User:
+    """Persist a new user and its zero-balance wallet in one transaction"""
+    # Checked again: a concurrent registration may have taken the email
+    # while the password was being hashed
+    _ensure_email_available(db, user_data.email)
+
     # Create user
     user = User(
         name=user_data.name,
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=hashed_password,
         role=user_data.role
     )
     db.add(user)
@@ -45,6 +50,23 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     
     db.commit()
     db.refresh(user)
+    return user
+
+
+@router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+    """
+    Register a new user and create wallet
+    
+    Password hashing runs on the bounded bcrypt pool (503 when saturated);
+    database work runs on the threadpool. The email is checked before
+    hashing, so duplicate registrations never take a bcrypt slot.
+    
+    Returns JWT token for immediate login
+    """
+    await run_in_threadpool(_ensure_email_available, db, user_data.email)
+    hashed_password = await password_hasher.hash(user_data.password)
+    user = await run_in_threadpool(_create_user_with_wallet, db, user_data, hashed_password)
 
     # Generate token
     access_token = create_access_token(
@@ -59,19 +81,21 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
     """
     Login with email and password
     
+    Password verification runs on the bounded bcrypt pool (503 when saturated).
+    
     Returns JWT token
     """
     # Find user by email (form_data.username is actually email)
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await run_in_threadpool(_get_user_by_email, db, form_data.username)
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await password_hasher.verify(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -93,7 +117,7 @@ def login(
 @router.get("/me", response_model=UserResponse)
 def get_current_user_info(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get current user information"""
     return UserResponse.model_validate(current_user)
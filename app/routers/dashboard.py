@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.database import get_read_db
+from app.auth.principal_cache import Principal
+from app.schemas.dashboard import DashboardResponse
+from app.services.dashboard_service import DashboardService
+from app.services.transaction_service import TransactionService
+from app.auth.dependencies import get_current_user
+
+router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
+
+
+@router.get("", response_model=DashboardResponse)
+def get_dashboard(
+    transactions: int = Query(
+        DashboardService.DEFAULT_TRANSACTIONS, ge=1, le=TransactionService.MAX_PAGE_SIZE,
+        description="Number of latest transactions to include"
+    ),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get the dashboard in one request
+    
+    Wallet balance, all loans, the latest transactions (with a cursor
+    for /api/wallet/transactions) and the next EMI due, read in one
+    session with one query per table.
+    """
+    dashboard = DashboardService.get_dashboard(db, current_user.id, transactions)
+    return DashboardResponse.model_validate(dashboard, from_attributes=True)
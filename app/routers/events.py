@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from app.database import get_settings
+from app.auth.principal_cache import Principal
+from app.auth.dependencies import get_current_user, get_stream_user
+from app.auth.jwt import create_stream_ticket
+from app.schemas.user import StreamTicketResponse
+from app.events import broker, format_sse, SubscriptionLimitReached
+
+settings = get_settings()
+
+router = APIRouter(prefix="/api/events", tags=["Events"])
+
+# Reconnect delay suggested to clients turned away by the connection limits
+STREAM_LIMIT_RETRY_MS = 30_000
+
+
+@router.post("/ticket", response_model=StreamTicketResponse)
+def create_ticket(current_user: Principal = Depends(get_current_user)):
+    """
+    Ticket for opening /api/events/stream
+    
+    Short-lived and accepted only by the stream, so the URL of the
+    stream (which EventSource cannot authenticate with a header) never
+    carries the long-lived access token. Fetch a new one for every
+    (re)connect.
+    """
+    return StreamTicketResponse(
+        ticket=create_stream_ticket(current_user.id),
+        expires_in=settings.event_ticket_ttl_seconds
+    )
+
+
+@router.get("/stream")
+async def stream_events(current_user: Principal = Depends(get_stream_user)):
+    """
+    Server-sent events for the current user
+    
+    Pushes `wallet.balance` and `loan.status` events as soon as the
+    change commits, so clients don't have to poll. A `resync` event
+    means events were dropped because the client read too slowly:
+    re-fetch /api/dashboard. Idle connections get a comment line every
+    EVENT_HEARTBEAT_SECONDS to keep proxies from closing them. When the
+    connection limits are reached the stream sends one `unavailable`
+    event (with a `retry:` hint) and closes.
+    
+    Authenticates with ?ticket= (from POST /api/events/ticket) because
+    EventSource cannot send headers.
+    """
+
+    async def stream():
+        # Subscribed inside the body, so the generator's finally owns the
+        # subscription: a client that disconnects (or a response that
+        # fails) before the first chunk never held a slot
+        try:
+            subscription = broker.subscribe(current_user.id)
+        except SubscriptionLimitReached:
+            yield f"retry: {STREAM_LIMIT_RETRY_MS}\n" + format_sse(
+                {"type": "unavailable", "detail": "Too many open event streams"}
+            )
+            return
+        try:
+            yield ": connected\n\n"
+            while True:
+                event = await subscription.next(settings.event_heartbeat_seconds)
+                yield ": keepalive\n\n" if event is None else format_sse(event)
+        finally:
+            # Client went away (the response task is cancelled) or shutdown
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
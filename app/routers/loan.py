@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models.user import User, UserRole
+from app.database import get_db, get_read_db
+from app.http_cache import conditional_response
+from app.models.user import UserRole
+from app.auth.principal_cache import Principal
+from app.money import Money
 from app.schemas.loan import (
     LoanCreate, 
     LoanResponse, 
+    LOAN_LIST_JSON,
     LoanApprovalRequest, 
-    EMICalculation
+    EMICalculation,
+    EMIBatchRequest,
+    AmortizationSchedule,
+    BulkApprovalRequest,
+    BulkApprovalResult
 )
 from app.services.loan_service import LoanService
+from app.services.pricing_service import PricingService
+from app.services.repayment_service import RepaymentService
 from app.auth.dependencies import get_current_user, require_admin
 from typing import List
 from decimal import Decimal
@@ -20,7 +30,7 @@ router = APIRouter(prefix="/api/loans", tags=["Loans"])
 def apply_for_loan(
     loan_data: LoanCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Apply for a loan
@@ -42,21 +52,23 @@ def apply_for_loan(
 
 @router.get("/my-loans", response_model=List[LoanResponse])
 def get_my_loans(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Get all loans for current user"""
-    loans = LoanService.get_user_loans(db, current_user.id)
-    return [LoanResponse.model_validate(loan) for loan in loans]
+    """Get all loans for current user (ETag / If-None-Match aware)"""
+    loans = LoanService.get_user_loan_rows(db, current_user.id)
+    return conditional_response(request, LOAN_LIST_JSON.dump_json(loans))
 
 
 @router.get("/{loan_id}", response_model=LoanResponse)
 def get_loan_details(
     loan_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Get loan details"""
+    """Get loan details (ETag / If-None-Match aware)"""
     loan = LoanService.get_loan_by_id(db, loan_id)
     
     # Users can only see their own loans
@@ -66,22 +78,73 @@ def get_loan_details(
             detail="Not authorized to view this loan"
         )
     
-    return LoanResponse.model_validate(loan)
+    return conditional_response(request, LoanResponse.model_validate(loan))
+
+
+@router.get("/{loan_id}/schedule", response_model=AmortizationSchedule)
+def get_loan_schedule(
+    loan_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Amortisation schedule for an existing loan"""
+    loan = LoanService.get_loan_by_id(db, loan_id)
+    
+    # Users can only see their own loans
+    if loan.user_id != current_user.id and current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this loan"
+        )
+    
+    schedule = RepaymentService.calculate_amortization_schedule(
+        principal=loan.principal_amount,
+        annual_rate=loan.interest_rate,
+        tenure_months=loan.tenure_months
+    )
+    return AmortizationSchedule.model_validate(schedule)
+
+
+@router.post("/schedule", response_model=AmortizationSchedule)
+def calculate_schedule(
+    loan_data: LoanCreate,
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Amortisation schedule for a hypothetical loan
+    
+    Per-instalment principal, interest and balance; schedules are
+    memoised, so repeated quotes for the same product are cheap.
+    """
+    # An explicit 0% is a valid rate (as in apply_for_loan), not "unset"
+    interest_rate = (
+        LoanService.DEFAULT_INTEREST_RATE if loan_data.interest_rate is None
+        else loan_data.interest_rate
+    )
+    
+    schedule = RepaymentService.calculate_amortization_schedule(
+        principal=loan_data.principal_amount,
+        annual_rate=interest_rate,
+        tenure_months=loan_data.tenure_months
+    )
+    return AmortizationSchedule.model_validate(schedule)
 
 
 @router.post("/calculate-emi", response_model=EMICalculation)
 def calculate_emi(
     loan_data: LoanCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Calculate EMI without applying for loan
     
     Useful for users to see what their EMI would be
     """
-    from app.services.repayment_service import RepaymentService
-    
-    interest_rate = loan_data.interest_rate or LoanService.DEFAULT_INTEREST_RATE
+    # An explicit 0% is a valid rate (as in apply_for_loan), not "unset"
+    interest_rate = (
+        LoanService.DEFAULT_INTEREST_RATE if loan_data.interest_rate is None
+        else loan_data.interest_rate
+    )
     
     schedule = RepaymentService.calculate_emi_schedule(
         principal=loan_data.principal_amount,
@@ -92,26 +155,59 @@ def calculate_emi(
     return EMICalculation(**schedule)
 
 
+@router.post("/calculate-emi/batch", response_model=List[EMICalculation])
+def calculate_emi_batch(
+    batch: EMIBatchRequest,
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Price many EMI scenarios in one request
+    
+    Vectorised with NumPy; results match /calculate-emi to the cent.
+    """
+    scenarios = batch.scenarios
+    priced = PricingService.price_loans(
+        [s.principal_amount for s in scenarios],
+        [LoanService.DEFAULT_INTEREST_RATE if s.interest_rate is None else s.interest_rate for s in scenarios],
+        [s.tenure_months for s in scenarios]
+    )
+    return [
+        EMICalculation(
+            emi_amount=Money(emi),
+            total_interest=Money(interest),
+            total_amount=Money(total),
+            tenure_months=int(tenure)
+        )
+        for emi, interest, total, tenure in zip(
+            priced["emi_cents"],
+            priced["total_interest_cents"],
+            priced["total_amount_cents"],
+            priced["tenure_months"]
+        )
+    ]
+
+
 # Admin endpoints
 @router.get("/admin/pending", response_model=List[LoanResponse])
 def get_pending_loans(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin)
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require_admin)
 ):
     """
     Get all pending loan applications
     
-    Admin only
+    Admin only. ETag / If-None-Match aware.
     """
-    loans = LoanService.get_pending_loans(db)
-    return [LoanResponse.model_validate(loan) for loan in loans]
+    loans = LoanService.get_pending_loan_rows(db)
+    return conditional_response(request, LOAN_LIST_JSON.dump_json(loans))
 
 
 @router.post("/admin/approve", response_model=LoanResponse)
 def approve_or_reject_loan(
     approval_data: LoanApprovalRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin)
+    current_user: Principal = Depends(require_admin)
 ):
     """
     Approve or reject a loan application
@@ -140,3 +236,35 @@ def approve_or_reject_loan(
         )
     
     return LoanResponse.model_validate(loan)
+
+
+@router.post("/admin/approve-bulk", response_model=BulkApprovalResult)
+def approve_loans_bulk(
+    approval_data: BulkApprovalRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_admin)
+):
+    """
+    Approve and disburse many loans at once
+    
+    Admin only
+    
+    Loans are processed in chunks; each chunk is one atomic transaction
+    using bulk UPDATEs and a bulk ledger INSERT. Idempotent: loans that
+    are already active are reported as already_active and not disbursed
+    again.
+    """
+    results = LoanService.approve_loans_bulk(
+        db=db,
+        loan_ids=approval_data.loan_ids,
+        admin_id=current_user.id,
+        chunk_size=approval_data.chunk_size
+    )
+    approved = sum(1 for r in results if r["outcome"] == "approved")
+    skipped = sum(1 for r in results if r["outcome"] == "already_active")
+    return BulkApprovalResult(
+        approved=approved,
+        skipped=skipped,
+        failed=len(results) - approved - skipped,
+        results=results
+    )
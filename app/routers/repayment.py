@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models.user import User
+from app.database import get_db, get_read_db
+from app.auth.principal_cache import Principal
 from app.schemas.repayment import RepaymentCreate, RepaymentResponse, RepaymentResult
+from app.services.idempotency_service import idempotency_index
 from app.services.repayment_service import RepaymentService
 from app.auth.dependencies import get_current_user
 from typing import List
@@ -14,13 +15,14 @@ router = APIRouter(prefix="/api/repayments", tags=["Repayments"])
 def make_repayment(
     repayment_data: RepaymentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Make a loan repayment (EMI payment)
     
     CRITICAL FEATURES:
     1. Idempotent: Same idempotency_key returns same result
+       (recent retries are served from memory without a transaction)
     2. ACID Transaction: All steps succeed or all fail
     
     Steps:
@@ -37,6 +39,11 @@ def make_repayment(
     Returns:
         RepaymentResult with repayment details and updated loan status
     """
+    # Retries of a completed payment are answered from memory
+    cached = idempotency_index.get(repayment_data.idempotency_key, current_user.id)
+    if cached is not None:
+        return cached
+    
     repayment, loan = RepaymentService.make_repayment(
         db=db,
         user_id=current_user.id,
@@ -45,18 +52,20 @@ def make_repayment(
         idempotency_key=repayment_data.idempotency_key
     )
     
-    return RepaymentResult(
+    result = RepaymentResult(
         repayment=RepaymentResponse.model_validate(repayment),
         new_outstanding=loan.outstanding_amount,
         loan_closed=(loan.outstanding_amount == 0)
     )
+    idempotency_index.remember(repayment_data.idempotency_key, current_user.id, result)
+    return result
 
 
 @router.get("/loan/{loan_id}", response_model=List[RepaymentResponse])
 def get_loan_repayments(
     loan_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get all repayments for a specific loan
@@ -1,41 +1,141 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models.user import User
-from app.schemas.wallet import WalletResponse
-from app.schemas.transaction import TransactionResponse
+from app.database import get_read_db, read_replicas
+from app.http_cache import conditional_response, etag_matches, make_etag, not_modified
+from app.auth.principal_cache import Principal
+from app.schemas.wallet import WalletResponse, BalanceAsOfResponse
+from app.schemas.transaction import TransactionPage, TRANSACTION_PAGE_JSON
 from app.services.wallet_service import WalletService
 from app.services.transaction_service import TransactionService
-from app.auth.dependencies import get_current_user
-from typing import List
+from app.services.balance_checkpoint_service import BalanceCheckpointService
+from app.auth.dependencies import get_current_user, require_admin
+from app.models.transaction import TransactionSource
+from typing import Literal, Optional
+from datetime import datetime
 
 router = APIRouter(prefix="/api/wallet", tags=["Wallet"])
 
 
 @router.get("/balance", response_model=WalletResponse)
 def get_wallet_balance(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get current wallet balance
+    
+    Sends an ETag; If-None-Match with it returns 304 while unchanged.
     """
     wallet = WalletService.get_wallet(db, current_user.id)
-    return WalletResponse.model_validate(wallet)
+    return conditional_response(request, WalletResponse.model_validate(wallet))
+
+
+@router.get("/balance/as-of", response_model=BalanceAsOfResponse)
+def get_balance_as_of(
+    at: datetime = Query(..., description="Point in time (UTC if no offset is given)"),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get the wallet balance at a point in time
+    
+    Derived from the ledger: the nearest balance checkpoint at or
+    before `at` plus the transactions after it.
+    """
+    return BalanceCheckpointService.balance_as_of(db, current_user.id, at)
 
 
-@router.get("/transactions", response_model=List[TransactionResponse])
+@router.get("/transactions", response_model=TransactionPage)
 def get_wallet_transactions(
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    limit: int = Query(100, ge=1, le=TransactionService.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get wallet transaction history
     
-    Returns immutable ledger entries showing all money movements
+    Returns immutable ledger entries showing all money movements,
+    newest first. Pass `next_cursor` back as `cursor` to fetch the
+    next (older) page.
+    
+    The ETag is derived from the wallet row (balance and ledger hash
+    head), so If-None-Match answers 304 without reading the ledger.
     """
-    transactions = TransactionService.get_user_transactions(
-        db, current_user.id, limit
+    # Versioned before the page is read: a payment committing in between
+    # leaves the ETag older than the body (one extra 200), never newer
+    etag = make_etag(
+        "transactions", current_user.id, limit, cursor,
+        *(TransactionService.ledger_version(db, current_user.id) or ())
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    items, next_cursor = TransactionService.get_user_transaction_rows_page(
+        db, current_user.id, limit, cursor
+    )
+    return conditional_response(
+        request,
+        TRANSACTION_PAGE_JSON.dump_json({"items": items, "next_cursor": next_cursor}),
+        etag
+    )
+
+
+# Admin endpoints
+@router.get("/admin/balance/{user_id}/as-of", response_model=BalanceAsOfResponse)
+def get_user_balance_as_of(
+    user_id: int,
+    at: datetime = Query(..., description="Point in time (UTC if no offset is given)"),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require_admin)
+):
+    """
+    Get any user's ledger balance at a point in time
+    
+    Admin only
+    """
+    return BalanceCheckpointService.balance_as_of(db, user_id, at)
+
+
+@router.get("/admin/export")
+def export_ledger(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    source: Optional[TransactionSource] = None,
+    current_user: Principal = Depends(require_admin)
+):
+    """
+    Stream the transaction ledger as NDJSON or CSV
+    
+    Admin only
+    
+    Filters: created_at in [start, end), user_id, source.
+    Rows are streamed in id order from a server-side cursor, so memory
+    stays flat regardless of export size.
+    """
+    def stream():
+        # The request-scoped session is closed before streaming starts,
+        # so the export owns its own (read) session
+        db = read_replicas.session()
+        try:
+            yield from TransactionService.export_ledger(
+                db,
+                export_format,
+                start=start,
+                end=end,
+                user_id=user_id,
+                source=source
+            )
+        finally:
+            db.close()
+
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="ledger.{export_format}"'}
     )
-    return [TransactionResponse.model_validate(t) for t in transactions]
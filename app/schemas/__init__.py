@@ -1,22 +1,44 @@
-from app.schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse
+from app.schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse, StreamTicketResponse
 from app.schemas.wallet import WalletResponse, WalletBalanceUpdate
-from app.schemas.loan import LoanCreate, LoanApprovalRequest, LoanResponse, EMICalculation
+from app.schemas.loan import (
+    LoanCreate, LoanApprovalRequest, LoanResponse, LoanRow, LOAN_LIST_JSON, EMICalculation, EMIBatchRequest,
+    ScheduleInstallment, AmortizationSchedule,
+    BulkApprovalRequest, LoanApprovalOutcome, BulkApprovalResult,
+)
 from app.schemas.repayment import RepaymentCreate, RepaymentResponse, RepaymentResult
-from app.schemas.transaction import TransactionResponse
+from app.schemas.transaction import (
+    TransactionResponse, TransactionPage, TransactionRow, TransactionRowPage, TRANSACTION_PAGE_JSON,
+)
+from app.schemas.dashboard import NextEMI, DashboardResponse
 
 __all__ = [
     "UserCreate",
     "UserLogin",
     "UserResponse",
     "TokenResponse",
+    "StreamTicketResponse",
     "WalletResponse",
     "WalletBalanceUpdate",
     "LoanCreate",
     "LoanApprovalRequest",
     "LoanResponse",
+    "LoanRow",
+    "LOAN_LIST_JSON",
     "EMICalculation",
+    "EMIBatchRequest",
+    "ScheduleInstallment",
+    "AmortizationSchedule",
+    "BulkApprovalRequest",
+    "LoanApprovalOutcome",
+    "BulkApprovalResult",
     "RepaymentCreate",
     "RepaymentResponse",
     "RepaymentResult",
     "TransactionResponse",
+    "TransactionPage",
+    "TransactionRow",
+    "TransactionRowPage",
+    "TRANSACTION_PAGE_JSON",
+    "NextEMI",
+    "DashboardResponse",
 ]
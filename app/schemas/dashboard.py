@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List, Optional
+from app.money import Money
+from app.schemas.wallet import WalletResponse
+from app.schemas.loan import LoanResponse
+from app.schemas.transaction import TransactionPage
+
+
+class NextEMI(BaseModel):
+    """Earliest upcoming EMI across the user's active loans"""
+    loan_id: int
+    due_date: date
+    amount: Money
+
+
+class DashboardResponse(BaseModel):
+    """Wallet, loans, latest transactions and next EMI in one response"""
+    wallet: WalletResponse
+    loans: List[LoanResponse]
+    transactions: TransactionPage
+    next_emi: Optional[NextEMI] = None
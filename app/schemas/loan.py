@@ -1,12 +1,17 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from decimal import Decimal
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
+from typing_extensions import TypedDict
 from app.models.loan import LoanStatus
+from app.money import Money, bounded_money
+
+# Bounds in major units
+LoanPrincipal = bounded_money(gt=0, le=1000000)
 
 
 class LoanCreate(BaseModel):
-    principal_amount: Decimal = Field(..., gt=0, le=1000000)
+    principal_amount: LoanPrincipal
     tenure_months: int = Field(..., ge=1, le=60)  # Max 5 years
     interest_rate: Optional[Decimal] = Field(None, ge=0, le=50)  # Annual %
 
@@ -17,14 +22,32 @@ class LoanApprovalRequest(BaseModel):
     rejection_reason: Optional[str] = None
 
 
+class BulkApprovalRequest(BaseModel):
+    loan_ids: List[int] = Field(..., min_length=1, max_length=10000)
+    chunk_size: Optional[int] = Field(None, ge=1, le=5000)  # Loans per DB transaction
+
+
+class LoanApprovalOutcome(BaseModel):
+    loan_id: int
+    outcome: Literal["approved", "already_active", "not_found", "invalid_state", "failed"]
+    detail: Optional[str] = None
+
+
+class BulkApprovalResult(BaseModel):
+    approved: int
+    skipped: int
+    failed: int
+    results: List[LoanApprovalOutcome]
+
+
 class LoanResponse(BaseModel):
     id: int
     user_id: int
-    principal_amount: Decimal
+    principal_amount: Money
     tenure_months: int
     interest_rate: Decimal
     status: LoanStatus
-    outstanding_amount: Decimal
+    outstanding_amount: Money
     created_at: datetime
     updated_at: datetime
 
@@ -32,8 +55,50 @@ class LoanResponse(BaseModel):
         from_attributes = True
 
 
+class LoanRow(TypedDict):
+    """LoanResponse as a plain dict (keep the two in sync), see TransactionRow"""
+    id: int
+    user_id: int
+    principal_amount: Money
+    tenure_months: int
+    interest_rate: Decimal
+    status: LoanStatus
+    outstanding_amount: Money
+    created_at: datetime
+    updated_at: datetime
+
+
+LOAN_LIST_JSON = TypeAdapter(List[LoanRow])
+
+
 class EMICalculation(BaseModel):
-    emi_amount: Decimal
-    total_interest: Decimal
-    total_amount: Decimal
+    emi_amount: Money
+    total_interest: Money
+    total_amount: Money
+    tenure_months: int
+
+
+class EMIBatchRequest(BaseModel):
+    scenarios: List[LoanCreate] = Field(..., min_length=1, max_length=10000)
+
+
+class ScheduleInstallment(BaseModel):
+    month: int
+    payment: Money
+    principal: Money
+    interest: Money
+    balance: Money
+
+    class Config:
+        from_attributes = True
+
+
+class AmortizationSchedule(BaseModel):
+    emi_amount: Money
+    total_interest: Money
+    total_amount: Money
     tenure_months: int
+    installments: List[ScheduleInstallment]
+
+    class Config:
+        from_attributes = True
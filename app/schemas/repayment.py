@@ -1,20 +1,20 @@
 from pydantic import BaseModel, Field
-from decimal import Decimal
 from datetime import datetime
 from typing import Optional
 from app.models.repayment import RepaymentType, RepaymentStatus
+from app.money import Money, PositiveMoney
 
 
 class RepaymentCreate(BaseModel):
     loan_id: int
-    amount: Decimal = Field(..., gt=0)
+    amount: PositiveMoney
     idempotency_key: str = Field(..., min_length=1)  # Client-generated unique key
 
 
 class RepaymentResponse(BaseModel):
     id: int
     loan_id: int
-    amount: Decimal
+    amount: Money
     type: RepaymentType
     status: RepaymentStatus
     created_at: datetime
@@ -25,5 +25,5 @@ class RepaymentResponse(BaseModel):
 
 class RepaymentResult(BaseModel):
     repayment: RepaymentResponse
-    new_outstanding: Decimal
+    new_outstanding: Money
     loan_closed: bool
@@ -1,14 +1,15 @@
-from pydantic import BaseModel
-from decimal import Decimal
+from pydantic import BaseModel, TypeAdapter
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+from typing_extensions import TypedDict
 from app.models.transaction import TransactionType, TransactionSource
+from app.money import Money
 
 
 class TransactionResponse(BaseModel):
     id: int
     user_id: int
-    amount: Decimal
+    amount: Money
     type: TransactionType
     source: TransactionSource
     reference_id: Optional[str] = None
@@ -17,3 +18,35 @@ class TransactionResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TransactionPage(BaseModel):
+    """One page of transaction history; pass next_cursor back to continue"""
+    items: List[TransactionResponse]
+    next_cursor: Optional[str] = None
+
+
+class TransactionRow(TypedDict):
+    """
+    TransactionResponse as a plain dict (keep the two in sync)
+
+    Read routes select exactly these columns and serialise whole pages
+    through TRANSACTION_PAGE_JSON: one pass in pydantic-core, without
+    building and validating a model per row. The JSON is identical.
+    """
+    id: int
+    user_id: int
+    amount: Money
+    type: TransactionType
+    source: TransactionSource
+    reference_id: Optional[str]
+    description: Optional[str]
+    created_at: datetime
+
+
+class TransactionRowPage(TypedDict):
+    items: List[TransactionRow]
+    next_cursor: Optional[str]
+
+
+TRANSACTION_PAGE_JSON = TypeAdapter(TransactionRowPage)
@@ -29,3 +29,8 @@ class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
     user: UserResponse
+
+
+class StreamTicketResponse(BaseModel):
+    ticket: str
+    expires_in: int  # Seconds
@@ -1,10 +1,12 @@
-from pydantic import BaseModel, Field
-from decimal import Decimal
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+from app.money import Money, PositiveMoney
 
 
 class WalletResponse(BaseModel):
     user_id: int
-    balance: Decimal
+    balance: Money
 
     class Config:
         from_attributes = True
@@ -12,4 +14,14 @@ class WalletResponse(BaseModel):
 
 class WalletBalanceUpdate(BaseModel):
     """For internal use only - not exposed via API"""
-    amount: Decimal = Field(..., gt=0)
+    amount: PositiveMoney
+
+
+class BalanceAsOfResponse(BaseModel):
+    """Ledger balance at a point in time"""
+    user_id: int
+    as_of: datetime
+    balance: Money
+    last_transaction_id: Optional[int] = None
+    checkpoint_as_of: Optional[datetime] = None  # None: no checkpoint yet, full ledger read
+    tail_transactions: int  # ledger entries read after the checkpoint
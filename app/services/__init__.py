@@ -1,11 +1,17 @@
-from app.services.loan_service import LoanService
-from app.services.wallet_service import WalletService
-from app.services.repayment_service import RepaymentService
-from app.services.transaction_service import TransactionService
+from app.services.loan_service import LoanService, AsyncLoanService
+from app.services.wallet_service import WalletService, AsyncWalletService
+from app.services.repayment_service import RepaymentService, AsyncRepaymentService
+from app.services.transaction_service import TransactionService, AsyncTransactionService
+from app.services.pricing_service import PricingService
 
 __all__ = [
     "LoanService",
     "WalletService",
     "RepaymentService",
     "TransactionService",
+    "PricingService",
+    "AsyncLoanService",
+    "AsyncWalletService",
+    "AsyncRepaymentService",
+    "AsyncTransactionService",
 ]
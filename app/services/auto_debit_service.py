@@ -0,0 +1,231 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.database import SessionLocal, engine
+from app.models.loan import Loan, LoanStatus
+from app.models.repayment import Repayment
+from app.services.loan_service import LoanService
+from app.services.repayment_service import RepaymentService
+from app.services.wallet_service import InsufficientBalance
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from fastapi import HTTPException
+from typing import List, Optional
+import calendar
+import json
+import os
+import time
+
+
+class AutoDebitService:
+    """
+    Nightly EMI auto-debit run
+    
+    Walks every ACTIVE loan whose latest EMI due date is on or before
+    the run date, debits the EMI from the wallet unless that month's EMI
+    was already collected, and records the Repayment + Transaction rows
+    via RepaymentService.make_repayment. A missed, failed or late run is
+    caught up by the next one; so is an EMI skipped for insufficient
+    funds.
+    
+    Key Principles:
+    1. Deterministic idempotency key per (loan, due month): re-running
+       a day can never charge twice
+    2. Loans are sharded by user_id across a process pool, so one user's
+       loans are always handled by the same worker
+    3. Each shard checkpoints its progress and resumes after a crash
+    """
+
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def idempotency_key(loan_id: int, due_date: date) -> str:
+        """One auto-debit per loan per EMI due month"""
+        return f"autodebit-{loan_id}-{due_date:%Y-%m}"
+
+    @staticmethod
+    def due_date(loan_created_at: datetime, run_date: date) -> Optional[date]:
+        """
+        Latest EMI due date on or before run_date (None if none is yet)
+        
+        EMIs fall due monthly on the day of the month the loan was created
+        (clamped to the month's last day), starting the month after.
+        """
+        if loan_created_at is None:
+            return None
+        year, month = run_date.year, run_date.month
+        due = date(year, month, min(loan_created_at.day, calendar.monthrange(year, month)[1]))
+        if due > run_date:
+            year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+            due = date(year, month, min(loan_created_at.day, calendar.monthrange(year, month)[1]))
+        if (due.year, due.month) <= (loan_created_at.year, loan_created_at.month):
+            return None
+        return due
+
+    @staticmethod
+    def next_due_date(loan_created_at: datetime, today: date) -> date:
+        """First EMI due date on or after today"""
+        year, month = today.year, today.month
+        if (loan_created_at.year, loan_created_at.month) >= (year, month):
+            year, month = loan_created_at.year, loan_created_at.month + 1
+        while True:
+            if month > 12:
+                year, month = year + 1, 1
+            due = date(year, month, min(loan_created_at.day, calendar.monthrange(year, month)[1]))
+            if due >= today:
+                return due
+            month += 1
+
+    @staticmethod
+    def debit_loan(db: Session, loan: Loan, due_date: date) -> str:
+        """
+        Debit the EMI due on `due_date` for a loan
+        
+        Returns:
+            Outcome: "debited", "insufficient_funds" or "failed"
+        """
+        emi = LoanService.calculate_emi(loan.principal_amount, loan.interest_rate, loan.tenure_months)
+        amount = min(emi, loan.outstanding_amount)
+        try:
+            RepaymentService.make_repayment(
+                db=db,
+                user_id=loan.user_id,
+                loan_id=loan.id,
+                amount=amount,
+                idempotency_key=AutoDebitService.idempotency_key(loan.id, due_date)
+            )
+            return "debited"
+        except InsufficientBalance:
+            return "insufficient_funds"
+        except HTTPException:
+            return "failed"
+
+    @staticmethod
+    def checkpoint_path(checkpoint_dir: str, run_date: date, shard: int, shard_count: int) -> str:
+        """
+        Checkpoint file of one shard of one partitioning
+        
+        The shard count is part of the name: last_loan_id is only
+        meaningful within the same user_id % shard_count partition, so a
+        rerun with different --workers starts its shards afresh (the
+        per-month idempotency keys keep already-debited loans from being
+        charged again).
+        """
+        return os.path.join(
+            checkpoint_dir, f"auto_debit-{run_date.isoformat()}-shard{shard}of{shard_count}.json"
+        )
+
+    @staticmethod
+    def run_shard(
+        shard: int,
+        shard_count: int,
+        run_date: date,
+        checkpoint_dir: Optional[str] = None
+    ) -> dict:
+        """
+        Process every due loan of one user_id shard
+        
+        Progress (last loan id and counters) is written to the shard's
+        checkpoint file after each batch; a rerun resumes from there.
+        """
+        path = (
+            AutoDebitService.checkpoint_path(checkpoint_dir, run_date, shard, shard_count)
+            if checkpoint_dir else None
+        )
+        state = {"last_loan_id": 0, "debited": 0, "already_paid": 0, "insufficient_funds": 0, "failed": 0, "scanned": 0}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                state.update(json.load(f))
+
+        db = SessionLocal()
+        try:
+            while True:
+                loans = (
+                    db.query(Loan)
+                    .filter(
+                        Loan.status == LoanStatus.ACTIVE,
+                        Loan.user_id % shard_count == shard,
+                        Loan.id > state["last_loan_id"]
+                    )
+                    .order_by(Loan.id)
+                    .limit(AutoDebitService.BATCH_SIZE)
+                    .all()
+                )
+                if not loans:
+                    break
+
+                keys = {}
+                for loan in loans:
+                    due_date = AutoDebitService.due_date(loan.created_at, run_date)
+                    if due_date is not None:
+                        keys[AutoDebitService.idempotency_key(loan.id, due_date)] = (loan, due_date)
+                # One lookup per batch for EMIs already collected
+                paid = set(
+                    db.execute(
+                        select(Repayment.idempotency_key)
+                        .where(Repayment.idempotency_key.in_(list(keys)))
+                    ).scalars()
+                ) if keys else set()
+
+                for key, (loan, due_date) in keys.items():
+                    if key in paid:
+                        state["already_paid"] += 1
+                    else:
+                        state[AutoDebitService.debit_loan(db, loan, due_date)] += 1
+
+                state["scanned"] += len(loans)
+                state["last_loan_id"] = loans[-1].id
+                db.expunge_all()
+                if path:
+                    AutoDebitService._write_checkpoint(path, state)
+        finally:
+            db.close()
+
+        return state
+
+    @staticmethod
+    def _write_checkpoint(path: str, state: dict) -> None:
+        # Write-then-rename so a crash never leaves a torn checkpoint
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def run(
+        run_date: date,
+        workers: int = 4,
+        checkpoint_dir: Optional[str] = None
+    ) -> dict:
+        """
+        Run the auto-debit job across a process pool
+        
+        Returns:
+            Aggregated counters plus elapsed seconds and loans/s
+        """
+        if checkpoint_dir:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            shards: List[dict] = list(pool.map(
+                AutoDebitService.run_shard,
+                range(workers),
+                [workers] * workers,
+                [run_date] * workers,
+                [checkpoint_dir] * workers
+            ))
+        elapsed = time.perf_counter() - started
+
+        report = {
+            key: sum(shard[key] for shard in shards)
+            for key in ("scanned", "debited", "already_paid", "insufficient_funds", "failed")
+        }
+        processed = report["debited"] + report["already_paid"] + report["insufficient_funds"] + report["failed"]
+        report["elapsed_seconds"] = round(elapsed, 2)
+        report["loans_per_second"] = round(processed / elapsed, 1) if elapsed else 0.0
+        return report
+
+
+def _init_worker():
+    # Never reuse connections inherited from the parent process
+    engine.dispose(close=False)
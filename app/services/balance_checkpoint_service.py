@@ -0,0 +1,209 @@
+from sqlalchemy import and_, func, insert, select
+from sqlalchemy.orm import Session
+from app.database import get_settings
+from app.models.balance_checkpoint import BalanceCheckpoint
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.money import Money
+from app.services.transaction_service import ledger_sum, signed_amount
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import time
+
+settings = get_settings()
+
+# Lower bound for users without a checkpoint yet
+LEDGER_EPOCH = datetime(1970, 1, 1)
+
+
+class BalanceCheckpointService:
+    """
+    Point-in-time balances from the ledger
+
+    wallets.balance is only the current balance. Every run of
+    create_checkpoints folds each user's new ledger entries into a
+    BalanceCheckpoint row (balance, last transaction id, as_of), so the
+    balance at any time T is the nearest checkpoint at or before T plus
+    the ledger entries between the two.
+
+    Key Principles:
+    1. Checkpoints derive only from the ledger (the source of truth),
+       never from wallets.balance
+    2. Incremental: each run reads only the entries since a user's
+       latest checkpoint
+    3. Entries younger than the settle window are left for the next run,
+       so a transaction still in flight cannot commit behind a checkpoint
+    4. Queries cost O(entries since the checkpoint), not O(history)
+    """
+
+    @staticmethod
+    def ledger_time(value: datetime) -> datetime:
+        """Ledger timestamps are naive UTC; convert aware datetimes"""
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    @staticmethod
+    def create_checkpoints(
+        db: Session,
+        cutoff: Optional[datetime] = None,
+        min_transactions: Optional[int] = None,
+        batch_size: int = 1000
+    ) -> dict:
+        """
+        Checkpoint every user with new ledger entries up to `cutoff`
+
+        Users are processed in batches of `batch_size` ids, one
+        transaction per batch, so an interrupted run keeps the batches
+        it finished. Re-running with the same cutoff writes nothing.
+
+        Args:
+            cutoff: Checkpoint time (default: now minus the settle window)
+            min_transactions: Skip users with fewer new ledger entries
+
+        Returns:
+            Report with users scanned, checkpoints written, entries folded
+        """
+        if cutoff is None:
+            cutoff = datetime.utcnow() - timedelta(seconds=settings.balance_checkpoint_settle_seconds)
+        # Second precision, the resolution of created_at on SQLite
+        cutoff = BalanceCheckpointService.ledger_time(cutoff).replace(microsecond=0)
+        if min_transactions is None:
+            min_transactions = settings.balance_checkpoint_min_transactions
+
+        started = time.perf_counter()
+        report = {"cutoff": cutoff.isoformat(), "users_scanned": 0, "checkpoints": 0, "transactions_folded": 0}
+        after_id = 0
+
+        while True:
+            user_ids = db.execute(
+                select(User.id).where(User.id > after_id).order_by(User.id).limit(batch_size)
+            ).scalars().all()
+            if not user_ids:
+                break
+            low, high = user_ids[0], user_ids[-1]
+            after_id = high
+            report["users_scanned"] += len(user_ids)
+
+            latest = (
+                select(BalanceCheckpoint.user_id, func.max(BalanceCheckpoint.as_of).label("as_of"))
+                .where(BalanceCheckpoint.user_id.between(low, high))
+                .group_by(BalanceCheckpoint.user_id)
+                .subquery()
+            )
+            previous = {
+                row.user_id: row
+                for row in db.execute(
+                    select(
+                        BalanceCheckpoint.user_id,
+                        BalanceCheckpoint.balance,
+                        BalanceCheckpoint.last_transaction_id,
+                        BalanceCheckpoint.transaction_count,
+                    ).join(
+                        latest,
+                        and_(
+                            BalanceCheckpoint.user_id == latest.c.user_id,
+                            BalanceCheckpoint.as_of == latest.c.as_of,
+                        ),
+                    )
+                )
+            }
+
+            # One aggregate per user over (latest checkpoint, cutoff]. Driven
+            # from users so each user is a range seek on the
+            # (user_id, created_at, id) index, not a scan of their history
+            tails = db.execute(
+                select(
+                    User.id.label("user_id"),
+                    ledger_sum(signed_amount()).label("delta"),
+                    func.count().label("count"),
+                    func.max(Transaction.id).label("last_id"),
+                )
+                .select_from(User)
+                .outerjoin(latest, latest.c.user_id == User.id)
+                .join(
+                    Transaction,
+                    and_(
+                        Transaction.user_id == User.id,
+                        Transaction.created_at > func.coalesce(latest.c.as_of, LEDGER_EPOCH),
+                        Transaction.created_at <= cutoff,
+                    ),
+                )
+                .where(User.id.between(low, high))
+                .group_by(User.id)
+                .having(func.count() >= min_transactions)
+            ).all()
+
+            checkpoints = []
+            for tail in tails:
+                prior = previous.get(tail.user_id)
+                checkpoints.append({
+                    "user_id": tail.user_id,
+                    "as_of": cutoff,
+                    "balance": (prior.balance if prior else Money(0)) + tail.delta,
+                    "last_transaction_id": max(
+                        tail.last_id, (prior.last_transaction_id or 0) if prior else 0
+                    ),
+                    "transaction_count": (prior.transaction_count if prior else 0) + tail.count,
+                })
+                report["transactions_folded"] += tail.count
+
+            if checkpoints:
+                db.execute(insert(BalanceCheckpoint), checkpoints)
+            db.commit()
+            report["checkpoints"] += len(checkpoints)
+
+        elapsed = time.perf_counter() - started
+        report["elapsed_seconds"] = round(elapsed, 3)
+        report["transactions_per_second"] = round(report["transactions_folded"] / elapsed) if elapsed else 0
+        return report
+
+    @staticmethod
+    def latest_checkpoint(
+        db: Session,
+        user_id: int,
+        at: Optional[datetime] = None
+    ) -> Optional[BalanceCheckpoint]:
+        """Newest checkpoint of the user at or before `at` (default: any)"""
+        query = select(BalanceCheckpoint).where(BalanceCheckpoint.user_id == user_id)
+        if at is not None:
+            query = query.where(BalanceCheckpoint.as_of <= at)
+        return db.execute(
+            query.order_by(BalanceCheckpoint.as_of.desc()).limit(1)
+        ).scalar_one_or_none()
+
+    @staticmethod
+    def balance_as_of(db: Session, user_id: int, at: datetime) -> dict:
+        """
+        The user's ledger balance at time `at`
+
+        Nearest checkpoint at or before `at`, plus the signed sum of the
+        ledger entries after it up to `at` (seek on the
+        (user_id, created_at, id) index).
+        """
+        at = BalanceCheckpointService.ledger_time(at)
+        checkpoint = BalanceCheckpointService.latest_checkpoint(db, user_id, at)
+
+        query = select(
+            ledger_sum(signed_amount()),
+            func.count(),
+            func.max(Transaction.id),
+        ).where(Transaction.user_id == user_id, Transaction.created_at <= at)
+        if checkpoint is not None:
+            query = query.where(Transaction.created_at > checkpoint.as_of)
+        delta, tail_count, tail_last_id = db.execute(query).one()
+
+        if checkpoint is None:
+            balance, last_transaction_id = delta, tail_last_id
+        else:
+            balance = checkpoint.balance + delta
+            last_transaction_id = max(tail_last_id or 0, checkpoint.last_transaction_id or 0) or None
+
+        return {
+            "user_id": user_id,
+            "as_of": at,
+            "balance": balance,
+            "last_transaction_id": last_transaction_id,
+            "checkpoint_as_of": checkpoint.as_of if checkpoint is not None else None,
+            "tail_transactions": tail_count,
+        }
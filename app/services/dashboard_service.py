@@ -0,0 +1,80 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.loan import LoanStatus
+from app.services.auto_debit_service import AutoDebitService
+from app.services.loan_service import LoanService
+from app.services.transaction_service import TransactionService
+from app.services.wallet_service import WalletService
+from datetime import date
+from typing import Optional
+
+
+class DashboardService:
+    """
+    Everything the web dashboard shows after login, in one call
+
+    Key Principles:
+    1. One session and one query per table: wallet, loans and the first
+       page of transactions (three round trips in total)
+    2. The next EMI is derived in memory from the loans already loaded
+    3. Same shapes as /api/wallet/balance, /api/loans/my-loans and
+       /api/wallet/transactions, so clients can switch without changes
+    """
+
+    DEFAULT_TRANSACTIONS = 20
+
+    @staticmethod
+    def next_emi(loans, today: date) -> Optional[dict]:
+        """
+        Earliest upcoming EMI across the user's ACTIVE loans
+
+        Due dates follow the auto-debit calendar; the amount is the EMI,
+        or the outstanding amount when that is smaller (final instalment).
+        """
+        upcoming = None
+        for loan in loans:
+            if loan.status != LoanStatus.ACTIVE or loan.created_at is None:
+                continue
+            due_date = AutoDebitService.next_due_date(loan.created_at, today)
+            if upcoming is None or due_date < upcoming["due_date"]:
+                emi = LoanService.calculate_emi(loan.principal_amount, loan.interest_rate, loan.tenure_months)
+                upcoming = {
+                    "loan_id": loan.id,
+                    "due_date": due_date,
+                    "amount": min(emi, loan.outstanding_amount),
+                }
+        return upcoming
+
+    @staticmethod
+    def get_dashboard(
+        db: Session,
+        user_id: int,
+        transaction_limit: int = DEFAULT_TRANSACTIONS,
+        today: Optional[date] = None
+    ) -> dict:
+        """Wallet, loans, latest transactions and next EMI of a user"""
+        wallet = WalletService.get_wallet(db, user_id)
+        loans = LoanService.get_user_loans(db, user_id)
+        transactions, next_cursor = TransactionService.get_user_transactions_page(
+            db, user_id, transaction_limit
+        )
+        return {
+            "wallet": wallet,
+            "loans": loans,
+            "transactions": {"items": transactions, "next_cursor": next_cursor},
+            "next_emi": DashboardService.next_emi(loans, today or date.today()),
+        }
+
+
+class AsyncDashboardService:
+    """
+    Async facade over DashboardService for AsyncSession callers (ASYNC_MODE).
+    """
+
+    @staticmethod
+    async def get_dashboard(
+        db: AsyncSession,
+        user_id: int,
+        transaction_limit: int = DashboardService.DEFAULT_TRANSACTIONS
+    ) -> dict:
+        return await db.run_sync(DashboardService.get_dashboard, user_id, transaction_limit)
@@ -0,0 +1,153 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.repayment import Repayment
+from app.schemas.repayment import RepaymentResult
+from app.database import get_settings
+from collections import OrderedDict
+from typing import Optional
+import hashlib
+import math
+import threading
+import time
+
+settings = get_settings()
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over string keys
+    
+    "Not present" answers are definitive; "present" may be a false
+    positive at roughly the configured error rate.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key: str) -> None:
+        positions = self._positions(key)
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class IdempotencyIndex:
+    """
+    In-memory index of repayment idempotency keys
+    
+    1. A TTL + LRU store of recently completed keys -> RepaymentResult,
+       so client retries are answered without opening a transaction
+    2. An optional Bloom filter of keys known to exist, so brand-new
+       keys can skip the idempotency SELECT entirely
+    
+    The unique index on repayments.idempotency_key remains the source of
+    truth. A key missed here (other worker, evicted, pre-dating startup)
+    falls through to the database path: if the repayment is rejected
+    before its INSERT (loan closed, balance spent) the key is looked up
+    again before the rejection is returned, otherwise the IntegrityError
+    handling returns the original.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, bloom_capacity: int = 0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.bloom = BloomFilter(bloom_capacity) if bloom_capacity > 0 else None
+        self._results: "OrderedDict[str, tuple[int, RepaymentResult, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._lookups_skipped = 0
+
+    def get(self, key: str, user_id: int) -> Optional[RepaymentResult]:
+        """Cached result of a completed repayment made by this user"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None or entry[2] <= now or entry[0] != user_id:
+                if entry is not None and entry[2] <= now:
+                    del self._results[key]
+                self._misses += 1
+                return None
+            self._results.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def remember(self, key: str, user_id: int, result: RepaymentResult) -> None:
+        """Record a completed repayment's response"""
+        self.add_known(key)
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._results[key] = (user_id, result, time.monotonic() + self.ttl_seconds)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def may_exist(self, key: str) -> bool:
+        """
+        False only if the key has definitely never been committed
+        (Bloom filter enabled and the key is absent from it)
+        """
+        if self.bloom is None or key in self.bloom:
+            return True
+        with self._lock:
+            self._lookups_skipped += 1
+        return False
+
+    def add_known(self, key: str) -> None:
+        if self.bloom is not None:
+            self.bloom.add(key)
+
+    def warm(self, db: Session, batch_size: int = 10000) -> int:
+        """Load every committed key into the Bloom filter"""
+        if self.bloom is None:
+            return 0
+        loaded = 0
+        result = db.execute(
+            select(Repayment.idempotency_key)
+            .where(Repayment.idempotency_key.isnot(None))
+            .execution_options(stream_results=True, yield_per=batch_size)
+        )
+        for key in result.scalars():
+            self.bloom.add(key)
+            loaded += 1
+        return loaded
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._results),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "bloom_enabled": self.bloom is not None,
+                "db_lookups_skipped": self._lookups_skipped,
+            }
+
+
+idempotency_index = IdempotencyIndex(
+    max_entries=settings.idempotency_cache_size,
+    ttl_seconds=settings.idempotency_cache_ttl_seconds,
+    bloom_capacity=settings.idempotency_bloom_capacity,
+)
@@ -0,0 +1,321 @@
+from sqlalchemy import and_, bindparam, func, insert, select, update
+from sqlalchemy.orm import Session
+from app.database import SessionLocal, engine, is_memory_sqlite, get_settings
+from app.models.ledger_seal import LedgerSeal
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.models.wallet import Wallet
+from app.services.reconciliation_service import ReconciliationService, UserFilter
+from app.services.transaction_service import ledger_hash
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+import hashlib
+import hmac
+import logging
+import time
+
+settings = get_settings()
+logger = logging.getLogger("app.ledger_audit")
+
+
+class LedgerAuditService:
+    """
+    Ledger hash-chain verification
+
+    Every transaction row carries hash = H(prev_hash, fields), chained per
+    user, and wallets.last_hash caches the head. Verifying a user means
+    re-hashing their rows in id order, checking every link, and checking
+    that the wallet's head matches the last row (so a deleted tail shows).
+
+    Key Principles:
+    1. Incremental: after a clean check the chain is sealed with an HMAC
+       signed LedgerSeal, and the next run resumes from the seal instead
+       of re-hashing the user's whole history
+    2. A seal whose signature doesn't verify is not trusted: that user is
+       re-verified from their first row
+    3. Each batch reads ledger and wallets from one snapshot
+    4. Users are split into id ranges verified in parallel processes
+    5. Full mode ignores seals, for audits of rows behind them
+    """
+
+    BATCH_SIZE = 1000
+    # Rows fetched per round trip while streaming a batch
+    FETCH_SIZE = 10000
+
+    @staticmethod
+    def sign(user_id: int, last_transaction_id: int, head: Optional[str], count: int) -> str:
+        """HMAC-SHA256 of a seal's fields"""
+        key = (settings.ledger_signing_key or settings.secret_key).encode()
+        message = f"{user_id}:{last_transaction_id}:{head or ''}:{count}".encode()
+        return hmac.new(key, message, hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def _new_chain(seal=None) -> dict:
+        """Walk state of one user, resumed from a seal or from genesis"""
+        if seal is None:
+            return {"head": None, "count": 0, "last_id": 0, "verified": 0, "problem": None}
+        return {
+            "head": seal.hash, "count": seal.transaction_count,
+            "last_id": seal.last_transaction_id, "verified": 0, "problem": None,
+        }
+
+    @staticmethod
+    def _verify_batch(db: Session, users: UserFilter, seals: dict) -> Dict[int, dict]:
+        """
+        Walk the chains of a batch of users, each from its seal if it has
+        one in `seals`, else from the user's first row
+
+        Returns:
+            user_id -> {head, count, last_id, verified, problem}
+        """
+        chains = {user_id: LedgerAuditService._new_chain(seal) for user_id, seal in seals.items()}
+        seal_table = LedgerSeal.__table__
+
+        fold = select(
+            Transaction.user_id, Transaction.id, Transaction.amount, Transaction.type,
+            Transaction.source, Transaction.reference_id, Transaction.description,
+            Transaction.created_at, Transaction.prev_hash, Transaction.hash,
+        ).select_from(User)
+        if seals:
+            # Range seek on (user_id, id) past each user's seal
+            fold = fold.outerjoin(seal_table, seal_table.c.user_id == User.id).join(
+                Transaction,
+                and_(
+                    Transaction.user_id == User.id,
+                    Transaction.id > func.coalesce(seal_table.c.last_transaction_id, 0),
+                ),
+            )
+        else:
+            fold = fold.join(Transaction, Transaction.user_id == User.id)
+
+        ReconciliationService.begin_snapshot(db)
+        try:
+            # Core rows through a server-side cursor: no ORM row processing,
+            # flat memory however long the chains are
+            rows = db.connection().execute(
+                fold.where(users(User.id))
+                .order_by(Transaction.user_id, Transaction.id)
+                .execution_options(stream_results=True, yield_per=LedgerAuditService.FETCH_SIZE)
+            )
+            current_user, chain = None, None
+            for (
+                user_id, row_id, amount, type_, source, reference_id, description, created_at, prev_hash, row_hash
+            ) in rows:
+                if user_id != current_user:
+                    current_user = user_id
+                    chain = chains.get(user_id)
+                    if chain is None:
+                        chain = chains[user_id] = LedgerAuditService._new_chain()
+                if chain["problem"]:
+                    continue
+                if prev_hash != chain["head"]:
+                    chain["problem"] = ("broken_link", row_id)
+                elif row_hash != ledger_hash(
+                    prev_hash, user_id, amount, type_, source, reference_id, description, created_at
+                ):
+                    chain["problem"] = ("hash_mismatch", row_id)
+                else:
+                    chain["head"] = row_hash
+                    chain["last_id"] = row_id
+                    chain["count"] += 1
+                    chain["verified"] += 1
+
+            # The head cached on the wallet must be the last row's hash,
+            # or rows were removed from the end of the chain
+            for user_id, last_hash in db.execute(
+                select(Wallet.user_id, Wallet.last_hash).where(users(Wallet.user_id))
+            ):
+                chain = chains.setdefault(user_id, LedgerAuditService._new_chain())
+                if chain["problem"] is None and last_hash != chain["head"]:
+                    chain["problem"] = ("head_mismatch", chain["last_id"] or None)
+        finally:
+            # End the read snapshot before anything is written
+            db.rollback()
+        return chains
+
+    @staticmethod
+    def _save_seals(db: Session, stored: dict, chains: Dict[int, dict]) -> int:
+        """Seal every clean chain whose seal changed; returns seals written"""
+        now = datetime.utcnow()
+        inserts, updates = [], []
+        for user_id, chain in chains.items():
+            if chain["problem"] or not chain["last_id"]:
+                continue
+            signature = LedgerAuditService.sign(user_id, chain["last_id"], chain["head"], chain["count"])
+            prior = stored.get(user_id)
+            if prior is None:
+                inserts.append({
+                    "user_id": user_id,
+                    "last_transaction_id": chain["last_id"],
+                    "hash": chain["head"],
+                    "transaction_count": chain["count"],
+                    "signature": signature,
+                    "sealed_at": now,
+                })
+            elif (prior.last_transaction_id, prior.hash, prior.transaction_count, prior.signature) != (
+                chain["last_id"], chain["head"], chain["count"], signature
+            ):
+                updates.append({
+                    "seal_user_id": user_id,
+                    "new_last_transaction_id": chain["last_id"],
+                    "new_hash": chain["head"],
+                    "new_transaction_count": chain["count"],
+                    "new_signature": signature,
+                    "new_sealed_at": now,
+                })
+
+        seal_table = LedgerSeal.__table__
+        if inserts:
+            db.execute(insert(seal_table), inserts)
+        if updates:
+            db.execute(
+                update(seal_table)
+                .where(seal_table.c.user_id == bindparam("seal_user_id"))
+                .values(
+                    last_transaction_id=bindparam("new_last_transaction_id"),
+                    hash=bindparam("new_hash"),
+                    transaction_count=bindparam("new_transaction_count"),
+                    signature=bindparam("new_signature"),
+                    sealed_at=bindparam("new_sealed_at"),
+                ),
+                updates
+            )
+        db.commit()
+        return len(inserts) + len(updates)
+
+    @staticmethod
+    def verify_range(
+        low: int,
+        high: int,
+        full: bool = False,
+        batch_size: int = BATCH_SIZE
+    ) -> dict:
+        """
+        Verify the chains of every user with low <= id <= high
+
+        Runs in a worker process; each batch is verified from one
+        snapshot and its seals written before the next batch starts.
+        """
+        report = {"users": 0, "rows": 0, "reverified": 0, "sealed": 0, "problems": []}
+        seal_table = LedgerSeal.__table__
+        db = SessionLocal()
+        try:
+            after_id = low - 1
+            while True:
+                user_ids = db.execute(
+                    select(User.id)
+                    .where(User.id > after_id, User.id <= high)
+                    .order_by(User.id)
+                    .limit(batch_size)
+                ).scalars().all()
+                if not user_ids:
+                    break
+                first, last = user_ids[0], user_ids[-1]
+                after_id = last
+
+                stored = {
+                    seal.user_id: seal
+                    for seal in db.execute(
+                        select(seal_table).where(seal_table.c.user_id.between(first, last))
+                    )
+                }
+                forged = [
+                    user_id for user_id, seal in stored.items()
+                    if not hmac.compare_digest(
+                        seal.signature,
+                        LedgerAuditService.sign(
+                            user_id, seal.last_transaction_id, seal.hash, seal.transaction_count
+                        ),
+                    )
+                ]
+                trusted = {} if full else stored
+
+                chains = LedgerAuditService._verify_batch(
+                    db, lambda column: column.between(first, last), trusted
+                )
+                if forged and not full:
+                    # Never resume from a seal that doesn't verify
+                    for user_id in forged:
+                        logger.warning("invalid ledger seal user_id=%s, re-verifying from genesis", user_id)
+                    chains.update(LedgerAuditService._verify_batch(
+                        db, lambda column: column.in_(forged), {}
+                    ))
+                    report["reverified"] += len(forged)
+
+                report["users"] += len(user_ids)
+                report["rows"] += sum(chain["verified"] for chain in chains.values())
+                for user_id, chain in sorted(chains.items()):
+                    if chain["problem"]:
+                        problem, transaction_id = chain["problem"]
+                        report["problems"].append({
+                            "user_id": user_id,
+                            "problem": problem,
+                            "transaction_id": transaction_id,
+                        })
+
+                report["sealed"] += LedgerAuditService._save_seals(db, stored, chains)
+        finally:
+            db.close()
+        return report
+
+    @staticmethod
+    def run(
+        workers: int = 4,
+        full: bool = False,
+        batch_size: int = BATCH_SIZE
+    ) -> dict:
+        """
+        Verify every user's ledger chain across a process pool
+
+        Returns:
+            Users checked, rows verified, rows/s and the problem list
+        """
+        db = SessionLocal()
+        try:
+            low, high = db.execute(select(func.min(User.id), func.max(User.id))).one()
+        finally:
+            db.close()
+
+        started = time.perf_counter()
+        shards: List[dict] = []
+        if low is not None:
+            ranges = ReconciliationService.id_ranges(
+                low, high, workers * ReconciliationService.RANGES_PER_WORKER
+            )
+            if workers <= 1 or is_memory_sqlite(settings.database_url):
+                # An in-memory database is private to this process
+                shards = [LedgerAuditService.verify_range(a, b, full, batch_size) for a, b in ranges]
+            else:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                    shards = list(pool.map(
+                        LedgerAuditService.verify_range,
+                        [a for a, _ in ranges],
+                        [b for _, b in ranges],
+                        [full] * len(ranges),
+                        [batch_size] * len(ranges)
+                    ))
+        elapsed = time.perf_counter() - started
+
+        problems = sorted((entry for shard in shards for entry in shard["problems"]), key=lambda e: e["user_id"])
+        for entry in problems:
+            logger.warning("ledger chain %s user_id=%s transaction_id=%s",
+                           entry["problem"], entry["user_id"], entry["transaction_id"])
+
+        rows = sum(shard["rows"] for shard in shards)
+        return {
+            "mode": "full" if full else "incremental",
+            "users_checked": sum(shard["users"] for shard in shards),
+            "rows_verified": rows,
+            "users_reverified": sum(shard["reverified"] for shard in shards),
+            "seals_written": sum(shard["sealed"] for shard in shards),
+            "problem_count": len(problems),
+            "problems": problems,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(rows / elapsed) if elapsed else 0,
+        }
+
+
+def _init_worker():
+    # Never reuse connections inherited from the parent process
+    engine.dispose(close=False)
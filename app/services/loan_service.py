@@ -1,12 +1,23 @@
+from sqlalchemy import bindparam, insert, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.loan import Loan, LoanStatus
-from app.models.transaction import TransactionType, TransactionSource
+from app.models.transaction import Transaction, TransactionType, TransactionSource
+from app.models.wallet import Wallet
+from app.database import get_settings, read_replicas
+from app.metrics import loans_disbursed_total, disbursed_amount_total
+from app.events import stage_event
+from app.money import Money
+from app.schemas.loan import LoanRow
 from app.services.wallet_service import WalletService
-from app.services.transaction_service import TransactionService
+from app.services.transaction_service import TransactionService, fetch_dicts, ledger_hash, ledger_timestamp
+from app.services.pricing_service import PricingService
 from decimal import Decimal
 from fastapi import HTTPException, status
 from typing import List
-import math
+
+settings = get_settings()
 
 
 class LoanService:
@@ -21,17 +32,17 @@ class LoanService:
     """
 
     # Business rules
-    MAX_LOAN_AMOUNT = Decimal("500000.00")  # 5 lakh max
+    MAX_LOAN_AMOUNT = Money.parse("500000.00")  # 5 lakh max
     DEFAULT_INTEREST_RATE = Decimal("12.00")  # 12% annual
     MIN_TENURE = 1
     MAX_TENURE = 60  # 5 years
 
     @staticmethod
     def calculate_emi(
-        principal: Decimal,
+        principal: Money,
         annual_rate: Decimal,
         tenure_months: int
-    ) -> Decimal:
+    ) -> Money:
         """
         Calculate EMI using reducing balance method
         
@@ -40,22 +51,43 @@ class LoanService:
         P = Principal
         R = Monthly interest rate (annual/12/100)
         N = Tenure in months
+        
+        Evaluated exactly (rational arithmetic, no float round trip) and
+        rounded once, half-even, to the cent.
         """
-        if annual_rate == 0:
-            return principal / tenure_months
+        principal = Money.parse(principal)
+        return Money(PricingService.exact_emi_cents(principal, annual_rate, tenure_months))
 
-        monthly_rate = float(annual_rate) / 12 / 100
-        emi = (
-            float(principal) * monthly_rate * math.pow(1 + monthly_rate, tenure_months)
-        ) / (math.pow(1 + monthly_rate, tenure_months) - 1)
+    @staticmethod
+    def calculate_total_amount(
+        principal: Money,
+        annual_rate: Decimal,
+        tenure_months: int
+    ) -> Money:
+        """
+        Principal plus the interest accrued over the amortisation schedule
         
-        return Decimal(str(round(emi, 2)))
+        Not EMI x tenure: the final instalment absorbs the EMI rounding,
+        so a zero-rate loan repays exactly its principal.
+        """
+        principal = Money.parse(principal)
+        priced = PricingService.price_loans([int(principal)], [annual_rate], [tenure_months])
+        return Money(int(priced["total_amount_cents"][0]))
+
+    @staticmethod
+    def stage_status_event(db: Session, loan: Loan) -> None:
+        """Push the loan's new status to its owner once the transaction commits"""
+        stage_event(
+            db, loan.user_id, "loan.status",
+            loan_id=loan.id, status=loan.status.value,
+            outstanding_amount=str(loan.outstanding_amount),
+        )
 
     @staticmethod
     def check_eligibility(
         db: Session,
         user_id: int,
-        requested_amount: Decimal
+        requested_amount: Money
     ) -> tuple[bool, str]:
         """
         Mock eligibility check
@@ -94,7 +126,7 @@ class LoanService:
     def apply_for_loan(
         db: Session,
         user_id: int,
-        principal_amount: Decimal,
+        principal_amount: Money,
         tenure_months: int,
         interest_rate: Decimal = None
     ) -> Loan:
@@ -103,6 +135,8 @@ class LoanService:
         
         State: APPLIED
         """
+        principal_amount = Money.parse(principal_amount)
+
         # Set default interest rate if not provided
         if interest_rate is None:
             interest_rate = LoanService.DEFAULT_INTEREST_RATE
@@ -116,8 +150,7 @@ class LoanService:
             )
 
         # Calculate total amount with interest
-        emi = LoanService.calculate_emi(principal_amount, interest_rate, tenure_months)
-        total_amount = emi * tenure_months
+        total_amount = LoanService.calculate_total_amount(principal_amount, interest_rate, tenure_months)
 
         loan = Loan(
             user_id=user_id,
@@ -129,7 +162,10 @@ class LoanService:
         )
 
         db.add(loan)
+        db.flush()  # Get the loan ID for the event
+        LoanService.stage_status_event(db, loan)
         db.commit()
+        read_replicas.pin_to_primary(user_id)
         db.refresh(loan)
         return loan
 
@@ -143,11 +179,13 @@ class LoanService:
         Approve loan and disburse to wallet
         
         CRITICAL: This is an ACID transaction
-        1. Update loan status: APPLIED -> APPROVED -> ACTIVE
+        1. Update loan status: APPLIED -> ACTIVE (conditional UPDATE)
         2. Credit wallet
         3. Create transaction ledger entry
         
-        All must succeed or all must fail.
+        All must succeed or all must fail. Like approve_loans_bulk, only
+        the call whose UPDATE moved the loan out of APPLIED disburses, so
+        concurrent approvals cannot credit the wallet twice.
         """
         loan = db.query(Loan).filter(Loan.id == loan_id).first()
         if not loan:
@@ -167,8 +205,25 @@ class LoanService:
             )
 
         try:
-            # Step 1: Update loan status
-            loan.status = LoanStatus.APPROVED
+            # Step 1: Conditional transition: a concurrent approver can't double-disburse
+            activated = db.execute(
+                update(Loan)
+                .where(Loan.id == loan_id, Loan.status == LoanStatus.APPLIED)
+                .values(status=LoanStatus.ACTIVE)
+                .returning(Loan.id)
+                .execution_options(synchronize_session=False)
+            ).one_or_none()
+            if activated is None:
+                # Someone else moved it first: idempotent like above
+                db.rollback()
+                db.refresh(loan)
+                if loan.status in [LoanStatus.APPROVED, LoanStatus.ACTIVE]:
+                    return loan
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Cannot approve loan in {loan.status} state"
+                )
+            set_committed_value(loan, "status", LoanStatus.ACTIVE)
 
             # Step 2: Credit wallet
             WalletService.credit_wallet(
@@ -188,14 +243,19 @@ class LoanService:
                 description=f"Loan disbursement for loan #{loan.id}"
             )
 
-            # Step 4: Mark loan as active
-            loan.status = LoanStatus.ACTIVE
+            LoanService.stage_status_event(db, loan)
 
             # Commit entire transaction
             db.commit()
             db.refresh(loan)
+            loans_disbursed_total.inc()
+            disbursed_amount_total.inc(loan.principal_amount / Money.SCALE)
+            read_replicas.pin_to_primary(loan.user_id, admin_id)
             return loan
 
+        except HTTPException:
+            db.rollback()
+            raise
         except Exception as e:
             db.rollback()
             raise HTTPException(
@@ -203,6 +263,150 @@ class LoanService:
                 detail=f"Loan approval failed: {str(e)}"
             )
 
+    @staticmethod
+    def approve_loans_bulk(
+        db: Session,
+        loan_ids: List[int],
+        admin_id: int,
+        chunk_size: int = None
+    ) -> List[dict]:
+        """
+        Approve and disburse many loans, chunk by chunk
+        
+        Each chunk is ONE ACID transaction made of set-based statements:
+        1. SELECT the chunk's loans (and their wallets' chain heads)
+        2. Bulk conditional UPDATE loans APPLIED -> ACTIVE (RETURNING ids)
+        3. Bulk UPDATE wallets (one credit and new chain head per user)
+        4. Bulk INSERT hash-chained ledger entries
+        
+        Idempotent like approve_loan: loans already APPROVED/ACTIVE are
+        reported and skipped, and only rows this call actually moved out
+        of APPLIED are disbursed. A failing chunk is rolled back on its
+        own without affecting chunks already committed.
+        
+        Returns:
+            One {"loan_id", "outcome", "detail"} report per distinct loan id
+        """
+        chunk_size = chunk_size or settings.bulk_approval_chunk_size
+        unique_ids = list(dict.fromkeys(loan_ids))
+        results = []
+
+        for start in range(0, len(unique_ids), chunk_size):
+            chunk = unique_ids[start:start + chunk_size]
+            try:
+                results.extend(LoanService._approve_chunk(db, chunk))
+            except Exception as e:
+                db.rollback()
+                results.extend(
+                    {"loan_id": loan_id, "outcome": "failed", "detail": f"Loan approval failed: {str(e)}"}
+                    for loan_id in chunk
+                )
+
+        read_replicas.pin_to_primary(admin_id)
+        return results
+
+    @staticmethod
+    def _approve_chunk(db: Session, loan_ids: List[int]) -> List[dict]:
+        rows = db.execute(
+            select(Loan.id, Loan.user_id, Loan.principal_amount, Loan.outstanding_amount, Loan.status)
+            .where(Loan.id.in_(loan_ids))
+            .with_for_update()
+        ).all()
+        loans = {row.id: row for row in rows}
+        # Ledger chain heads, locked until commit like the loans
+        heads = dict(
+            db.execute(
+                select(Wallet.user_id, Wallet.last_hash)
+                .where(Wallet.user_id.in_({row.user_id for row in rows}))
+                .with_for_update()
+            ).all()
+        )
+
+        outcomes = {}
+        candidates = []
+        credits = {}
+        ledger_entries = []
+        for loan_id in loan_ids:
+            loan = loans.get(loan_id)
+            if loan is None:
+                outcomes[loan_id] = ("not_found", "Loan not found")
+            elif loan.status in (LoanStatus.APPROVED, LoanStatus.ACTIVE):
+                outcomes[loan_id] = ("already_active", None)
+            elif loan.status != LoanStatus.APPLIED:
+                outcomes[loan_id] = ("invalid_state", f"Cannot approve loan in {loan.status} state")
+            elif loan.user_id not in heads:
+                outcomes[loan_id] = ("failed", "Wallet not found")
+            else:
+                candidates.append(loan_id)
+
+        if candidates:
+            created_at = ledger_timestamp()
+            # Conditional transition: a concurrent approver can't double-disburse
+            activated = set(
+                db.execute(
+                    update(Loan)
+                    .where(Loan.id.in_(candidates), Loan.status == LoanStatus.APPLIED)
+                    .values(status=LoanStatus.ACTIVE)
+                    .returning(Loan.id)
+                    .execution_options(synchronize_session=False)
+                ).scalars()
+            )
+
+            for loan_id in candidates:
+                if loan_id not in activated:
+                    outcomes[loan_id] = ("already_active", None)
+                    continue
+                loan = loans[loan_id]
+                credits[loan.user_id] = credits.get(loan.user_id, Money(0)) + loan.principal_amount
+                entry = {
+                    "user_id": loan.user_id,
+                    "amount": loan.principal_amount,
+                    "type": TransactionType.CREDIT,
+                    "source": TransactionSource.LOAN_DISBURSEMENT,
+                    "reference_id": str(loan_id),
+                    "description": f"Loan disbursement for loan #{loan_id}",
+                    "created_at": created_at,
+                    "prev_hash": heads[loan.user_id],
+                }
+                # Chained in insert order, which is id order
+                entry["hash"] = heads[loan.user_id] = ledger_hash(
+                    entry["prev_hash"], entry["user_id"], entry["amount"], entry["type"],
+                    entry["source"], entry["reference_id"], entry["description"], entry["created_at"]
+                )
+                ledger_entries.append(entry)
+                stage_event(
+                    db, loan.user_id, "loan.status",
+                    loan_id=loan_id, status=LoanStatus.ACTIVE.value,
+                    outstanding_amount=str(loan.outstanding_amount),
+                )
+                outcomes[loan_id] = ("approved", None)
+
+            if credits:
+                wallets = Wallet.__table__
+                db.execute(
+                    update(wallets)
+                    .where(wallets.c.user_id == bindparam("wallet_user_id"))
+                    .values(
+                        balance=wallets.c.balance + bindparam("credit"),
+                        last_hash=bindparam("new_last_hash"),
+                    ),
+                    [
+                        {"wallet_user_id": user_id, "credit": amount, "new_last_hash": heads[user_id]}
+                        for user_id, amount in credits.items()
+                    ]
+                )
+                db.execute(insert(Transaction), ledger_entries)
+
+        db.commit()
+        if credits:
+            loans_disbursed_total.inc(len(ledger_entries))
+            disbursed_amount_total.inc(sum(credits.values()) / Money.SCALE)
+            read_replicas.pin_to_primary(*credits)
+        return [
+            {"loan_id": loan_id, "outcome": outcomes[loan_id][0], "detail": outcomes[loan_id][1]}
+            for loan_id in loan_ids
+        ]
+
     @staticmethod
     def reject_loan(
         db: Session,
@@ -225,8 +429,10 @@ class LoanService:
             )
 
         loan.status = LoanStatus.REJECTED
+        LoanService.stage_status_event(db, loan)
         db.commit()
         db.refresh(loan)
+        read_replicas.pin_to_primary(loan.user_id, admin_id)
         return loan
 
     @staticmethod
@@ -259,3 +465,80 @@ class LoanService:
             .order_by(Loan.created_at.asc())
             .all()
         )
+
+    # Columns of LoanResponse, selected by the read-only list paths
+    RESPONSE_COLUMNS = tuple(getattr(Loan, name) for name in LoanRow.__annotations__)
+
+    @staticmethod
+    def get_user_loan_rows(db: Session, user_id: int) -> List[dict]:
+        """get_user_loans as plain LoanRow dicts (no ORM objects, for responses)"""
+        return fetch_dicts(
+            db,
+            select(*LoanService.RESPONSE_COLUMNS)
+            .where(Loan.user_id == user_id)
+            .order_by(Loan.created_at.desc())
+        )
+
+    @staticmethod
+    def get_pending_loan_rows(db: Session) -> List[dict]:
+        """get_pending_loans as plain LoanRow dicts (no ORM objects, for responses)"""
+        return fetch_dicts(
+            db,
+            select(*LoanService.RESPONSE_COLUMNS)
+            .where(Loan.status == LoanStatus.APPLIED)
+            .order_by(Loan.created_at.asc())
+        )
+
+
+class AsyncLoanService:
+    """
+    Async facade over LoanService for AsyncSession callers (ASYNC_MODE).
+    
+    Business logic runs unchanged inside AsyncSession.run_sync, so the
+    sync and async modes share a single implementation.
+    """
+
+    @staticmethod
+    async def apply_for_loan(
+        db: AsyncSession,
+        user_id: int,
+        principal_amount: Money,
+        tenure_months: int,
+        interest_rate: Decimal = None
+    ) -> Loan:
+        return await db.run_sync(
+            LoanService.apply_for_loan, user_id, principal_amount, tenure_months, interest_rate
+        )
+
+    @staticmethod
+    async def approve_loan(db: AsyncSession, loan_id: int, admin_id: int) -> Loan:
+        return await db.run_sync(LoanService.approve_loan, loan_id, admin_id)
+
+    @staticmethod
+    async def reject_loan(
+        db: AsyncSession,
+        loan_id: int,
+        admin_id: int,
+        reason: str = ""
+    ) -> Loan:
+        return await db.run_sync(LoanService.reject_loan, loan_id, admin_id, reason)
+
+    @staticmethod
+    async def get_user_loans(db: AsyncSession, user_id: int) -> List[Loan]:
+        return await db.run_sync(LoanService.get_user_loans, user_id)
+
+    @staticmethod
+    async def get_loan_by_id(db: AsyncSession, loan_id: int) -> Loan:
+        return await db.run_sync(LoanService.get_loan_by_id, loan_id)
+
+    @staticmethod
+    async def get_pending_loans(db: AsyncSession) -> List[Loan]:
+        return await db.run_sync(LoanService.get_pending_loans)
+
+    @staticmethod
+    async def get_user_loan_rows(db: AsyncSession, user_id: int) -> List[dict]:
+        return await db.run_sync(LoanService.get_user_loan_rows, user_id)
+
+    @staticmethod
+    async def get_pending_loan_rows(db: AsyncSession) -> List[dict]:
+        return await db.run_sync(LoanService.get_pending_loan_rows)
@@ -0,0 +1,204 @@
+import numpy as np
+from fractions import Fraction
+from typing import Dict, Sequence, Union
+
+ArrayLike = Union[Sequence, np.ndarray]
+
+
+class PricingService:
+    """
+    Vectorised batch loan pricing (NumPy)
+    
+    Prices whole arrays of (principal, annual rate, tenure) scenarios at
+    once: EMIs, totals and month-by-month amortisation tables.
+    
+    Key Principles:
+    1. Principals in and all money out are integer cents (int64)
+    2. EMIs are cent-for-cent identical to the exact rational formula
+       (exact_emi_cents, used by LoanService.calculate_emi)
+    3. Every instalment but the last is the EMI; the last clears the
+       remaining balance plus its interest, absorbing the EMI rounding
+    4. Totals are principal + the interest actually accrued, month by
+       month, so a zero-rate loan repays exactly its principal; the total
+       is the loan's outstanding amount at application time
+    """
+
+    @staticmethod
+    def exact_emi_cents(principal_cents: int, annual_rate, tenure_months: int) -> int:
+        """
+        EMI of one loan in integer cents, from the exact formula
+        
+        Evaluated in rational arithmetic (no float) and rounded once,
+        half-even, to the cent.
+        """
+        principal_cents, tenure_months = int(principal_cents), int(tenure_months)
+        if tenure_months < 1:
+            raise ValueError("Tenure must be at least 1 month")
+        monthly_rate = Fraction(str(annual_rate)) / 1200
+        if monthly_rate == 0:
+            return round(Fraction(principal_cents, tenure_months))
+        growth = (1 + monthly_rate) ** tenure_months
+        return round(principal_cents * monthly_rate * growth / (growth - 1))
+
+    @staticmethod
+    def _to_arrays(principal_cents: ArrayLike, annual_rates: ArrayLike, tenures: ArrayLike):
+        principal_cents = np.asarray(principal_cents, dtype=np.int64)
+        annual_rate = np.asarray(annual_rates, dtype=np.float64)
+        tenure = np.asarray(tenures, dtype=np.int64)
+        principal_cents, annual_rate, tenure = np.broadcast_arrays(principal_cents, annual_rate, tenure)
+        if np.any(tenure < 1):
+            raise ValueError("Tenure must be at least 1 month")
+        monthly_rate = annual_rate / 12 / 100
+        return principal_cents, annual_rate, monthly_rate, tenure
+
+    @staticmethod
+    def emi_cents(
+        principal_cents: ArrayLike,
+        annual_rates: ArrayLike,
+        tenures: ArrayLike
+    ) -> np.ndarray:
+        """
+        EMI per scenario, in integer cents
+        
+        Formula: EMI = [P x R x (1+R)^N]/[(1+R)^N-1]
+        Zero-rate loans split the principal evenly (half-even to the cent).
+        """
+        principal_cents, annual_rate, monthly_rate, tenure = PricingService._to_arrays(
+            principal_cents, annual_rates, tenures
+        )
+        cents = np.empty(principal_cents.shape, dtype=np.int64)
+
+        # Interest-bearing: float formula, exact where rounding is in doubt
+        priced = monthly_rate != 0
+        if np.any(priced):
+            r = monthly_rate[priced]
+            growth = np.power(1 + r, tenure[priced])
+            scaled = (principal_cents[priced] * r * growth) / (growth - 1)
+            rounded = np.rint(scaled)
+            # rint can only land on the wrong side of a half cent when the
+            # float EMI is within its error bound of one (the bound grows as
+            # (1+R)^N - 1 approaches 0); settle those with the exact formula
+            tolerance = 1e-6 + scaled * 1e-14 / (growth - 1)
+            ambiguous = np.abs(scaled - np.floor(scaled) - 0.5) < tolerance
+            indices = np.flatnonzero(priced)
+            for i in np.flatnonzero(ambiguous):
+                loan = indices[i]
+                rounded[i] = PricingService.exact_emi_cents(
+                    principal_cents[loan], annual_rate[loan], tenure[loan]
+                )
+            cents[priced] = rounded.astype(np.int64)
+
+        # Zero rate: exact integer division, rounded half-even
+        free = ~priced
+        if np.any(free):
+            quotient, remainder = np.divmod(principal_cents[free], tenure[free])
+            twice = remainder * 2
+            round_up = (twice > tenure[free]) | ((twice == tenure[free]) & (quotient % 2 == 1))
+            cents[free] = quotient + round_up
+
+        return cents
+
+    @staticmethod
+    def price_loans(
+        principal_cents: ArrayLike,
+        annual_rates: ArrayLike,
+        tenures: ArrayLike
+    ) -> Dict[str, np.ndarray]:
+        """
+        Price a batch of loans
+        
+        Totals come from the same month-by-month schedule as
+        amortization_tables, accumulated without materialising it.
+        
+        Returns:
+            Integer-cent arrays: emi_cents, total_amount_cents,
+            total_interest_cents (plus tenure_months)
+        """
+        principal_cents, _, monthly_rate, tenure = PricingService._to_arrays(
+            principal_cents, annual_rates, tenures
+        )
+        emi = PricingService.emi_cents(principal_cents, annual_rates, tenures)
+        total_interest = np.zeros(principal_cents.size, dtype=np.int64)
+        for _, active, _, _, interest, _ in PricingService._amortize(
+            principal_cents.ravel(), monthly_rate.ravel(), tenure.ravel(), emi.ravel()
+        ):
+            total_interest[active] += interest[active]
+        total_interest = total_interest.reshape(principal_cents.shape)
+        return {
+            "emi_cents": emi,
+            "total_amount_cents": principal_cents + total_interest,
+            "total_interest_cents": total_interest,
+            "tenure_months": tenure,
+        }
+
+    @staticmethod
+    def amortization_tables(
+        principal_cents: ArrayLike,
+        annual_rates: ArrayLike,
+        tenures: ArrayLike
+    ) -> Dict[str, np.ndarray]:
+        """
+        Month-by-month amortisation for a batch of loans
+        
+        Each month: interest = balance x R (half-even to the cent),
+        principal = EMI - interest, capped at the balance. The final
+        instalment clears the remaining balance plus its interest, so it
+        absorbs the EMI rounding and may differ from the EMI by a few
+        cents. Every schedule pays principal + total interest; at zero
+        rate that is exactly the principal.
+        
+        Returns:
+            (n_loans, max_tenure) int64 cent arrays: payment_cents,
+            principal_cents, interest_cents, balance_cents (closing
+            balance). Months past a loan's tenure are zero.
+            
+        Memory is n_loans x max_tenure x 32 bytes; price very large books
+        in chunks.
+        """
+        principal_cents, _, monthly_rate, tenure = PricingService._to_arrays(
+            principal_cents, annual_rates, tenures
+        )
+        emi = PricingService.emi_cents(principal_cents, annual_rates, tenures)
+        principal_cents = principal_cents.ravel()
+        tenure = tenure.ravel()
+
+        n_loans = principal_cents.shape[0]
+        months = int(tenure.max()) if n_loans else 0
+        shape = (n_loans, months)
+        payment_out = np.zeros(shape, dtype=np.int64)
+        principal_out = np.zeros(shape, dtype=np.int64)
+        interest_out = np.zeros(shape, dtype=np.int64)
+        balance_out = np.zeros(shape, dtype=np.int64)
+
+        for column, active, payment, principal_part, interest, balance in PricingService._amortize(
+            principal_cents, monthly_rate.ravel(), tenure, emi.ravel()
+        ):
+            payment_out[active, column] = payment[active]
+            principal_out[active, column] = principal_part[active]
+            interest_out[active, column] = interest[active]
+            balance_out[active, column] = balance[active]
+
+        return {
+            "payment_cents": payment_out,
+            "principal_cents": principal_out,
+            "interest_cents": interest_out,
+            "balance_cents": balance_out,
+        }
+
+    @staticmethod
+    def _amortize(principal_cents: np.ndarray, monthly_rate: np.ndarray, tenure: np.ndarray, emi: np.ndarray):
+        """
+        Yield (column, active, payment, principal, interest, closing
+        balance) per month for flat arrays of loans
+        """
+        balance = principal_cents.copy()
+        months = int(tenure.max()) if tenure.size else 0
+        for month in range(1, months + 1):
+            active = tenure >= month
+            last = tenure == month
+            interest = np.rint(balance * monthly_rate).astype(np.int64)
+            # The final instalment retires whatever is left; before it the
+            # EMI's principal share never overshoots the balance
+            principal_part = np.where(last, balance, np.clip(emi - interest, 0, balance))
+            balance = np.where(active, balance - principal_part, balance)
+            yield month - 1, active, principal_part + interest, principal_part, interest, balance
@@ -0,0 +1,310 @@
+from sqlalchemy import and_, bindparam, func, insert, select, update
+from sqlalchemy.orm import Session
+from app.database import SessionLocal, engine, is_memory_sqlite, get_settings
+from app.models.reconciliation_state import ReconciliationState
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.models.wallet import Wallet
+from app.money import Money
+from app.services.transaction_service import ledger_sum, signed_amount
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+import logging
+import time
+
+settings = get_settings()
+logger = logging.getLogger("app.reconciliation")
+
+# Builds the WHERE clause selecting a batch of users on a user_id column
+UserFilter = Callable[..., object]
+
+
+class ReconciliationService:
+    """
+    Ledger vs wallet reconciliation
+
+    Verifies for every user that wallets.balance equals the signed sum
+    (CREDIT - DEBIT) of their transactions, and reports any drift.
+
+    Key Principles:
+    1. Incremental: a per-user high-water mark (ReconciliationState)
+       means each run folds in only transactions newer than the last run
+    2. Each batch reads wallets and the ledger from one snapshot, so
+       concurrent payments cannot show up as drift
+    3. Drift found incrementally is confirmed by refolding that user's
+       whole ledger before it is reported (a transaction that committed
+       behind the high-water mark heals itself this way)
+    4. Users are split into id ranges reconciled in parallel processes
+    5. Full-rebuild mode ignores the stored state, for audits
+    """
+
+    BATCH_SIZE = 1000
+    # Id ranges per worker, so one dense range doesn't leave workers idle
+    RANGES_PER_WORKER = 4
+
+    @staticmethod
+    def begin_snapshot(db: Session) -> None:
+        """Make the reads that follow see a single consistent snapshot"""
+        # Isolation can only be set as the first statement of a transaction
+        db.rollback()
+        connection = db.connection()
+        dialect = connection.dialect.name
+        if dialect == "postgresql":
+            connection.exec_driver_sql("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        elif dialect == "sqlite":
+            # pysqlite doesn't BEGIN before a SELECT; without this every
+            # statement would see the database as of a different commit
+            connection.exec_driver_sql("BEGIN")
+
+    @staticmethod
+    def _read_batch(db: Session, users: UserFilter, incremental: bool) -> tuple:
+        """
+        Stored states, ledger rows to fold and wallet balances of a batch
+
+        Returns:
+            (states, tails, wallets) where tails maps
+            user_id -> (signed sum, row count, max transaction id)
+        """
+        state = ReconciliationState.__table__
+        ReconciliationService.begin_snapshot(db)
+        try:
+            states = {
+                row.user_id: row
+                for row in db.execute(
+                    select(state.c.user_id, state.c.last_transaction_id, state.c.ledger_balance, state.c.drift)
+                    .where(users(state.c.user_id))
+                )
+            }
+
+            fold = select(
+                User.id,
+                ledger_sum(signed_amount()),
+                func.count(Transaction.id),
+                func.max(Transaction.id),
+            ).select_from(User)
+            if incremental:
+                # Range seek on (user_id, id) past each user's high-water mark
+                fold = fold.outerjoin(state, state.c.user_id == User.id).join(
+                    Transaction,
+                    and_(
+                        Transaction.user_id == User.id,
+                        Transaction.id > func.coalesce(state.c.last_transaction_id, 0),
+                    ),
+                )
+            else:
+                fold = fold.join(Transaction, Transaction.user_id == User.id)
+            tails = {
+                user_id: (delta, count, last_id)
+                for user_id, delta, count, last_id in db.execute(
+                    fold.where(users(User.id)).group_by(User.id)
+                )
+            }
+
+            wallets = dict(
+                db.execute(select(Wallet.user_id, Wallet.balance).where(users(Wallet.user_id))).all()
+            )
+        finally:
+            # End the read snapshot before anything is written
+            db.rollback()
+        return states, tails, wallets
+
+    @staticmethod
+    def _evaluate(states: dict, tails: dict, wallets: dict, incremental: bool) -> Dict[int, dict]:
+        """New state of every user with a wallet, ledger rows or a stored state"""
+        results = {}
+        for user_id in set(states) | set(tails) | set(wallets):
+            prior = states.get(user_id) if incremental else None
+            delta, count, last_id = tails.get(user_id, (Money(0), 0, None))
+            ledger_balance = (prior.ledger_balance if prior else Money(0)) + delta
+            wallet_balance = wallets.get(user_id)
+            results[user_id] = {
+                "last_transaction_id": max(last_id or 0, prior.last_transaction_id if prior else 0),
+                "ledger_balance": ledger_balance,
+                "wallet_balance": wallet_balance,
+                "drift": (wallet_balance if wallet_balance is not None else Money(0)) - ledger_balance,
+                "folded": count,
+            }
+        return results
+
+    @staticmethod
+    def _save(db: Session, states: dict, results: Dict[int, dict]) -> None:
+        """Insert new states and update changed ones, in one short write transaction"""
+        now = datetime.utcnow()
+        inserts, updates = [], []
+        for user_id, result in results.items():
+            prior = states.get(user_id)
+            if prior is None:
+                inserts.append({
+                    "user_id": user_id,
+                    "last_transaction_id": result["last_transaction_id"],
+                    "ledger_balance": result["ledger_balance"],
+                    "drift": result["drift"],
+                    "updated_at": now,
+                })
+            elif (
+                prior.last_transaction_id != result["last_transaction_id"]
+                or prior.ledger_balance != result["ledger_balance"]
+                or prior.drift != result["drift"]
+            ):
+                updates.append({
+                    "state_user_id": user_id,
+                    "new_last_transaction_id": result["last_transaction_id"],
+                    "new_ledger_balance": result["ledger_balance"],
+                    "new_drift": result["drift"],
+                    "new_updated_at": now,
+                })
+
+        state = ReconciliationState.__table__
+        if inserts:
+            db.execute(insert(state), inserts)
+        if updates:
+            db.execute(
+                update(state)
+                .where(state.c.user_id == bindparam("state_user_id"))
+                .values(
+                    last_transaction_id=bindparam("new_last_transaction_id"),
+                    ledger_balance=bindparam("new_ledger_balance"),
+                    drift=bindparam("new_drift"),
+                    updated_at=bindparam("new_updated_at"),
+                ),
+                updates
+            )
+        db.commit()
+
+    @staticmethod
+    def reconcile_range(
+        low: int,
+        high: int,
+        full: bool = False,
+        batch_size: int = BATCH_SIZE
+    ) -> dict:
+        """
+        Reconcile every user with low <= id <= high, batch by batch
+
+        Runs in a worker process; each batch is read from one snapshot
+        and its state saved before the next batch starts.
+        """
+        report = {"users": 0, "transactions": 0, "refolded": 0, "drift": []}
+        db = SessionLocal()
+        try:
+            after_id = low - 1
+            while True:
+                user_ids = db.execute(
+                    select(User.id)
+                    .where(User.id > after_id, User.id <= high)
+                    .order_by(User.id)
+                    .limit(batch_size)
+                ).scalars().all()
+                if not user_ids:
+                    break
+                first, last = user_ids[0], user_ids[-1]
+                after_id = last
+
+                states, tails, wallets = ReconciliationService._read_batch(
+                    db, lambda column: column.between(first, last), incremental=not full
+                )
+                results = ReconciliationService._evaluate(states, tails, wallets, incremental=not full)
+                report["users"] += len(results)
+                report["transactions"] += sum(result["folded"] for result in results.values())
+
+                # New or changed drift; drift confirmed by an earlier run is
+                # reported again without another refold
+                suspects = [
+                    user_id for user_id, result in results.items()
+                    if result["drift"] != 0
+                    and (user_id not in states or states[user_id].drift != result["drift"])
+                ]
+                if suspects and not full:
+                    # Confirm against the user's whole ledger before flagging
+                    _, full_tails, full_wallets = ReconciliationService._read_batch(
+                        db, lambda column: column.in_(suspects), incremental=False
+                    )
+                    refolded = ReconciliationService._evaluate({}, full_tails, full_wallets, incremental=False)
+                    for user_id in suspects:
+                        results[user_id] = refolded.get(user_id, results[user_id])
+                    report["refolded"] += len(suspects)
+                    report["transactions"] += sum(refolded[user_id]["folded"] for user_id in refolded)
+
+                for user_id, result in sorted(results.items()):
+                    if result["drift"] != 0:
+                        report["drift"].append({
+                            "user_id": user_id,
+                            "wallet_balance": str(result["wallet_balance"]) if result["wallet_balance"] is not None else None,
+                            "ledger_balance": str(result["ledger_balance"]),
+                            "drift": str(result["drift"]),
+                            "last_transaction_id": result["last_transaction_id"] or None,
+                        })
+
+                ReconciliationService._save(db, states, results)
+        finally:
+            db.close()
+        return report
+
+    @staticmethod
+    def id_ranges(low: int, high: int, count: int) -> List[Tuple[int, int]]:
+        """Split [low, high] into at most `count` contiguous ranges"""
+        span = high - low + 1
+        count = max(1, min(count, span))
+        step = -(-span // count)
+        return [(start, min(start + step - 1, high)) for start in range(low, high + 1, step)]
+
+    @staticmethod
+    def run(
+        workers: int = 4,
+        full: bool = False,
+        batch_size: int = BATCH_SIZE
+    ) -> dict:
+        """
+        Reconcile all users across a process pool
+
+        Returns:
+            Users checked, transactions folded, rows/s and the drift list
+        """
+        db = SessionLocal()
+        try:
+            low, high = db.execute(select(func.min(User.id), func.max(User.id))).one()
+        finally:
+            db.close()
+
+        started = time.perf_counter()
+        shards: List[dict] = []
+        if low is not None:
+            ranges = ReconciliationService.id_ranges(
+                low, high, workers * ReconciliationService.RANGES_PER_WORKER
+            )
+            if workers <= 1 or is_memory_sqlite(settings.database_url):
+                # An in-memory database is private to this process
+                shards = [ReconciliationService.reconcile_range(a, b, full, batch_size) for a, b in ranges]
+            else:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                    shards = list(pool.map(
+                        ReconciliationService.reconcile_range,
+                        [a for a, _ in ranges],
+                        [b for _, b in ranges],
+                        [full] * len(ranges),
+                        [batch_size] * len(ranges)
+                    ))
+        elapsed = time.perf_counter() - started
+
+        drift = sorted((entry for shard in shards for entry in shard["drift"]), key=lambda e: e["user_id"])
+        for entry in drift:
+            logger.warning("ledger drift user_id=%s wallet=%s ledger=%s drift=%s",
+                           entry["user_id"], entry["wallet_balance"], entry["ledger_balance"], entry["drift"])
+
+        transactions = sum(shard["transactions"] for shard in shards)
+        return {
+            "mode": "full" if full else "incremental",
+            "users_checked": sum(shard["users"] for shard in shards),
+            "transactions_folded": transactions,
+            "users_refolded": sum(shard["refolded"] for shard in shards),
+            "drift_count": len(drift),
+            "drift": drift,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(transactions / elapsed) if elapsed else 0,
+        }
+
+
+def _init_worker():
+    # Never reuse connections inherited from the parent process
+    engine.dispose(close=False)
@@ -1,4 +1,7 @@
+from sqlalchemy import update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from app.models.repayment import Repayment, RepaymentType, RepaymentStatus
 from app.models.loan import Loan, LoanStatus
@@ -6,9 +9,72 @@ from app.models.transaction import TransactionType, TransactionSource
 from app.services.wallet_service import WalletService
 from app.services.transaction_service import TransactionService
 from app.services.loan_service import LoanService
+from app.services.pricing_service import PricingService
+from app.services.idempotency_service import idempotency_index
+from app.money import Money
+from app.metrics import repayments_total, repayment_amount_total
+from app.database import get_settings, read_replicas
+from dataclasses import dataclass
+from functools import lru_cache
 from decimal import Decimal
 from fastapi import HTTPException, status
-from typing import Tuple
+from typing import Optional, Tuple
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class ScheduleRow:
+    """One instalment of an amortisation schedule"""
+    month: int
+    payment: Money
+    principal: Money
+    interest: Money
+    balance: Money
+
+
+@dataclass(frozen=True)
+class Schedule:
+    """
+    Immutable amortisation schedule
+    
+    Cached and handed to every caller pricing the same loan, so it must
+    not be mutable: a caller editing it would corrupt the cache.
+    """
+    emi_amount: Money
+    total_interest: Money
+    total_amount: Money
+    tenure_months: int
+    installments: Tuple[ScheduleRow, ...]
+
+
+@lru_cache(maxsize=settings.schedule_cache_size)
+def _amortization_schedule(
+    principal: Money,
+    annual_rate: Decimal,
+    tenure_months: int
+) -> Schedule:
+    tables = PricingService.amortization_tables([principal], [annual_rate], [tenure_months])
+    installments = tuple(
+        ScheduleRow(
+            month=month + 1,
+            payment=Money(tables["payment_cents"][0, month]),
+            principal=Money(tables["principal_cents"][0, month]),
+            interest=Money(tables["interest_cents"][0, month]),
+            balance=Money(tables["balance_cents"][0, month]),
+        )
+        for month in range(tenure_months)
+    )
+    # Same EMI as LoanService.calculate_emi; the final instalment absorbs
+    # its rounding, so the total is the sum of the payments
+    total_amount = Money(int(tables["payment_cents"][0].sum()))
+    return Schedule(
+        emi_amount=Money(tables["payment_cents"][0, 0]),
+        total_interest=total_amount - principal,
+        total_amount=total_amount,
+        tenure_months=tenure_months,
+        installments=installments,
+    )
 
 
 class RepaymentService:
@@ -27,7 +93,7 @@ class RepaymentService:
         db: Session,
         user_id: int,
         loan_id: int,
-        amount: Decimal,
+        amount: Money,
         idempotency_key: str
     ) -> Tuple[Repayment, Loan]:
         """
@@ -37,7 +103,8 @@ class RepaymentService:
         1. Check idempotency (prevent duplicate payments)
         2. Validate loan and amount
         3. Debit wallet
-        4. Update loan outstanding
+        4. Update loan outstanding (conditional UPDATE, 409 if a
+           concurrent repayment got there first)
         5. Create repayment record
         6. Create transaction ledger entry
         7. Close loan if fully paid
@@ -46,11 +113,13 @@ class RepaymentService:
             idempotency_key: Client-generated unique key to prevent duplicate payments
         """
         
-        # Step 1: Check idempotency - if already processed, return existing
+        # Step 1: Check idempotency - if already processed, return existing.
+        # Keys the Bloom filter has never seen skip the lookup; a retry of
+        # a key committed elsewhere is caught by the re-check on rejection
+        # below or by the unique index at flush time.
+        looked_up = idempotency_index.may_exist(idempotency_key)
         existing_repayment = (
-            db.query(Repayment)
-            .filter(Repayment.idempotency_key == idempotency_key)
-            .first()
+            RepaymentService._find_by_idempotency_key(db, idempotency_key) if looked_up else None
         )
         
         if existing_repayment:
@@ -58,38 +127,56 @@ class RepaymentService:
             return existing_repayment, loan
 
         # Step 2: Validate loan
-        loan = LoanService.get_loan_by_id(db, loan_id)
-        
-        if loan.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to repay this loan"
-            )
+        amount = Money.parse(amount)
+        try:
+            loan = LoanService.get_loan_by_id(db, loan_id)
+            
+            if loan.user_id != user_id:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not authorized to repay this loan"
+                )
 
-        if loan.status != LoanStatus.ACTIVE:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Cannot repay loan in {loan.status} state"
-            )
+            if loan.status != LoanStatus.ACTIVE:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Cannot repay loan in {loan.status} state"
+                )
 
-        if amount <= 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Repayment amount must be positive"
-            )
+            if amount <= 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Repayment amount must be positive"
+                )
 
-        if amount > loan.outstanding_amount:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Repayment amount ({amount}) exceeds outstanding ({loan.outstanding_amount})"
-            )
+            if amount > loan.outstanding_amount:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Repayment amount ({amount}) exceeds outstanding ({loan.outstanding_amount})"
+                )
 
-        try:
-            # Step 3: Debit wallet
+            # Step 3: Debit wallet (atomic conditional UPDATE)
             WalletService.debit_wallet(db, user_id, amount)
 
-            # Step 4: Update loan outstanding
-            loan.outstanding_amount -= amount
+            # Step 4: Update loan outstanding (atomic conditional UPDATE):
+            # a concurrent repayment can neither be lost nor overpay
+            updated = db.execute(
+                update(Loan)
+                .where(
+                    Loan.id == loan_id,
+                    Loan.status == LoanStatus.ACTIVE,
+                    Loan.outstanding_amount >= amount
+                )
+                .values(outstanding_amount=Loan.outstanding_amount - amount)
+                .returning(Loan.outstanding_amount)
+                .execution_options(synchronize_session=False)
+            ).one_or_none()
+            if updated is None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Loan was repaid concurrently; its outstanding is now below the repayment amount or it is closed"
+                )
+            set_committed_value(loan, "outstanding_amount", updated.outstanding_amount)
             
             # Determine repayment type
             repayment_type = (
@@ -122,9 +209,14 @@ class RepaymentService:
             # Step 7: Close loan if fully paid
             if loan.outstanding_amount == 0:
                 loan.status = LoanStatus.CLOSED
+                LoanService.stage_status_event(db, loan)
 
             # Commit entire transaction
             db.commit()
+            idempotency_index.add_known(idempotency_key)
+            repayments_total.inc(1, repayment_type.value)
+            repayment_amount_total.inc(amount / Money.SCALE)
+            read_replicas.pin_to_primary(user_id)
             db.refresh(repayment)
             db.refresh(loan)
             
@@ -134,11 +226,7 @@ class RepaymentService:
             db.rollback()
             # Idempotency key violation - return existing
             if "idempotency_key" in str(e):
-                existing = (
-                    db.query(Repayment)
-                    .filter(Repayment.idempotency_key == idempotency_key)
-                    .first()
-                )
+                existing = RepaymentService._find_by_idempotency_key(db, idempotency_key)
                 if existing:
                     loan = LoanService.get_loan_by_id(db, existing.loan_id)
                     return existing, loan
@@ -146,6 +234,19 @@ class RepaymentService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Repayment failed: {str(e)}"
             )
+        except HTTPException:
+            # Business rule rejections (e.g. insufficient balance) keep their status
+            db.rollback()
+            if not looked_up:
+                # A retry of a repayment this worker's filter never saw
+                # (another worker, the auto-debit job) fails validation -
+                # loan closed, balance spent - before reaching the unique
+                # index: answer it with the original result, not a 400
+                existing = RepaymentService._find_by_idempotency_key(db, idempotency_key)
+                if existing:
+                    loan = LoanService.get_loan_by_id(db, existing.loan_id)
+                    return existing, loan
+            raise
         except Exception as e:
             db.rollback()
             raise HTTPException(
@@ -153,6 +254,14 @@ class RepaymentService:
                 detail=f"Repayment failed: {str(e)}"
             )
 
+    @staticmethod
+    def _find_by_idempotency_key(db: Session, idempotency_key: str) -> Optional[Repayment]:
+        return (
+            db.query(Repayment)
+            .filter(Repayment.idempotency_key == idempotency_key)
+            .first()
+        )
+
     @staticmethod
     def get_loan_repayments(db: Session, loan_id: int) -> list[Repayment]:
         """Get all repayments for a loan"""
@@ -165,7 +274,7 @@ class RepaymentService:
 
     @staticmethod
     def calculate_emi_schedule(
-        principal: Decimal,
+        principal: Money,
         annual_rate: Decimal,
         tenure_months: int
     ) -> dict:
@@ -174,8 +283,9 @@ class RepaymentService:
         
         Returns schedule information for display
         """
+        principal = Money.parse(principal)
         emi = LoanService.calculate_emi(principal, annual_rate, tenure_months)
-        total_amount = emi * tenure_months
+        total_amount = LoanService.calculate_total_amount(principal, annual_rate, tenure_months)
         total_interest = total_amount - principal
 
         return {
@@ -184,3 +294,54 @@ class RepaymentService:
             "total_amount": total_amount,
             "tenure_months": tenure_months
         }
+
+    @staticmethod
+    def calculate_amortization_schedule(
+        principal: Money,
+        annual_rate: Decimal,
+        tenure_months: int
+    ) -> Schedule:
+        """
+        Full amortisation schedule: per-instalment payment, principal,
+        interest and closing balance
+        
+        Memoised in a bounded LRU keyed by (principal, rate, tenure),
+        since the same loan products are priced over and over; the
+        result is shared between callers and immutable.
+        """
+        return _amortization_schedule(Money.parse(principal), annual_rate, tenure_months)
+
+    @staticmethod
+    def schedule_cache_stats() -> dict:
+        """Size and hit-rate of the amortisation schedule cache"""
+        info = _amortization_schedule.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "size": info.currsize,
+            "max_size": info.maxsize,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class AsyncRepaymentService:
+    """
+    Async facade over RepaymentService for AsyncSession callers (ASYNC_MODE).
+    """
+
+    @staticmethod
+    async def make_repayment(
+        db: AsyncSession,
+        user_id: int,
+        loan_id: int,
+        amount: Money,
+        idempotency_key: str
+    ) -> Tuple[Repayment, Loan]:
+        return await db.run_sync(
+            RepaymentService.make_repayment, user_id, loan_id, amount, idempotency_key
+        )
+
+    @staticmethod
+    async def get_loan_repayments(db: AsyncSession, loan_id: int) -> list[Repayment]:
+        return await db.run_sync(RepaymentService.get_loan_repayments, loan_id)
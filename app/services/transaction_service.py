@@ -1,7 +1,92 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.transaction import Transaction, TransactionType, TransactionSource
-from decimal import Decimal
-from typing import List
+from app.models.wallet import Wallet
+from app.money import Money, MoneyType
+from app.schemas.transaction import TransactionRow
+from sqlalchemy import Row, and_, case, func, or_, select, update
+from datetime import datetime
+from fastapi import HTTPException, status
+from typing import Iterator, List, Optional, Tuple
+import base64
+import csv
+import hashlib
+import io
+import json
+
+# Session.info key: {user_id: wallets.last_hash} returned by the balance
+# UPDATE of this transaction, so the ledger insert needs no extra read
+LEDGER_HEADS = "ledger_heads"
+
+# Compact, deterministic JSON for hashing (one encoder, reused)
+_canonical_json = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def signed_amount():
+    """SQL expression: +amount for credits, -amount for debits"""
+    return case(
+        (Transaction.type == TransactionType.CREDIT, Transaction.amount),
+        else_=-Transaction.amount,
+    )
+
+
+def ledger_sum(expression):
+    """SUM over ledger amounts, read back as Money (0 when there are no rows)"""
+    return func.coalesce(func.sum(expression, type_=MoneyType()), Money(0), type_=MoneyType())
+
+
+def ledger_timestamp() -> datetime:
+    """
+    created_at for a new ledger row: naive UTC, whole seconds
+
+    Assigned before insert (not by the database) so it can be hashed;
+    second precision is what LedgerTimestamp stores on SQLite, so the
+    value reads back exactly as it was hashed.
+    """
+    return datetime.utcnow().replace(microsecond=0)
+
+
+def ledger_hash(
+    prev_hash: Optional[str],
+    user_id: int,
+    amount: Money,
+    transaction_type: TransactionType,
+    source: TransactionSource,
+    reference_id: Optional[str],
+    description: Optional[str],
+    created_at: Optional[datetime]
+) -> str:
+    """
+    SHA-256 link of a user's ledger hash chain
+
+    Covers the row's business fields, its created_at (balance_as_of,
+    checkpoints and exports select rows by it, so back- or forward-dating
+    a row must break the chain) and the hash of the user's previous row.
+    id is assigned by the database and not part of it; chain order is id
+    order within a user, which the prev_hash links already pin down.
+    """
+    payload = _canonical_json([
+        prev_hash, user_id, int(amount), transaction_type.value, source.value, reference_id, description,
+        None if created_at is None else created_at.isoformat(sep=" "),
+    ])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def remember_ledger_head(db: Session, user_id: int, last_hash: Optional[str]) -> None:
+    """Record the chain head read back by a wallet balance UPDATE"""
+    db.info.setdefault(LEDGER_HEADS, {})[user_id] = last_hash
+
+
+def fetch_dicts(db: Session, statement) -> List[dict]:
+    """
+    Rows of a column SELECT as plain dicts, for read-only responses
+
+    Runs on the session's connection: no ORM result processing, no
+    entities, nothing added to the identity map.
+    """
+    result = db.connection().execute(statement)
+    keys = tuple(result.keys())
+    return [dict(zip(keys, row)) for row in result]
 
 
 class TransactionService:
@@ -15,13 +100,15 @@ class TransactionService:
     1. Append-only: No updates or deletes
     2. Complete audit trail
     3. Reconciliation ready
+    4. Tamper-evident: every entry is hash-chained to the user's previous
+       one, with the chain head cached in wallets.last_hash
     """
 
     @staticmethod
     def create_transaction(
         db: Session,
         user_id: int,
-        amount: Decimal,
+        amount: Money,
         transaction_type: TransactionType,
         source: TransactionSource,
         reference_id: str,
@@ -32,34 +119,276 @@ class TransactionService:
         
         This method is called by other services (loan, repayment)
         to record every money movement in the system.
+        
+        The entry is chained to wallets.last_hash. Callers move the
+        balance first (WalletService.credit_wallet/debit_wallet), whose
+        UPDATE ... RETURNING already hands back the head and keeps the
+        wallet row locked until commit; otherwise the row is locked and
+        read here. Advancing the head is a compare-and-set, so two
+        writers can never chain onto the same row.
         """
+        amount = Money.parse(amount)
+        heads = db.info.get(LEDGER_HEADS)
+        if heads and user_id in heads:
+            prev_hash = heads.pop(user_id)
+        else:
+            wallet = db.execute(
+                select(Wallet.last_hash).where(Wallet.user_id == user_id).with_for_update()
+            ).one_or_none()
+            if wallet is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Wallet not found"
+                )
+            prev_hash = wallet.last_hash
+
+        created_at = ledger_timestamp()
+        new_hash = ledger_hash(
+            prev_hash, user_id, amount, transaction_type, source, reference_id, description, created_at
+        )
+        advanced = db.execute(
+            update(Wallet)
+            .where(Wallet.user_id == user_id, Wallet.last_hash.is_not_distinct_from(prev_hash))
+            .values(last_hash=new_hash)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if advanced != 1:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Concurrent ledger write, please retry"
+            )
+
         transaction = Transaction(
             user_id=user_id,
             amount=amount,
             type=transaction_type,
             source=source,
             reference_id=reference_id,
-            description=description
+            description=description,
+            created_at=created_at,
+            prev_hash=prev_hash,
+            hash=new_hash
         )
         db.add(transaction)
         db.flush()  # Get the ID but don't commit yet
         return transaction
 
+    # Hard cap on a single page of history
+    MAX_PAGE_SIZE = 200
+
+    @staticmethod
+    def encode_cursor(created_at: datetime, transaction_id: int) -> str:
+        """Opaque keyset cursor pointing just past the given transaction"""
+        raw = f"{created_at.isoformat()}|{transaction_id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        """
+        Decode a keyset cursor into (created_at, id)
+        
+        Raises:
+            HTTPException: If the cursor is malformed
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            created_at, transaction_id = (
+                base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+            )
+            return datetime.fromisoformat(created_at), int(transaction_id)
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
     @staticmethod
     def get_user_transactions(
         db: Session,
         user_id: int,
         limit: int = 100
     ) -> List[Transaction]:
-        """Get transaction history for a user"""
+        """Get the most recent transactions for a user"""
+        limit = min(limit, TransactionService.MAX_PAGE_SIZE)
         return (
             db.query(Transaction)
             .filter(Transaction.user_id == user_id)
-            .order_by(Transaction.created_at.desc())
+            .order_by(Transaction.created_at.desc(), Transaction.id.desc())
             .limit(limit)
             .all()
         )
 
+    @staticmethod
+    def get_user_transactions_page(
+        db: Session,
+        user_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Transaction], Optional[str]]:
+        """
+        Keyset-paginated transaction history, newest first
+        
+        Seeks on (user_id, created_at DESC, id DESC) instead of using
+        OFFSET, so every page costs the same regardless of history depth.
+        
+        Returns:
+            (transactions, next_cursor) - next_cursor is None on the last page
+        """
+        limit = min(limit, TransactionService.MAX_PAGE_SIZE)
+        rows = db.execute(
+            TransactionService._page_query(select(Transaction), user_id, limit, cursor)
+        ).scalars().all()
+
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, TransactionService.encode_cursor(rows[-1].created_at, rows[-1].id)
+        return rows, None
+
+    # Columns of TransactionResponse, selected by the read-only page path
+    RESPONSE_COLUMNS = tuple(getattr(Transaction, name) for name in TransactionRow.__annotations__)
+
+    @staticmethod
+    def get_user_transaction_rows_page(
+        db: Session,
+        user_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Same page as get_user_transactions_page, as plain TransactionRow dicts
+
+        For read-only responses: selects only the response columns as
+        tuples, so no ORM objects are built or tracked in the identity map.
+        """
+        limit = min(limit, TransactionService.MAX_PAGE_SIZE)
+        rows = fetch_dicts(db, TransactionService._page_query(
+            select(*TransactionService.RESPONSE_COLUMNS), user_id, limit, cursor
+        ))
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = TransactionService.encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return rows, next_cursor
+
+    @staticmethod
+    def _page_query(query, user_id: int, limit: int, cursor: Optional[str]):
+        """Keyset page of the user's history, plus one row to detect a next page"""
+        query = query.where(Transaction.user_id == user_id)
+        if cursor:
+            created_at, transaction_id = TransactionService.decode_cursor(cursor)
+            query = query.where(
+                or_(
+                    Transaction.created_at < created_at,
+                    and_(
+                        Transaction.created_at == created_at,
+                        Transaction.id < transaction_id
+                    )
+                )
+            )
+        return query.order_by(Transaction.created_at.desc(), Transaction.id.desc()).limit(limit + 1)
+
+    @staticmethod
+    def ledger_version(db: Session, user_id: int) -> Optional[Row]:
+        """
+        (balance, last_hash) of the user's wallet, or None without one
+
+        Every ledger insert moves the wallet's hash-chain head in the same
+        transaction, so this one-row read identifies the state of the
+        user's whole history without touching the transactions table.
+        """
+        return db.execute(
+            select(Wallet.balance, Wallet.last_hash).where(Wallet.user_id == user_id)
+        ).one_or_none()
+
+    # Columns (and order) of a ledger export
+    EXPORT_COLUMNS = (
+        "id", "user_id", "amount", "type", "source",
+        "reference_id", "description", "created_at",
+    )
+
+    @staticmethod
+    def iter_ledger(
+        db: Session,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        user_id: Optional[int] = None,
+        source: Optional[TransactionSource] = None,
+        batch_size: int = 5000
+    ) -> Iterator[List[Row]]:
+        """
+        Stream ledger rows in id order, one batch at a time
+        
+        Selects plain column tuples (no ORM identity map) through a
+        server-side cursor (stream_results/yield_per), so memory stays
+        flat no matter how many rows match.
+        """
+        columns = [getattr(Transaction, name) for name in TransactionService.EXPORT_COLUMNS]
+        query = select(*columns)
+        if start is not None:
+            query = query.where(Transaction.created_at >= start)
+        if end is not None:
+            query = query.where(Transaction.created_at < end)
+        if user_id is not None:
+            query = query.where(Transaction.user_id == user_id)
+        if source is not None:
+            query = query.where(Transaction.source == source)
+
+        result = db.execute(
+            query.order_by(Transaction.id).execution_options(
+                stream_results=True,
+                yield_per=batch_size
+            )
+        )
+        yield from result.partitions()
+
+    @staticmethod
+    def export_ledger(
+        db: Session,
+        export_format: str = "ndjson",
+        **filters
+    ) -> Iterator[str]:
+        """
+        Serialise the ledger as NDJSON or CSV, one text chunk per batch
+        
+        Accepts the same filters as iter_ledger.
+        """
+        columns = TransactionService.EXPORT_COLUMNS
+
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            yield buffer.getvalue()
+            for batch in TransactionService.iter_ledger(db, **filters):
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(
+                    (
+                        row.id, row.user_id, row.amount, row.type.value, row.source.value,
+                        row.reference_id, row.description,
+                        row.created_at.isoformat() if row.created_at else None,
+                    )
+                    for row in batch
+                )
+                yield buffer.getvalue()
+            return
+
+        for batch in TransactionService.iter_ledger(db, **filters):
+            yield "".join(
+                json.dumps({
+                    "id": row.id,
+                    "user_id": row.user_id,
+                    "amount": str(row.amount),
+                    "type": row.type.value,
+                    "source": row.source.value,
+                    "reference_id": row.reference_id,
+                    "description": row.description,
+                    "created_at": row.created_at.isoformat() if row.created_at else None,
+                }) + "\n"
+                for row in batch
+            )
+
     @staticmethod
     def get_transaction_by_reference(
         db: Session,
@@ -75,3 +404,58 @@ class TransactionService:
             )
             .first()
         )
+
+
+class AsyncTransactionService:
+    """
+    Async facade over TransactionService for AsyncSession callers (ASYNC_MODE).
+    """
+
+    @staticmethod
+    async def create_transaction(
+        db: AsyncSession,
+        user_id: int,
+        amount: Money,
+        transaction_type: TransactionType,
+        source: TransactionSource,
+        reference_id: str,
+        description: str = ""
+    ) -> Transaction:
+        return await db.run_sync(
+            TransactionService.create_transaction,
+            user_id, amount, transaction_type, source, reference_id, description
+        )
+
+    @staticmethod
+    async def get_user_transactions(
+        db: AsyncSession,
+        user_id: int,
+        limit: int = 100
+    ) -> List[Transaction]:
+        return await db.run_sync(TransactionService.get_user_transactions, user_id, limit)
+
+    @staticmethod
+    async def get_user_transactions_page(
+        db: AsyncSession,
+        user_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Transaction], Optional[str]]:
+        return await db.run_sync(
+            TransactionService.get_user_transactions_page, user_id, limit, cursor
+        )
+
+    @staticmethod
+    async def get_user_transaction_rows_page(
+        db: AsyncSession,
+        user_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        return await db.run_sync(
+            TransactionService.get_user_transaction_rows_page, user_id, limit, cursor
+        )
+
+    @staticmethod
+    async def ledger_version(db: AsyncSession, user_id: int) -> Optional[Row]:
+        return await db.run_sync(TransactionService.ledger_version, user_id)
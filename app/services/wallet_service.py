@@ -1,11 +1,33 @@
+from sqlalchemy import update
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from app.models.wallet import Wallet
 from app.models.user import User
-from decimal import Decimal
+from app.money import Money
+from app.metrics import wallet_debits_rejected_total
+from app.events import stage_event
+from app.services.transaction_service import remember_ledger_head
 from fastapi import HTTPException, status
 
 
+class InsufficientBalance(HTTPException):
+    """
+    The wallet balance doesn't cover a debit
+
+    A 400 to API clients like any other rejection; batch callers (the
+    auto-debit job) catch this type instead of parsing the detail.
+    """
+
+    def __init__(self, available: Money, required: Money):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Insufficient balance. Available: {available}, Required: {required}"
+        )
+        self.available = available
+        self.required = required
+
+
 class WalletService:
     """
     Wallet Service - Manages user wallet balances
@@ -14,6 +36,8 @@ class WalletService:
     1. Balance can never be negative (enforced by DB constraint)
     2. All balance changes must be transactional
     3. Balance changes must create transaction ledger entries
+    4. Every committed balance change is pushed to the user's open
+       event streams (app/events.py)
     """
 
     @staticmethod
@@ -21,7 +45,7 @@ class WalletService:
         """
         Create a wallet for a new user with zero balance
         """
-        wallet = Wallet(user_id=user_id, balance=Decimal("0.00"))
+        wallet = Wallet(user_id=user_id, balance=Money(0))
         db.add(wallet)
         db.flush()
         return wallet
@@ -41,67 +65,104 @@ class WalletService:
     def credit_wallet(
         db: Session,
         user_id: int,
-        amount: Decimal
-    ) -> Wallet:
+        amount: Money
+    ) -> Money:
         """
         Credit amount to wallet (used during loan disbursement)
         
+        Single-statement balance update:
+            UPDATE wallets SET balance = balance + :amt
+            WHERE user_id = :uid RETURNING balance, last_hash
+        
         This method MUST be called within a transaction that also
         creates a ledger entry.
+        
+        Returns:
+            The new wallet balance
         """
+        amount = Money.parse(amount)
         if amount <= 0:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Credit amount must be positive"
             )
 
-        wallet = WalletService.get_wallet(db, user_id)
-        wallet.balance += amount
-        db.flush()
-        return wallet
+        wallet = db.execute(
+            update(Wallet)
+            .where(Wallet.user_id == user_id)
+            .values(balance=Wallet.balance + amount)
+            .returning(Wallet.balance, Wallet.last_hash)
+        ).one_or_none()
+
+        if wallet is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Wallet not found"
+            )
+        # The ledger entry that follows chains onto this head
+        remember_ledger_head(db, user_id, wallet.last_hash)
+        stage_event(db, user_id, "wallet.balance", balance=str(wallet.balance))
+        return wallet.balance
 
     @staticmethod
     def debit_wallet(
         db: Session,
         user_id: int,
-        amount: Decimal
-    ) -> Wallet:
+        amount: Money
+    ) -> Money:
         """
         Debit amount from wallet (used during repayment)
         
+        Single-statement conditional balance update:
+            UPDATE wallets SET balance = balance - :amt
+            WHERE user_id = :uid AND balance >= :amt
+            RETURNING balance, last_hash
+        
+        The balance check and the write happen atomically in the database,
+        so concurrent debits cannot lose updates or overdraw the wallet.
+        
         This method MUST be called within a transaction that also
         creates a ledger entry.
         
+        Returns:
+            The new wallet balance
+        
         Raises:
-            HTTPException: If insufficient balance
+            InsufficientBalance: If the balance doesn't cover the amount
         """
+        amount = Money.parse(amount)
         if amount <= 0:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Debit amount must be positive"
             )
 
-        wallet = WalletService.get_wallet(db, user_id)
-        
-        if wallet.balance < amount:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient balance. Available: {wallet.balance}, Required: {amount}"
-            )
-
-        wallet.balance -= amount
-        
-        # DB constraint will raise error if balance goes negative
         try:
-            db.flush()
+            wallet = db.execute(
+                update(Wallet)
+                .where(Wallet.user_id == user_id, Wallet.balance >= amount)
+                .values(balance=Wallet.balance - amount)
+                .returning(Wallet.balance, Wallet.last_hash)
+            ).one_or_none()
         except IntegrityError:
+            # DB constraint is the last line of defence against negative balances
             db.rollback()
+            wallet_debits_rejected_total.inc(1, "negative_balance")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Transaction would result in negative balance"
             )
-        
-        return wallet
+
+        if wallet is None:
+            # No row matched: either the wallet is missing or the balance
+            # is too low. Only the failure path pays for the extra read.
+            wallet = WalletService.get_wallet(db, user_id)
+            wallet_debits_rejected_total.inc(1, "insufficient_balance")
+            raise InsufficientBalance(wallet.balance, amount)
+
+        remember_ledger_head(db, user_id, wallet.last_hash)
+        stage_event(db, user_id, "wallet.balance", balance=str(wallet.balance))
+        return wallet.balance
 
     @staticmethod
     def check_wallet_activity(db: Session, user_id: int) -> bool:
@@ -116,3 +177,24 @@ class WalletService:
         wallet = WalletService.get_wallet(db, user_id)
         # Simple mock: wallet exists = eligible
         return wallet is not None
+
+
+class AsyncWalletService:
+    """
+    Async facade over WalletService for AsyncSession callers (ASYNC_MODE).
+    
+    Business logic runs unchanged inside AsyncSession.run_sync, so the
+    sync and async modes share a single implementation.
+    """
+
+    @staticmethod
+    async def get_wallet(db: AsyncSession, user_id: int) -> Wallet:
+        return await db.run_sync(WalletService.get_wallet, user_id)
+
+    @staticmethod
+    async def credit_wallet(db: AsyncSession, user_id: int, amount: Money) -> Money:
+        return await db.run_sync(WalletService.credit_wallet, user_id, amount)
+
+    @staticmethod
+    async def debit_wallet(db: AsyncSession, user_id: int, amount: Money) -> Money:
+        return await db.run_sync(WalletService.debit_wallet, user_id, amount)
@@ -0,0 +1,128 @@
+"""
+Sync vs async mode latency benchmark
+
+Starts the API twice under uvicorn (ASYNC_MODE=false, then true) against a
+fresh SQLite database, drives it with N concurrent clients hitting the
+authenticated read paths, and reports p50/p99 latency and requests/s.
+
+Install: pip install httpx aiosqlite
+
+Usage:
+    python benchmarks/async_vs_sync.py [--clients 500] [--duration 15]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATHS = ["/api/wallet/balance", "/api/wallet/transactions?limit=20", "/api/loans/my-loans"]
+
+
+def start_server(port: int, async_mode: bool, database_url: str) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=database_url, ASYNC_MODE=str(async_mode).lower())
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+    )
+
+
+async def wait_until_up(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{base_url}/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+async def register(base_url: str) -> dict:
+    async with httpx.AsyncClient() as client:
+        response = await client.post(
+            f"{base_url}/api/auth/register",
+            json={"name": "Bench", "email": f"bench.{time.time_ns()}@example.com", "password": "benchpass123"},
+        )
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def run_load(base_url: str, headers: dict, clients: int, duration: float) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker(offset: int):
+            nonlocal errors
+            i = offset
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(PATHS[i % len(PATHS)])
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+                i += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": quantiles[49] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+    }
+
+
+async def bench_mode(async_mode: bool, port: int, clients: int, duration: float) -> dict:
+    tmpdir = tempfile.mkdtemp(prefix="bench_async_")
+    server = start_server(port, async_mode, f"sqlite:///{tmpdir}/bench.db")
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        await wait_until_up(base_url)
+        headers = await register(base_url)
+        return await run_load(base_url, headers, clients, duration)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sync and async request handling")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds of load per mode")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for async_mode in (False, True):
+        result = asyncio.run(bench_mode(async_mode, args.port, args.clients, args.duration))
+        print(
+            f"{'async' if async_mode else 'sync':<6} {result['requests']:>9} {result['errors']:>7} "
+            f"{result['rps']:>9.0f} {result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Point-in-time balance benchmark
+
+Fills a throwaway SQLite ledger with one user's history spread over
+--days days, then times BalanceCheckpointService.balance_as_of (the code
+path behind /api/wallet/balance/as-of) at random points in time, first
+with no checkpoints (full ledger scan) and then after a daily
+checkpoint run. Every answer is checked against the full-scan result.
+
+Usage:
+    python benchmarks/balance_as_of.py [--rows 500000] [--days 365] [--queries 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if "DATABASE_URL" not in os.environ:
+    _tmpdir = tempfile.mkdtemp(prefix="balance_as_of_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/ledger.db"
+
+from sqlalchemy import insert  # noqa: E402
+from app.database import SessionLocal, engine, init_db  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.models.transaction import Transaction, TransactionType, TransactionSource  # noqa: E402
+from app.money import Money  # noqa: E402
+from app.services.balance_checkpoint_service import BalanceCheckpointService  # noqa: E402
+
+START = datetime(2025, 1, 1)
+
+
+def generate(rows: int, days: int, batch: int = 50_000) -> int:
+    """Bulk-insert one user's ledger, evenly spread over `days`"""
+    db = SessionLocal()
+    try:
+        user = User(name="Time Traveller", email="asof@example.com", hashed_password="x", role=UserRole.USER)
+        db.add(user)
+        db.commit()
+        user_id = user.id
+    finally:
+        db.close()
+
+    step = timedelta(days=days) / rows
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch):
+            conn.execute(
+                insert(Transaction),
+                [
+                    {
+                        "user_id": user_id,
+                        "amount": Money(100 + n % 997),
+                        "type": TransactionType.DEBIT if n % 3 == 0 else TransactionType.CREDIT,
+                        "source": TransactionSource.WALLET_TOPUP,
+                        "created_at": START + step * n,
+                    }
+                    for n in range(offset, min(offset + batch, rows))
+                ],
+            )
+    return user_id
+
+
+def time_queries(user_id: int, points: list) -> tuple:
+    db = SessionLocal()
+    try:
+        answers, tails = [], []
+        started = time.perf_counter()
+        for at in points:
+            result = BalanceCheckpointService.balance_as_of(db, user_id, at)
+            answers.append(result["balance"])
+            tails.append(result["tail_transactions"])
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+    return answers, elapsed, sum(tails) / len(tails)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark point-in-time balance queries")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    init_db()
+    print(f"Generating {args.rows} ledger rows over {args.days} days...")
+    user_id = generate(args.rows, args.days)
+
+    rng = random.Random(7)
+    points = [START + timedelta(seconds=rng.uniform(0, args.days * 86400)) for _ in range(args.queries)]
+
+    full, full_seconds, full_tail = time_queries(user_id, points)
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        for day in range(1, args.days + 1):
+            BalanceCheckpointService.create_checkpoints(db, cutoff=START + timedelta(days=day))
+        checkpoint_seconds = time.perf_counter() - started
+    finally:
+        db.close()
+
+    tailed, tail_seconds, tail_rows = time_queries(user_id, points)
+    mismatches = sum(1 for a, b in zip(full, tailed) if a != b)
+
+    print(f"Daily checkpoints:      {args.days} runs in {checkpoint_seconds:.2f}s")
+    print(f"Full ledger scan:       {full_seconds / args.queries * 1000:8.2f} ms/query ({full_tail:,.0f} rows read)")
+    print(f"Checkpoint + tail:      {tail_seconds / args.queries * 1000:8.2f} ms/query ({tail_rows:,.0f} rows read)")
+    print(f"Speedup:                {full_seconds / tail_seconds:.1f}x")
+    print(f"Mismatches:             {mismatches} of {args.queries}")
+
+
+if __name__ == "__main__":
+    main()
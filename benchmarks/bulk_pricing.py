@@ -0,0 +1,95 @@
+"""
+Bulk EMI pricing benchmark
+
+Re-prices N random loans with the scalar LoanService.calculate_emi loop
+and with the vectorised PricingService, checks both agree to the cent,
+and times amortisation-table generation. Also checks, on zero-rate and
+tiny-principal edge cases, that schedules repay principal + total
+interest, no balance goes negative and zero-rate loans repay exactly
+their principal.
+
+Usage:
+    python benchmarks/bulk_pricing.py [--loans 1000000] [--scalar-sample 100000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from decimal import Decimal
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.money import Money  # noqa: E402
+from app.services.loan_service import LoanService  # noqa: E402
+from app.services.pricing_service import PricingService  # noqa: E402
+
+
+def check_edge_cases() -> int:
+    """Schedules breaking a pricing invariant (0 when all hold)"""
+    principal_cents = np.array([1, 130, 999, 1_000_000, 1_000_000, 100_000_000, 3_333_333] * 3)
+    rates = np.repeat([0.0, 0.01, 0.5], 7)
+    tenures = np.tile([7, 60, 11, 7, 60, 13, 59], 3)
+    priced = PricingService.price_loans(principal_cents, rates, tenures)
+    tables = PricingService.amortization_tables(principal_cents, rates, tenures)
+    broken = 0
+    for i, (p, r, n) in enumerate(zip(principal_cents, rates, tenures)):
+        emi = int(priced["emi_cents"][i])
+        ok = (
+            emi == int(LoanService.calculate_emi(Money(int(p)), Decimal(str(r)), int(n)))
+            and tables["payment_cents"][i].sum() == priced["total_amount_cents"][i]
+            and tables["interest_cents"][i].sum() == priced["total_interest_cents"][i]
+            and tables["principal_cents"][i].sum() == p
+            and (tables["balance_cents"][i] >= 0).all()
+            and (r > 0 or priced["total_amount_cents"][i] == p)
+        )
+        broken += not ok
+    return broken
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scalar vs vectorised EMI pricing")
+    parser.add_argument("--loans", type=int, default=1_000_000)
+    parser.add_argument("--scalar-sample", type=int, default=100_000,
+                        help="Loans priced with the scalar loop (extrapolated to --loans)")
+    parser.add_argument("--table-loans", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    principal_cents = rng.integers(100_000, 50_000_001, args.loans)
+    rates = np.round(rng.uniform(0, 30, args.loans), 2)
+    tenures = rng.integers(1, 61, args.loans)
+
+    started = time.perf_counter()
+    priced = PricingService.price_loans(principal_cents, rates, tenures)
+    vector_elapsed = time.perf_counter() - started
+
+    sample = min(args.scalar_sample, args.loans)
+    started = time.perf_counter()
+    scalar = [
+        LoanService.calculate_emi(Money(p), Decimal(str(r)), int(n))
+        for p, r, n in zip(principal_cents[:sample], rates[:sample], tenures[:sample])
+    ]
+    scalar_elapsed = (time.perf_counter() - started) * args.loans / sample
+
+    mismatches = sum(
+        int(s) != int(v) for s, v in zip(scalar, priced["emi_cents"][:sample])
+    )
+
+    table_loans = min(args.table_loans, args.loans)
+    started = time.perf_counter()
+    PricingService.amortization_tables(principal_cents[:table_loans], rates[:table_loans], tenures[:table_loans])
+    table_elapsed = time.perf_counter() - started
+
+    print(f"Loans priced:            {args.loans:,}")
+    print(f"Vectorised EMIs:         {vector_elapsed:.2f}s")
+    print(f"Scalar loop (estimated): {scalar_elapsed:.2f}s ({scalar_elapsed / vector_elapsed:.0f}x slower)")
+    print(f"Cent mismatches:         {mismatches} of {sample:,} sampled")
+    print(f"Amortisation tables:     {table_loans:,} loans in {table_elapsed:.2f}s")
+    print(f"Edge-case violations:    {check_edge_cases()} (schedule/total mismatch, negative balance or zero-rate interest)")
+
+
+if __name__ == "__main__":
+    main()
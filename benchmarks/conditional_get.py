@@ -0,0 +1,182 @@
+"""
+Polling benchmark: full responses vs gzip vs conditional GET (ETag / 304)
+
+Seeds a fresh SQLite database with one user and --rows ledger entries,
+starts the API under uvicorn and has N concurrent clients poll
+/api/wallet/transactions?limit=--limit while nothing changes, three ways:
+
+    identity:  Accept-Encoding: identity, no validator (the old behaviour)
+    gzip:      Accept-Encoding: gzip, no validator
+    etag:      Accept-Encoding: gzip, If-None-Match from the first response
+
+Reports requests/s, latency, body bytes on the wire per response and
+server CPU milliseconds per request (from /proc, Linux only).
+
+Install: pip install httpx
+
+Usage:
+    python benchmarks/conditional_get.py [--clients 20] [--duration 10] [--rows 5000] [--limit 100]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_conditional_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+
+from sqlalchemy import insert, update  # noqa: E402
+from app.auth.jwt import create_access_token  # noqa: E402
+from app.database import engine, init_db  # noqa: E402
+from app.models.transaction import Transaction, TransactionType, TransactionSource  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.models.wallet import Wallet  # noqa: E402
+from app.money import Money  # noqa: E402
+from app.services.transaction_service import ledger_hash, ledger_timestamp  # noqa: E402
+
+MODES = {
+    "identity": {"Accept-Encoding": "identity"},
+    "gzip": {"Accept-Encoding": "gzip"},
+    "etag": {"Accept-Encoding": "gzip"},
+}
+
+
+def seed(rows: int) -> int:
+    """A user with a wallet and `rows` chained ledger credits; returns the user id"""
+    init_db()
+    with engine.begin() as conn:
+        user_id = conn.execute(insert(User).values(
+            name="Poller", email="poller@example.com", hashed_password="x", role=UserRole.USER
+        )).inserted_primary_key[0]
+        head, entries = None, []
+        created_at = ledger_timestamp()
+        for n in range(rows):
+            amount = Money(1000 + n % 997)
+            reference_id = f"seed-{n}"
+            entry_hash = ledger_hash(
+                head, user_id, amount, TransactionType.CREDIT, TransactionSource.LOAN_DISBURSEMENT,
+                reference_id, "Seed credit", created_at
+            )
+            entries.append({
+                "user_id": user_id, "amount": amount, "type": TransactionType.CREDIT,
+                "source": TransactionSource.LOAN_DISBURSEMENT, "reference_id": reference_id,
+                "description": "Seed credit", "created_at": created_at, "prev_hash": head, "hash": entry_hash,
+            })
+            head = entry_hash
+        if entries:
+            conn.execute(insert(Transaction), entries)
+        balance = Money(sum(entry["amount"] for entry in entries))
+        conn.execute(insert(Wallet).values(user_id=user_id, balance=Money(0)))
+        conn.execute(update(Wallet).where(Wallet.user_id == user_id).values(balance=balance, last_hash=head))
+    return user_id
+
+
+def process_cpu(pid: int) -> float:
+    """User + system CPU seconds of a process, from /proc"""
+    with open(f"/proc/{pid}/stat") as stat:
+        fields = stat.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def run_load(client: httpx.AsyncClient, pid: int, path: str, mode: str, clients: int, duration: float) -> dict:
+    headers = dict(MODES[mode])
+    if mode == "etag":
+        first = await client.get(path, headers=headers)
+        headers["If-None-Match"] = first.headers["etag"]
+    latencies: list[float] = []
+    transferred = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal transferred
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            if response.status_code not in (200, 304):
+                response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+            transferred += response.num_bytes_downloaded
+
+    cpu_before = process_cpu(pid)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    cpu = process_cpu(pid) - cpu_before
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": len(latencies),
+        "requests_per_second": len(latencies) / elapsed,
+        "bytes_per_response": transferred / len(latencies),
+        "cpu_ms_per_request": cpu * 1000 / len(latencies),
+        "p50_ms": quantiles[49] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+    }
+
+
+async def bench(args, server: subprocess.Popen, user_id: int) -> None:
+    access_token = create_access_token({"sub": str(user_id), "role": UserRole.USER.value}, timedelta(hours=1))
+    path = f"/api/wallet/transactions?limit={args.limit}"
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{args.port}",
+        headers={"Authorization": f"Bearer {access_token}"},
+        limits=limits,
+        timeout=60,
+    ) as client:
+        for _ in range(150):
+            try:
+                if (await client.get("/health/live")).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+
+        print(f"GET {path} ({args.rows:,} ledger rows, {args.clients} clients)")
+        print(f"{'mode':<9} {'requests':>9} {'req/s':>7} {'body bytes':>11} {'CPU ms/req':>11} {'p50 ms':>8} {'p99 ms':>8}")
+        for mode in MODES:
+            await run_load(client, server.pid, path, mode, args.clients, 1.0)  # warm-up
+            result = await run_load(client, server.pid, path, mode, args.clients, args.duration)
+            print(
+                f"{mode:<9} {result['requests']:>9} {result['requests_per_second']:>7.0f} "
+                f"{result['bytes_per_response']:>11.0f} {result['cpu_ms_per_request']:>11.2f} "
+                f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full, gzip and conditional (304) polling")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per mode")
+    parser.add_argument("--rows", type=int, default=5000, help="Ledger entries of the polling user")
+    parser.add_argument("--limit", type=int, default=100, help="Page size polled")
+    parser.add_argument("--async-mode", action="store_true", help="Run the API with ASYNC_MODE=true")
+    parser.add_argument("--port", type=int, default=8768)
+    args = parser.parse_args()
+
+    user_id = seed(args.rows)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=dict(os.environ, ASYNC_MODE=str(args.async_mode).lower()),
+    )
+    try:
+        asyncio.run(bench(args, server, user_id))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Dashboard page-load benchmark: fan-out fetches vs /api/dashboard
+
+Starts the API under uvicorn against a fresh SQLite database, gives a
+user a few loans and a transaction history, then has N concurrent
+clients load the dashboard over and over, two ways:
+
+    fan-out:    GET /api/auth/me, then balance, my-loans and
+                transactions?limit=50 in parallel (the old frontend)
+    aggregated: GET /api/dashboard?transactions=50 (the new frontend)
+
+Reports page loads/s, page-load latency (time until all data has
+arrived, i.e. time-to-interactive) and the HTTP requests/s the server had
+to handle for it.
+
+Install: pip install httpx
+
+Usage:
+    python benchmarks/dashboard_load.py [--clients 50] [--duration 10] [--async-mode]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAN_OUT = ["/api/wallet/balance", "/api/loans/my-loans", "/api/wallet/transactions?limit=50"]
+
+
+def start_server(port: int, async_mode: bool, database_url: str) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=database_url, ASYNC_MODE=str(async_mode).lower())
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+    )
+
+
+async def wait_until_up(client: httpx.AsyncClient, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+async def seed(client: httpx.AsyncClient, loans: int, repayments: int) -> dict:
+    """A user with `loans` disbursed loans and `repayments` ledger debits"""
+    async def register(email: str, role: str) -> dict:
+        response = await client.post(
+            "/api/auth/register",
+            json={"name": "Bench", "email": email, "password": "benchpass123", "role": role},
+        )
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    admin = await register(f"admin.{time.time_ns()}@example.com", "ADMIN")
+    user = await register(f"user.{time.time_ns()}@example.com", "USER")
+    loan_ids = []
+    for _ in range(loans):
+        response = await client.post(
+            "/api/loans/apply", json={"principal_amount": 50000, "tenure_months": 12}, headers=user
+        )
+        response.raise_for_status()
+        loan_ids.append(response.json()["id"])
+        (await client.post(
+            "/api/loans/admin/approve", json={"loan_id": loan_ids[-1], "approved": True}, headers=admin
+        )).raise_for_status()
+    for n in range(repayments):
+        (await client.post(
+            "/api/repayments/make-payment",
+            json={"loan_id": loan_ids[n % loans], "amount": 10, "idempotency_key": str(uuid.uuid4())},
+            headers=user,
+        )).raise_for_status()
+    return user
+
+
+async def load_page(client: httpx.AsyncClient, aggregated: bool) -> int:
+    """One dashboard page load; returns the number of HTTP requests made"""
+    if aggregated:
+        (await client.get("/api/dashboard?transactions=50")).raise_for_status()
+        return 1
+    (await client.get("/api/auth/me")).raise_for_status()
+    responses = await asyncio.gather(*(client.get(path) for path in FAN_OUT))
+    for response in responses:
+        response.raise_for_status()
+    return 1 + len(FAN_OUT)
+
+
+async def run_load(client: httpx.AsyncClient, aggregated: bool, clients: int, duration: float) -> dict:
+    latencies: list[float] = []
+    requests = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal requests
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            made = await load_page(client, aggregated)
+            latencies.append(time.perf_counter() - started)
+            requests += made
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "pages": len(latencies),
+        "pages_per_second": len(latencies) / elapsed,
+        "requests_per_page": requests / len(latencies),
+        "requests_per_second": requests / elapsed,
+        "p50_ms": quantiles[49] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+    }
+
+
+async def bench(args) -> None:
+    tmpdir = tempfile.mkdtemp(prefix="bench_dashboard_")
+    server = start_server(args.port, args.async_mode, f"sqlite:///{tmpdir}/bench.db")
+    limits = httpx.Limits(max_connections=args.clients * 4, max_keepalive_connections=args.clients * 4)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60) as client:
+            await wait_until_up(client)
+            client.headers.update(await seed(client, args.loans, args.repayments))
+
+            print(f"{'mode':<11} {'pages':>7} {'pages/s':>8} {'req/page':>9} {'server req/s':>13} {'p50 ms':>8} {'p99 ms':>8}")
+            for aggregated in (False, True):
+                await run_load(client, aggregated, args.clients, 1.0)  # warm-up
+                result = await run_load(client, aggregated, args.clients, args.duration)
+                print(
+                    f"{'aggregated' if aggregated else 'fan-out':<11} {result['pages']:>7} "
+                    f"{result['pages_per_second']:>8.0f} {result['requests_per_page']:>9.0f} "
+                    f"{result['requests_per_second']:>13.0f} {result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f}"
+                )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fan-out dashboard fetches with /api/dashboard")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per mode")
+    parser.add_argument("--loans", type=int, default=2, help="Active loans (at most 2 per user)")
+    parser.add_argument("--repayments", type=int, default=60)
+    parser.add_argument("--async-mode", action="store_true", help="Run the API with ASYNC_MODE=true")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
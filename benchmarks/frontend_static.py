@@ -0,0 +1,188 @@
+"""
+Frontend static server benchmark: legacy serve.py vs the new frontend/serve.py
+
+Starts each server on the frontend directory and has N concurrent
+clients load the page over and over, like a browser:
+
+    first visit:   GET /, then the stylesheet and script it references,
+                   in parallel (Accept-Encoding: gzip[, br])
+    repeat visit:  revalidate what a browser would ask for again. The
+                   legacy server sends no Cache-Control, so all three
+                   files are re-requested with If-Modified-Since; the new
+                   server's assets are fingerprinted and immutable, so
+                   only index.html is revalidated with If-None-Match
+
+The legacy server is the previous frontend/serve.py: a single-threaded
+socketserver.TCPServer with SimpleHTTPRequestHandler (HTTP/1.0, no
+compression, no cache headers).
+
+Reports page loads/s, page-load latency, bytes on the wire per page and
+failed page loads (connection errors under load).
+
+Install: pip install httpx
+
+Usage:
+    python benchmarks/frontend_static.py [--clients 50] [--duration 10]
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRONTEND = os.path.join(ROOT, "frontend")
+
+LEGACY_SERVER = """
+import http.server, socketserver, sys
+
+class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    def end_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+socketserver.TCPServer.allow_reuse_address = True  # rerunning the benchmark right away
+with socketserver.TCPServer(("", int(sys.argv[1])), MyHTTPRequestHandler) as httpd:
+    httpd.serve_forever()
+"""
+
+REFERENCES = re.compile(r'(?:src|href)="([\w.-]+\.(?:js|css)(?:\?v=\w+)?)"')
+
+
+def start_server(name: str, port: int) -> subprocess.Popen:
+    if name == "legacy":
+        command = [sys.executable, "-c", LEGACY_SERVER, str(port)]
+    else:
+        command = [sys.executable, "serve.py", "--port", str(port), "--quiet"]
+    return subprocess.Popen(command, cwd=FRONTEND, stdout=subprocess.DEVNULL)
+
+
+async def wait_until_up(client: httpx.AsyncClient, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+class Browser:
+    """Validators remembered from the first visit, per URL"""
+
+    def __init__(self, legacy: bool):
+        self.legacy = legacy
+        self.validators = {}
+        self.assets = []
+
+    def remember(self, url: str, response: httpx.Response) -> None:
+        if "etag" in response.headers:
+            self.validators[url] = {"If-None-Match": response.headers["etag"]}
+        elif "last-modified" in response.headers:
+            self.validators[url] = {"If-Modified-Since": response.headers["last-modified"]}
+
+    async def first_visit(self, client: httpx.AsyncClient) -> int:
+        """Returns the bytes received (compressed, as on the wire)"""
+        index = await client.get("/")
+        index.raise_for_status()
+        self.remember("/", index)
+        self.assets = ["/" + path for path in REFERENCES.findall(index.text)]
+        responses = await asyncio.gather(*(client.get(url) for url in self.assets))
+        for url, response in zip(self.assets, responses):
+            response.raise_for_status()
+            self.remember(url, response)
+        return sum(response.num_bytes_downloaded for response in [index, *responses])
+
+    async def repeat_visit(self, client: httpx.AsyncClient) -> int:
+        urls = ["/", *self.assets] if self.legacy else ["/"]
+        responses = await asyncio.gather(*(client.get(url, headers=self.validators.get(url, {})) for url in urls))
+        for response in responses:
+            if response.status_code not in (200, 304):
+                response.raise_for_status()
+        return sum(response.num_bytes_downloaded for response in responses)
+
+
+async def run_load(client: httpx.AsyncClient, legacy: bool, repeat: bool, clients: int, duration: float) -> dict:
+    latencies: list[float] = []
+    transferred = 0
+    failures = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal transferred, failures
+        browser = Browser(legacy)
+        await browser.first_visit(client)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                if repeat:
+                    received = await browser.repeat_visit(client)
+                else:
+                    received = await browser.first_visit(client)
+            except httpx.HTTPError:
+                failures += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            transferred += received
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "pages": len(latencies),
+        "pages_per_second": len(latencies) / elapsed,
+        "bytes_per_page": transferred / len(latencies),
+        "failures": failures,
+        "p50_ms": quantiles[49] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+    }
+
+
+async def bench(args) -> None:
+    print(f"{'server':<7} {'visit':<7} {'pages':>7} {'pages/s':>8} {'KiB/page':>9} {'failed':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for offset, name in enumerate(("legacy", "new")):
+        port = args.port + offset
+        server = start_server(name, port)
+        limits = httpx.Limits(max_connections=args.clients * 3, max_keepalive_connections=args.clients * 3)
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+                await wait_until_up(client)
+                for repeat in (False, True):
+                    await run_load(client, name == "legacy", repeat, args.clients, 1.0)  # warm-up
+                    result = await run_load(client, name == "legacy", repeat, args.clients, args.duration)
+                    print(
+                        f"{name:<7} {'repeat' if repeat else 'first':<7} {result['pages']:>7} "
+                        f"{result['pages_per_second']:>8.0f} {result['bytes_per_page'] / 1024:>9.1f} "
+                        f"{result['failures']:>7} {result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f}"
+                    )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the legacy and new frontend static servers")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per scenario")
+    parser.add_argument("--port", type=int, default=3030, help="Legacy server port; the new one uses port + 1")
+    args = parser.parse_args()
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Idempotent retry latency benchmark
+
+Makes one repayment through the API, then replays the same request
+(a client retry storm) with the in-memory idempotency index cleared
+before every call (database lookup path) and with it warm (memory path),
+and reports per-retry latency for both.
+
+Usage:
+    python benchmarks/idempotent_retry.py [--retries 2000]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if "DATABASE_URL" not in os.environ:
+    _tmpdir = tempfile.mkdtemp(prefix="idempotent_retry_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/retry.db"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.main import app  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.models.loan import Loan, LoanStatus  # noqa: E402
+from app.models.wallet import Wallet  # noqa: E402
+from app.money import Money  # noqa: E402
+from app.services.idempotency_service import idempotency_index  # noqa: E402
+
+
+def setup(client: TestClient) -> tuple[dict, dict]:
+    """Register a user with an active loan and a funded wallet"""
+    response = client.post(
+        "/api/auth/register",
+        json={"name": "Retry", "email": f"retry.{time.time_ns()}@example.com", "password": "retrypass123"},
+    )
+    token = response.json()["access_token"]
+    user_id = response.json()["user"]["id"]
+
+    db = SessionLocal()
+    try:
+        loan = Loan(
+            user_id=user_id,
+            principal_amount=Money.parse("100000"),
+            tenure_months=12,
+            interest_rate=Decimal("12"),
+            status=LoanStatus.ACTIVE,
+            outstanding_amount=Money.parse("106618.56"),
+        )
+        db.add(loan)
+        db.query(Wallet).filter(Wallet.user_id == user_id).update({"balance": Money.parse("100000")})
+        db.commit()
+        loan_id = loan.id
+    finally:
+        db.close()
+
+    headers = {"Authorization": f"Bearer {token}"}
+    payload = {"loan_id": loan_id, "amount": "1000.00", "idempotency_key": f"retry-{time.time_ns()}"}
+    return headers, payload
+
+
+def time_retries(client: TestClient, headers: dict, payload: dict, retries: int, cold: bool) -> list[float]:
+    latencies = []
+    for _ in range(retries):
+        if cold:
+            idempotency_index.clear()
+        started = time.perf_counter()
+        response = client.post("/api/repayments/make-payment", json=payload, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        assert response.status_code == 201, response.text
+    return latencies
+
+
+def describe(label: str, latencies: list[float]):
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{label:<22} p50 {quantiles[49] * 1000:7.3f} ms   "
+        f"p99 {quantiles[98] * 1000:7.3f} ms   mean {statistics.mean(latencies) * 1000:7.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark idempotent repayment retries")
+    parser.add_argument("--retries", type=int, default=2000)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        headers, payload = setup(client)
+        first = client.post("/api/repayments/make-payment", json=payload, headers=headers)
+        assert first.status_code == 201, first.text
+
+        before = time_retries(client, headers, payload, args.retries, cold=True)
+        after = time_retries(client, headers, payload, args.retries, cold=False)
+
+    print(f"Retries per mode: {args.retries}")
+    describe("Before (DB lookup)", before)
+    describe("After (memory index)", after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+JSON fast path benchmark: per-row model validation vs rows + TypeAdapter
+
+Fills a throwaway SQLite database with --loans pending loan applications
+and a user with --rows ledger entries, then times, in-process, the work
+behind three read routes (query + serialisation to the JSON body):
+
+    before: ORM entities -> XResponse.model_validate per row -> FastAPI's
+            response_model validation and jsonable_encoder -> json.dumps
+            (exactly what the routes returned through before)
+    after:  column tuples (no ORM entities, no identity map) -> one
+            TypeAdapter.dump_json over the whole list
+
+Both paths produce the same JSON (checked). Reports CPU milliseconds per
+1000 rows and the speed-up.
+
+Usage:
+    python benchmarks/json_fast_path.py [--loans 1000] [--rows 1000] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_json_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+
+from decimal import Decimal  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import APIRoute, serialize_response  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from app.database import SessionLocal, engine, init_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.loan import Loan, LoanStatus  # noqa: E402
+from app.models.transaction import Transaction, TransactionType, TransactionSource  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.money import Money  # noqa: E402
+from app.schemas.loan import LoanResponse, LOAN_LIST_JSON  # noqa: E402
+from app.schemas.transaction import TransactionResponse, TransactionPage, TRANSACTION_PAGE_JSON  # noqa: E402
+from app.services.loan_service import LoanService  # noqa: E402
+from app.services.transaction_service import TransactionService  # noqa: E402
+
+
+def seed(loans: int, rows: int) -> int:
+    """Pending loans spread over users; the first user also has USER_LOANS loans and `rows` ledger entries"""
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"name": f"User {n}", "email": f"user{n}@example.com", "hashed_password": "x", "role": UserRole.USER}
+            for n in range(max(loans, 1))
+        ])
+        user_ids = [row[0] for row in conn.exec_driver_sql("SELECT id FROM users ORDER BY id")]
+        conn.execute(insert(Loan), [
+            {
+                "user_id": user_ids[n], "principal_amount": Money(100000 + n), "tenure_months": 12,
+                "interest_rate": Decimal("12.50"), "status": LoanStatus.APPLIED,
+                "outstanding_amount": Money(112000 + n),
+            }
+            for n in range(loans)
+        ] + [
+            {
+                "user_id": user_ids[0], "principal_amount": Money(50000), "tenure_months": 6,
+                "interest_rate": Decimal("10"), "status": LoanStatus.CLOSED, "outstanding_amount": Money(0),
+            }
+            for _ in range(USER_LOANS)
+        ])
+        conn.execute(insert(Transaction), [
+            {
+                "user_id": user_ids[0], "amount": Money(1000 + n), "type": TransactionType.CREDIT,
+                "source": TransactionSource.WALLET_TOPUP, "reference_id": f"topup-{n}",
+                "description": "Wallet top-up",
+            }
+            for n in range(rows)
+        ])
+    return user_ids[0]
+
+
+# Closed loans in the first user's history (GET /api/loans/my-loans)
+USER_LOANS = 50
+
+
+def response_field(path: str):
+    return next(route.response_field for route in app.routes if isinstance(route, APIRoute) and route.path == path)
+
+
+_loop = asyncio.new_event_loop()
+
+
+def render_before(field, content) -> bytes:
+    """FastAPI's path for a returned list of models: re-validate, encode, dumps"""
+    encoded = _loop.run_until_complete(serialize_response(field=field, response_content=content))
+    return JSONResponse(content=encoded).body
+
+
+def pending_before(db) -> bytes:
+    loans = LoanService.get_pending_loans(db)
+    return render_before(response_field("/api/loans/admin/pending"), [LoanResponse.model_validate(loan) for loan in loans])
+
+
+def pending_after(db) -> bytes:
+    return LOAN_LIST_JSON.dump_json(LoanService.get_pending_loan_rows(db))
+
+
+def my_loans_before(db, user_id: int) -> bytes:
+    loans = LoanService.get_user_loans(db, user_id)
+    return render_before(response_field("/api/loans/my-loans"), [LoanResponse.model_validate(loan) for loan in loans])
+
+
+def my_loans_after(db, user_id: int) -> bytes:
+    return LOAN_LIST_JSON.dump_json(LoanService.get_user_loan_rows(db, user_id))
+
+
+def transactions_before(db, user_id: int) -> bytes:
+    """Every page of the user's history at the maximum page size"""
+    bodies, cursor = [], None
+    while True:
+        transactions, cursor = TransactionService.get_user_transactions_page(
+            db, user_id, TransactionService.MAX_PAGE_SIZE, cursor
+        )
+        page = TransactionPage(
+            items=[TransactionResponse.model_validate(t) for t in transactions],
+            next_cursor=cursor
+        )
+        bodies.append(render_before(response_field("/api/wallet/transactions"), page))
+        if cursor is None:
+            return b"\n".join(bodies)
+
+
+def transactions_after(db, user_id: int) -> bytes:
+    bodies, cursor = [], None
+    while True:
+        items, cursor = TransactionService.get_user_transaction_rows_page(
+            db, user_id, TransactionService.MAX_PAGE_SIZE, cursor
+        )
+        bodies.append(TRANSACTION_PAGE_JSON.dump_json({"items": items, "next_cursor": cursor}))
+        if cursor is None:
+            return b"\n".join(bodies)
+
+
+def cpu_ms(work, repeat: int) -> float:
+    """CPU milliseconds per call, each call on a fresh session"""
+    total = 0.0
+    for attempt in range(repeat + 1):
+        db = SessionLocal()
+        try:
+            started = time.process_time()
+            work(db)
+            elapsed = time.process_time() - started
+        finally:
+            db.close()
+        if attempt:  # the first call is a warm-up
+            total += elapsed
+    return total * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-row validation vs row tuples + TypeAdapter serialisation")
+    parser.add_argument("--loans", type=int, default=1000, help="Pending loan applications")
+    parser.add_argument("--rows", type=int, default=1000, help="Ledger entries of one user")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    user_id = seed(args.loans, args.rows)
+    cases = [
+        ("GET /api/loans/admin/pending", args.loans, pending_before, pending_after),
+        ("GET /api/loans/my-loans", USER_LOANS + 1, lambda db: my_loans_before(db, user_id), lambda db: my_loans_after(db, user_id)),
+        (f"GET /api/wallet/transactions (all pages of {TransactionService.MAX_PAGE_SIZE})", args.rows,
+         lambda db: transactions_before(db, user_id), lambda db: transactions_after(db, user_id)),
+    ]
+
+    print(f"{'route':<52} {'rows':>6} {'before ms/1k':>13} {'after ms/1k':>12} {'speed-up':>9}")
+    for name, rows, before, after in cases:
+        db = SessionLocal()
+        try:
+            same = [json.loads(body) for body in before(db).split(b"\n")] == \
+                   [json.loads(body) for body in after(db).split(b"\n")]
+        finally:
+            db.close()
+        if not same:
+            raise SystemExit(f"{name}: the two paths produced different JSON")
+        before_ms = cpu_ms(before, args.repeat) * 1000 / max(rows, 1)
+        after_ms = cpu_ms(after, args.repeat) * 1000 / max(rows, 1)
+        print(f"{name:<52} {rows:>6} {before_ms:>13.1f} {after_ms:>12.1f} {before_ms / after_ms:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
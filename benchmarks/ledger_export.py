@@ -0,0 +1,105 @@
+"""
+Ledger export benchmark
+
+Fills a throwaway SQLite ledger with N transactions, then streams it
+through TransactionService.export_ledger (the code path behind
+/api/wallet/admin/export) and reports rows/s, bytes/s and peak RSS
+before and after the export. A flat RSS shows the export streams
+instead of materialising the ledger.
+
+Usage:
+    python benchmarks/ledger_export.py [--rows 1000000] [--format ndjson|csv]
+"""
+
+import argparse
+import gc
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if "DATABASE_URL" not in os.environ:
+    _tmpdir = tempfile.mkdtemp(prefix="ledger_export_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/export.db"
+
+from sqlalchemy import insert  # noqa: E402
+from app.database import SessionLocal, engine, init_db  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.models.transaction import Transaction, TransactionType, TransactionSource  # noqa: E402
+from app.money import Money  # noqa: E402
+from app.services.transaction_service import TransactionService  # noqa: E402
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / (1024 * 1024)
+
+
+def generate(rows: int, users: int = 100, batch: int = 50_000):
+    """Bulk-insert synthetic ledger rows"""
+    db = SessionLocal()
+    try:
+        db.add_all(
+            User(name=f"User {i}", email=f"export{i}@example.com", hashed_password="x", role=UserRole.USER)
+            for i in range(users)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch):
+            conn.execute(
+                insert(Transaction),
+                [
+                    {
+                        "user_id": (n % users) + 1,
+                        "amount": Money.parse("123.45"),
+                        "type": TransactionType.CREDIT if n % 2 else TransactionType.DEBIT,
+                        "source": TransactionSource.WALLET_TOPUP,
+                        "reference_id": str(n),
+                        "description": "benchmark row",
+                    }
+                    for n in range(offset, min(offset + batch, rows))
+                ],
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming ledger export")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    args = parser.parse_args()
+
+    init_db()
+    print(f"Generating {args.rows} ledger rows...")
+    generate(args.rows)
+    gc.collect()
+
+    rss_before = peak_rss_mb()
+    exported_rows = 0
+    exported_bytes = 0
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        for chunk in TransactionService.export_ledger(db, args.format):
+            exported_bytes += len(chunk)
+            exported_rows += chunk.count("\n")
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+    if args.format == "csv":
+        exported_rows -= 1  # header
+
+    print(f"Format:          {args.format}")
+    print(f"Rows exported:   {exported_rows} in {elapsed:.2f}s ({exported_rows / elapsed:,.0f} rows/s)")
+    print(f"Bytes exported:  {exported_bytes / 1e6:.1f} MB ({exported_bytes / 1e6 / elapsed:.1f} MB/s)")
+    print(f"Peak RSS:        {rss_before:.1f} MB before export, {peak_rss_mb():.1f} MB after")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Ledger hash-chain verification benchmark
+
+Fills a throwaway SQLite ledger with --users users and --rows chained
+transactions, then times LedgerAuditService.run (the code path behind
+verify_ledger.py): full re-hashes with one and --workers processes
+(which also write the seals), then, after --append more rows, an
+incremental run that only hashes the new rows against a full one.
+
+Usage:
+    python benchmarks/ledger_verify.py [--users 2000] [--rows 1000000] [--append 0.05] [--workers 4]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if "DATABASE_URL" not in os.environ:
+    _tmpdir = tempfile.mkdtemp(prefix="ledger_verify_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/ledger.db"
+
+from sqlalchemy import bindparam, insert, update  # noqa: E402
+from app.database import engine, init_db  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.models.wallet import Wallet  # noqa: E402
+from app.models.transaction import Transaction, TransactionType, TransactionSource  # noqa: E402
+from app.money import Money  # noqa: E402
+from app.services.ledger_audit_service import LedgerAuditService  # noqa: E402
+from app.services.transaction_service import ledger_hash, ledger_timestamp  # noqa: E402
+
+
+def append_rows(heads: dict, rows: int, start: int, batch: int = 50_000) -> None:
+    """Bulk-insert `rows` chained entries round-robin over the users"""
+    user_ids = list(heads)
+    created_at = ledger_timestamp()
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch):
+            entries = []
+            for n in range(start + offset, start + min(offset + batch, rows)):
+                user_id = user_ids[n % len(user_ids)]
+                entry = {
+                    "user_id": user_id,
+                    "amount": Money(100 + n % 997),
+                    "type": TransactionType.CREDIT,
+                    "source": TransactionSource.WALLET_TOPUP,
+                    "reference_id": str(n),
+                    "description": "Top-up",
+                    "created_at": created_at,
+                    "prev_hash": heads[user_id],
+                }
+                entry["hash"] = heads[user_id] = ledger_hash(
+                    entry["prev_hash"], user_id, entry["amount"], entry["type"],
+                    entry["source"], entry["reference_id"], entry["description"], entry["created_at"]
+                )
+                entries.append(entry)
+            conn.execute(insert(Transaction), entries)
+        wallets = Wallet.__table__
+        conn.execute(
+            update(wallets)
+            .where(wallets.c.user_id == bindparam("wallet_user_id"))
+            .values(last_hash=bindparam("new_last_hash")),
+            [{"wallet_user_id": user_id, "new_last_hash": head} for user_id, head in heads.items()],
+        )
+
+
+def generate(users: int) -> dict:
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"name": f"User {n}", "email": f"user{n}@example.com", "hashed_password": "x", "role": UserRole.USER}
+            for n in range(users)
+        ])
+        user_ids = [row[0] for row in conn.exec_driver_sql("SELECT id FROM users ORDER BY id")]
+        conn.execute(insert(Wallet), [{"user_id": user_id, "balance": Money(0)} for user_id in user_ids])
+    return {user_id: None for user_id in user_ids}
+
+
+def timed(label: str, **kwargs) -> dict:
+    started = time.perf_counter()
+    report = LedgerAuditService.run(**kwargs)
+    elapsed = time.perf_counter() - started
+    assert report["problem_count"] == 0, report["problems"][:5]
+    print(f"{label:<24}{report['rows_verified']:>10,} rows  {elapsed:7.2f}s  {report['rows_per_second']:>10,} rows/s")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ledger hash-chain verification")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--append", type=float, default=0.05, help="Fraction of rows added after sealing")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    init_db()
+    print(f"Generating {args.rows:,} chained ledger rows for {args.users:,} users...")
+    heads = generate(args.users)
+    append_rows(heads, args.rows, 0)
+
+    timed("Full, 1 worker", workers=1, full=True)
+    # Full runs seal every clean chain, so this one also writes the seals
+    timed(f"Full, {args.workers} workers", workers=args.workers, full=True)
+
+    appended = int(args.rows * args.append)
+    print(f"Appending {appended:,} rows...")
+    append_rows(heads, appended, args.rows)
+    timed("Incremental from seals", workers=args.workers)
+    timed("Full, after append", workers=args.workers, full=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Money vs Decimal microbenchmark
+
+Times the money handling on the request paths with the previous
+Numeric/Decimal representation and with integer-cent Money:
+
+- request validation of an amount (Decimal gt=0 vs PositiveMoney)
+- balance arithmetic as in debit/credit (compare, subtract, add)
+- a /api/wallet/transactions page: ORM fetch from SQLite, validation
+  into TransactionResponse and JSON serialisation
+
+Both representations must produce byte-identical JSON.
+
+Usage:
+    python benchmarks/money_arithmetic.py [--ops 1000000] [--rows 1000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, TypeAdapter
+from sqlalchemy import Column, DateTime, Enum, Integer, Numeric, String, create_engine, select
+from sqlalchemy.orm import Session, declarative_base
+from typing_extensions import Annotated
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.transaction import TransactionSource, TransactionType  # noqa: E402
+from app.money import Money, MoneyType, PositiveMoney  # noqa: E402
+from app.schemas.transaction import TransactionResponse  # noqa: E402
+
+Base = declarative_base()
+
+
+def ledger_model(name: str, amount_type):
+    return type(name, (Base,), {
+        "__tablename__": name.lower(),
+        "id": Column(Integer, primary_key=True),
+        "user_id": Column(Integer, nullable=False),
+        "amount": Column(amount_type, nullable=False),
+        "type": Column(Enum(TransactionType), nullable=False),
+        "source": Column(Enum(TransactionSource), nullable=False),
+        "reference_id": Column(String),
+        "description": Column(String),
+        "created_at": Column(DateTime, nullable=False),
+    })
+
+
+DecimalLedger = ledger_model("DecimalLedger", Numeric(15, 2))
+MoneyLedger = ledger_model("MoneyLedger", MoneyType())
+
+
+class DecimalTransactionResponse(BaseModel):
+    """TransactionResponse as it was with Decimal amounts"""
+    id: int
+    user_id: int
+    amount: Decimal
+    type: TransactionType
+    source: TransactionSource
+    reference_id: Optional[str] = None
+    description: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+def timed(fn, repeats: int = 1) -> float:
+    """Best of three runs of `repeats` calls"""
+    best = None
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(repeats):
+            fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_validate(ops: int):
+    # JSON request bodies reach pydantic as floats
+    inputs = [round(1 + n / 100, 2) for n in range(1000)]
+    rounds = max(1, ops // len(inputs))
+    decimal_adapter = TypeAdapter(List[Annotated[Decimal, Field(gt=0)]])
+    money_adapter = TypeAdapter(List[PositiveMoney])
+    assert [Money.parse(v) for v in decimal_adapter.validate_python(inputs)] == money_adapter.validate_python(inputs)
+
+    return (
+        timed(lambda: decimal_adapter.validate_python(inputs), rounds),
+        timed(lambda: money_adapter.validate_python(inputs), rounds),
+    )
+
+
+def bench_arithmetic(ops: int):
+    decimal_amount, decimal_balance = Decimal("12.34"), Decimal("1000000.00")
+    money_amount, money_balance = Money.parse("12.34"), Money.parse("1000000.00")
+
+    def decimal_path():
+        balance = decimal_balance
+        for _ in range(ops):
+            if balance >= decimal_amount:
+                balance = balance - decimal_amount
+            balance = balance + decimal_amount
+
+    def money_path():
+        balance = money_balance
+        for _ in range(ops):
+            if balance >= money_amount:
+                balance = balance - money_amount
+            balance = balance + money_amount
+
+    return timed(decimal_path), timed(money_path)
+
+
+def bench_page(rows: int, pages: int):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with Session(engine) as db:
+        for n in range(rows):
+            common = dict(
+                user_id=1,
+                type=TransactionType.DEBIT,
+                source=TransactionSource.EMI_PAYMENT,
+                reference_id="42",
+                description="EMI payment",
+                created_at=now,
+            )
+            db.add(DecimalLedger(amount=Decimal(n * 37).scaleb(-2), **common))
+            db.add(MoneyLedger(amount=Money(n * 37), **common))
+        db.commit()
+
+    def page(model, adapter):
+        def run():
+            with Session(engine) as db:
+                items = db.scalars(select(model).order_by(model.id)).all()
+                return adapter.dump_json(adapter.validate_python(items))
+        return run
+
+    decimal_page = page(DecimalLedger, TypeAdapter(List[DecimalTransactionResponse]))
+    money_page = page(MoneyLedger, TypeAdapter(List[TransactionResponse]))
+    assert decimal_page() == money_page()
+    return timed(decimal_page, pages), timed(money_page, pages)
+
+
+def report(name: str, count: int, unit: str, decimal_seconds: float, money_seconds: float):
+    print(
+        f"{name:<28} {count / decimal_seconds:>14,.0f} {count / money_seconds:>14,.0f} "
+        f"{unit:<7} {decimal_seconds / money_seconds:>6.2f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Money vs Decimal microbenchmark")
+    parser.add_argument("--ops", type=int, default=1_000_000)
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per transactions page")
+    parser.add_argument("--pages", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'operation':<28} {'Decimal':>14} {'Money':>14} {'unit':<7} {'speedup':>7}")
+    report("validate request amount", args.ops, "ops/s", *bench_validate(args.ops))
+    report("compare + sub + add", args.ops, "ops/s", *bench_arithmetic(args.ops))
+    report(
+        f"transactions page ({args.rows})",
+        args.rows * args.pages,
+        "rows/s",
+        *bench_page(args.rows, args.pages),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+SQLite write throughput benchmark for make_repayment
+
+Runs the same repayment workload twice against a fresh file database,
+first with SQLITE_PRAGMAS=false (SQLite defaults: rollback journal,
+synchronous=FULL) and then with the production PRAGMAs (WAL,
+synchronous=NORMAL, busy_timeout, mmap, cache), and reports committed
+repayments per second. Each mode runs in its own process because the
+engine is configured at import time.
+
+Usage:
+    python benchmarks/sqlite_write_throughput.py [--threads 8] [--repayments 500]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_worker(threads: int, repayments: int) -> dict:
+    """Executed in the child process: one borrower per thread, all writing at once"""
+    sys.path.insert(0, ROOT)
+    from fastapi import HTTPException
+    from app.database import SessionLocal, init_db, engine
+    from app.models.user import User
+    from app.models.loan import Loan, LoanStatus
+    from app.models.wallet import Wallet
+    from app.money import Money
+    from app.services.repayment_service import RepaymentService
+
+    init_db()
+    db = SessionLocal()
+    loans = []
+    try:
+        for n in range(threads):
+            user = User(name=f"Writer {n}", email=f"writer{n}@example.com", hashed_password="x")
+            db.add(user)
+            db.flush()
+            db.add(Wallet(user_id=user.id, balance=Money.parse(repayments * 10)))
+            loan = Loan(
+                user_id=user.id,
+                principal_amount=Money.parse(repayments * 10),
+                tenure_months=12,
+                interest_rate=Decimal("12"),
+                status=LoanStatus.ACTIVE,
+                outstanding_amount=Money.parse(repayments * 10),
+            )
+            db.add(loan)
+            db.flush()
+            loans.append((user.id, loan.id))
+        db.commit()
+    finally:
+        db.close()
+
+    errors = []
+    barrier = threading.Barrier(threads + 1)
+
+    def writer(user_id: int, loan_id: int):
+        barrier.wait()
+        for i in range(repayments):
+            session = SessionLocal()
+            try:
+                RepaymentService.make_repayment(
+                    session, user_id, loan_id, Money.parse("1.00"), f"bench-{loan_id}-{i}"
+                )
+            except HTTPException as e:
+                errors.append(e.detail)
+            finally:
+                session.close()
+
+    workers = [threading.Thread(target=writer, args=loan) for loan in loans]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    with engine.connect() as conn:
+        journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+        synchronous = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+
+    committed = threads * repayments - len(errors)
+    return {
+        "journal_mode": journal_mode,
+        "synchronous": synchronous,
+        "committed": committed,
+        "errors": len(errors),
+        "seconds": elapsed,
+        "per_second": committed / elapsed,
+    }
+
+
+def bench_mode(pragmas: bool, threads: int, repayments: int) -> dict:
+    tmpdir = tempfile.mkdtemp(prefix="bench_sqlite_")
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmpdir}/writes.db",
+        SQLITE_PRAGMAS=str(pragmas).lower(),
+    )
+    output = subprocess.run(
+        [sys.executable, __file__, "--worker", "--threads", str(threads), "--repayments", str(repayments)],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark make_repayment writes on SQLite")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--repayments", type=int, default=500, help="Repayments per thread")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.threads, args.repayments)))
+        return
+
+    print(f"Threads: {args.threads}, repayments per thread: {args.repayments}")
+    print(f"{'mode':<8} {'journal':>8} {'sync':>5} {'committed':>10} {'errors':>7} {'seconds':>8} {'writes/s':>9}")
+    for pragmas in (False, True):
+        result = bench_mode(pragmas, args.threads, args.repayments)
+        print(
+            f"{'after' if pragmas else 'before':<8} {result['journal_mode']:>8} {result['synchronous']:>5} "
+            f"{result['committed']:>10} {result['errors']:>7} {result['seconds']:>8.2f} {result['per_second']:>9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
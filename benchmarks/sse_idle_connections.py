@@ -0,0 +1,205 @@
+"""
+Server-sent events: idle connections per worker and fan-out latency
+
+Seeds a fresh SQLite database with --connections users (one APPLIED loan
+each), starts the API under a single uvicorn worker and opens one
+/api/events/stream connection per user. It then reports:
+
+    - time to open every stream
+    - server RSS before and after (memory per idle connection)
+    - server CPU while the streams sit idle (heartbeats only)
+    - latency from an admin bulk approval of --approve loans until every
+      affected stream has received its loan.status event
+
+Usage:
+    python benchmarks/sse_idle_connections.py [--connections 10000] [--approve 1000] [--idle 10]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_sse_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+
+from sqlalchemy import insert  # noqa: E402
+from app.auth.jwt import create_access_token, create_stream_ticket  # noqa: E402
+from app.database import engine, init_db  # noqa: E402
+from app.models.loan import Loan, LoanStatus  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.models.wallet import Wallet  # noqa: E402
+from app.money import Money  # noqa: E402
+
+
+def seed(users: int) -> tuple:
+    """Users with wallets and one APPLIED loan each, plus an admin"""
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"name": f"User {n}", "email": f"user{n}@example.com", "hashed_password": "x", "role": UserRole.USER}
+            for n in range(users)
+        ] + [{"name": "Admin", "email": "admin@example.com", "hashed_password": "x", "role": UserRole.ADMIN}])
+        rows = conn.exec_driver_sql("SELECT id, role FROM users ORDER BY id").all()
+        user_ids = [row[0] for row in rows if row[1] == UserRole.USER.name]
+        admin_id = next(row[0] for row in rows if row[1] == UserRole.ADMIN.name)
+        conn.execute(insert(Wallet), [{"user_id": user_id, "balance": Money(0)} for user_id in user_ids])
+        conn.execute(insert(Loan), [
+            {
+                "user_id": user_id, "principal_amount": Money(100000), "tenure_months": 12,
+                "interest_rate": Decimal("12"), "status": LoanStatus.APPLIED, "outstanding_amount": Money(106619),
+            }
+            for user_id in user_ids
+        ])
+        loans = dict(conn.exec_driver_sql("SELECT user_id, id FROM loans").all())
+    return user_ids, admin_id, loans
+
+
+def token(user_id: int, role: UserRole) -> str:
+    return create_access_token({"sub": str(user_id), "role": role.value}, timedelta(hours=2))
+
+
+def process_stats(pid: int) -> tuple:
+    """(RSS in MiB, CPU seconds) of a process, from /proc"""
+    with open(f"/proc/{pid}/status") as status:
+        rss_kib = next(int(line.split()[1]) for line in status if line.startswith("VmRSS:"))
+    with open(f"/proc/{pid}/stat") as stat:
+        fields = stat.read().rsplit(")", 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    return rss_kib / 1024, cpu
+
+
+class Stream:
+    """One raw HTTP/1.1 SSE connection (lighter than an HTTP client per stream)"""
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.heartbeats = 0
+        self.event_at = None
+
+    async def open(self, port: int, ticket: str) -> None:
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+        self.writer.write(
+            f"GET /api/events/stream?ticket={ticket} HTTP/1.1\r\n"
+            f"Host: 127.0.0.1\r\nAccept: text/event-stream\r\n\r\n".encode()
+        )
+        status = await self.reader.readline()
+        if b" 200 " not in status:
+            raise RuntimeError(f"stream for user {self.user_id}: {status!r}")
+        while (await self.reader.readline()) not in (b"\r\n", b""):
+            pass
+
+    async def read(self) -> None:
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                return
+            if b": keepalive" in line:
+                self.heartbeats += 1
+            elif b"event: loan.status" in line and self.event_at is None:
+                self.event_at = time.perf_counter()
+
+
+async def bench(args, server: subprocess.Popen, user_ids: list, admin_id: int, loans: dict) -> None:
+    base_url = f"http://127.0.0.1:{args.port}"
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        for _ in range(150):
+            try:
+                if (await client.get("/health/live")).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+
+        rss_before, _ = process_stats(server.pid)
+        streams = [Stream(user_id) for user_id in user_ids]
+        started = time.perf_counter()
+        opening = asyncio.Semaphore(200)
+
+        async def open_stream(stream):
+            async with opening:
+                await stream.open(args.port, create_stream_ticket(stream.user_id))
+
+        await asyncio.gather(*(open_stream(stream) for stream in streams))
+        opened = time.perf_counter() - started
+        readers = [asyncio.create_task(stream.read()) for stream in streams]
+        connected = (await client.get("/health")).json()["event_stream"]["connections"]
+        rss_after, cpu_before = process_stats(server.pid)
+        print(f"Opened streams:          {len(streams):,} in {opened:.1f}s (server reports {connected:,})")
+        print(f"Server RSS:              {rss_before:.0f} MiB -> {rss_after:.0f} MiB "
+              f"({(rss_after - rss_before) * 1024 / len(streams):.1f} KiB per stream)")
+
+        for stream in streams:
+            stream.heartbeats = 0
+        await asyncio.sleep(args.idle)
+        _, cpu_after = process_stats(server.pid)
+        heartbeats = sum(stream.heartbeats for stream in streams)
+        print(f"Idle {args.idle:.0f}s:                 {(cpu_after - cpu_before) / args.idle * 100:.1f}% server CPU, "
+              f"{heartbeats:,} heartbeats received")
+
+        targets = streams[:args.approve]
+        started = time.perf_counter()
+        response = await client.post(
+            "/api/loans/admin/approve-bulk",
+            json={"loan_ids": [loans[stream.user_id] for stream in targets]},
+            headers={"Authorization": f"Bearer {token(admin_id, UserRole.ADMIN)}"},
+        )
+        response.raise_for_status()
+        committed = time.perf_counter() - started
+        deadline = time.perf_counter() + 30
+        while any(stream.event_at is None for stream in targets) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        latencies = sorted(stream.event_at - started for stream in targets if stream.event_at is not None)
+        print(f"Bulk approval:           {len(targets):,} loans committed in {committed * 1000:.0f} ms")
+        print(f"Events received:         {len(latencies):,} of {len(targets):,}, "
+              f"p50 {latencies[len(latencies) // 2] * 1000:.0f} ms, last {latencies[-1] * 1000:.0f} ms "
+              f"after the request was sent")
+
+        for reader in readers:
+            reader.cancel()
+        for stream in streams:
+            stream.writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Idle SSE connections and event fan-out on one worker")
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--approve", type=int, default=1000, help="Loans approved (events fanned out)")
+    parser.add_argument("--idle", type=float, default=10.0, help="Seconds to sit idle")
+    parser.add_argument("--heartbeat", type=float, default=5.0, help="EVENT_HEARTBEAT_SECONDS for the server")
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    print(f"Seeding {args.connections:,} users...")
+    user_ids, admin_id, loans = seed(args.connections)
+    env = dict(
+        os.environ,
+        EVENT_HEARTBEAT_SECONDS=str(args.heartbeat),
+        EVENT_MAX_CONNECTIONS=str(args.connections),
+        PRINCIPAL_CACHE_MAX_ENTRIES=str(args.connections + 1),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning",
+         "--backlog", "4096"],
+        cwd=ROOT,
+        env=env,
+    )
+    try:
+        asyncio.run(bench(args, server, user_ids, admin_id, loans))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Wallet concurrency stress test
+
+Hammers a single wallet from many threads with interleaved credits and
+debits (each paired with its ledger entry, exactly like the services do)
+and asserts that the final wallet balance matches the transaction ledger
+and never went negative.
+
+Usage:
+    python benchmarks/wallet_stress.py [--threads 16] [--ops 200]
+
+Uses a throwaway SQLite database unless DATABASE_URL is already set.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if "DATABASE_URL" not in os.environ:
+    _tmpdir = tempfile.mkdtemp(prefix="wallet_stress_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/stress.db"
+
+from fastapi import HTTPException  # noqa: E402
+from sqlalchemy import func, case  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.models.wallet import Wallet  # noqa: E402
+from app.models.transaction import Transaction, TransactionType, TransactionSource  # noqa: E402
+from app.money import Money  # noqa: E402
+from app.services.wallet_service import WalletService  # noqa: E402
+from app.services.transaction_service import TransactionService  # noqa: E402
+
+
+def create_stress_user() -> int:
+    """Create a user with an empty wallet and return its id"""
+    db = SessionLocal()
+    try:
+        user = User(
+            name="Stress User",
+            email=f"stress.{time.time_ns()}@example.com",
+            hashed_password="x",
+            role=UserRole.USER
+        )
+        db.add(user)
+        db.flush()
+        db.add(Wallet(user_id=user.id, balance=Money(0)))
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def worker(user_id: int, ops: int, seed: int, stats: dict, lock: threading.Lock):
+    """Run a random mix of credits and debits against one wallet"""
+    rng = random.Random(seed)
+    local = {"credits": 0, "debits": 0, "rejected": 0, "retries": 0}
+
+    for _ in range(ops):
+        amount = Money.parse(rng.randint(1, 500))
+        is_credit = rng.random() < 0.5
+
+        while True:
+            db = SessionLocal()
+            try:
+                if is_credit:
+                    WalletService.credit_wallet(db, user_id, amount)
+                else:
+                    WalletService.debit_wallet(db, user_id, amount)
+                TransactionService.create_transaction(
+                    db=db,
+                    user_id=user_id,
+                    amount=amount,
+                    transaction_type=TransactionType.CREDIT if is_credit else TransactionType.DEBIT,
+                    source=TransactionSource.WALLET_TOPUP if is_credit else TransactionSource.EMI_PAYMENT,
+                    reference_id="stress",
+                    description="stress test"
+                )
+                db.commit()
+                local["credits" if is_credit else "debits"] += 1
+                break
+            except HTTPException:
+                # Insufficient balance - a legitimate rejection, not a failure
+                db.rollback()
+                local["rejected"] += 1
+                break
+            except OperationalError:
+                # SQLite writer lock contention; retry the whole transaction
+                db.rollback()
+                local["retries"] += 1
+            finally:
+                db.close()
+
+    with lock:
+        for key, value in local.items():
+            stats[key] += value
+
+
+def verify(user_id: int) -> tuple[Money, Money]:
+    """Return (wallet balance, balance derived from the ledger)"""
+    db = SessionLocal()
+    try:
+        wallet_balance = WalletService.get_wallet(db, user_id).balance
+        ledger_balance = db.query(
+            func.coalesce(
+                func.sum(
+                    case(
+                        (Transaction.type == TransactionType.CREDIT, Transaction.amount),
+                        else_=-Transaction.amount
+                    )
+                ),
+                0
+            )
+        ).filter(Transaction.user_id == user_id).scalar()
+        return Money(wallet_balance), Money(ledger_balance)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent wallet stress test")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=200, help="Operations per thread")
+    args = parser.parse_args()
+
+    init_db()
+    user_id = create_stress_user()
+
+    stats = {"credits": 0, "debits": 0, "rejected": 0, "retries": 0}
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=worker, args=(user_id, args.ops, seed, stats, lock))
+        for seed in range(args.threads)
+    ]
+
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    wallet_balance, ledger_balance = verify(user_id)
+    total_ops = args.threads * args.ops
+
+    print(f"Threads:          {args.threads}")
+    print(f"Operations:       {total_ops} in {elapsed:.2f}s ({total_ops / elapsed:.0f} ops/s)")
+    print(f"Credits/Debits:   {stats['credits']} / {stats['debits']}")
+    print(f"Rejected debits:  {stats['rejected']}")
+    print(f"Lock retries:     {stats['retries']}")
+    print(f"Wallet balance:   {wallet_balance}")
+    print(f"Ledger balance:   {ledger_balance}")
+
+    assert wallet_balance >= 0, "Wallet balance went negative"
+    assert wallet_balance == ledger_balance, "Wallet balance drifted from ledger"
+    print("✅ Wallet balance matches ledger")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Periodic balance checkpoint job
+
+Folds every user's ledger entries since their last checkpoint into a new
+balance checkpoint, so point-in-time balance queries
+(/api/wallet/balance/as-of) only read the ledger tail. Run it from cron
+(e.g. hourly); each run is incremental and safe to repeat.
+
+Usage:
+    python checkpoint_balances.py [--cutoff 2026-10-17T00:00:00] [--min-transactions 1] [--batch-size 1000]
+"""
+
+import argparse
+from datetime import datetime
+
+from app.database import SessionLocal, init_db
+from app.services.balance_checkpoint_service import BalanceCheckpointService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write ledger balance checkpoints")
+    parser.add_argument("--cutoff", type=datetime.fromisoformat, default=None,
+                        help="Checkpoint time (default: now minus BALANCE_CHECKPOINT_SETTLE_SECONDS)")
+    parser.add_argument("--min-transactions", type=int, default=None,
+                        help="Skip users with fewer new ledger entries")
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="Users per database transaction")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        print("📒 Checkpointing balances from the ledger...")
+        report = BalanceCheckpointService.create_checkpoints(
+            db,
+            cutoff=args.cutoff,
+            min_transactions=args.min_transactions,
+            batch_size=args.batch_size,
+        )
+    finally:
+        db.close()
+
+    print("✅ Checkpoints written")
+    print(f"   Cutoff:               {report['cutoff']}")
+    print(f"   Users scanned:        {report['users_scanned']}")
+    print(f"   Checkpoints written:  {report['checkpoints']}")
+    print(f"   Ledger entries read:  {report['transactions_folded']}")
+    print(f"   Throughput:           {report['transactions_per_second']} entries/s ({report['elapsed_seconds']}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,9 @@ const API_BASE_URL = window.location.hostname === 'localhost'
 // State Management
 let currentUser = null;
 let authToken = null;
+let eventSource = null;
+let eventStreamReconnect = null;
+let dashboardRefresh = null;
 
 // Utility Functions
 function showLoading() {
@@ -83,15 +86,14 @@ function switchDashboardTab(tab, evt) {
         });
     }
 
+    // Loans and transactions come from the last loadDashboard() call
     if (tab === 'loans') {
         document.getElementById('loansTab').classList.add('active');
-        loadMyLoans();
     } else if (tab === 'apply') {
         document.getElementById('applyTab').classList.add('active');
         calculateEMI();
     } else if (tab === 'transactions') {
         document.getElementById('transactionsTab').classList.add('active');
-        loadTransactions();
     } else if (tab === 'admin') {
         document.getElementById('adminTab-content').classList.add('active');
         loadPendingLoans();
@@ -183,6 +185,7 @@ async function handleRegister(event) {
 }
 
 function handleLogout() {
+    closeEventStream();
     authToken = null;
     currentUser = null;
     localStorage.removeItem('authToken');
@@ -206,49 +209,129 @@ function showDashboard() {
         document.getElementById('adminTab').style.display = 'block';
     }
 
-    refreshBalance();
-    loadMyLoans();
+    loadDashboard();
+    openEventStream();
 }
 
-// Wallet Functions
-async function refreshBalance() {
+// Dashboard: wallet, loans, latest transactions and next EMI in one request
+async function loadDashboard() {
+    clearTimeout(dashboardRefresh);
+    showLoading();
     try {
-        const response = await fetch(`${API_BASE_URL}/api/wallet/balance`, {
+        const response = await fetch(`${API_BASE_URL}/api/dashboard?transactions=50`, {
             headers: {
                 'Authorization': `Bearer ${authToken}`
             }
         });
 
-        if (!response.ok) throw new Error('Failed to fetch balance');
+        if (response.status === 401) {
+            // Token expired or invalid — back to login
+            handleLogout();
+            return;
+        }
+        if (!response.ok) throw new Error('Failed to fetch dashboard');
 
         const data = await response.json();
-        document.getElementById('walletBalance').textContent = formatCurrency(data.balance);
+        document.getElementById('walletBalance').textContent = formatCurrency(data.wallet.balance);
+        displayNextEmi(data.next_emi);
+        displayLoans(data.loans);
+        displayTransactions(data.transactions.items);
     } catch (error) {
-        showToast('Failed to load balance', 'error');
+        showToast('Failed to load dashboard', 'error');
+    } finally {
+        hideLoading();
     }
 }
 
-// Loan Functions
-async function loadMyLoans() {
-    showLoading();
+// Push updates: the server reports wallet and loan changes as they commit
+async function openEventStream() {
+    closeEventStream();
+    if (!window.EventSource || !authToken) return;
+
+    // EventSource cannot send an Authorization header: the URL carries a
+    // short-lived stream ticket instead of the access token
+    let ticket;
     try {
-        const response = await fetch(`${API_BASE_URL}/api/loans/my-loans`, {
+        const response = await fetch(`${API_BASE_URL}/api/events/ticket`, {
+            method: 'POST',
             headers: {
                 'Authorization': `Bearer ${authToken}`
             }
         });
+        if (!response.ok) throw new Error('Failed to get stream ticket');
+        ticket = (await response.json()).ticket;
+    } catch (error) {
+        scheduleEventStreamReconnect();
+        return;
+    }
 
-        if (!response.ok) throw new Error('Failed to fetch loans');
+    if (!authToken) return;  // logged out meanwhile
+    closeEventStream();
+    eventSource = new EventSource(
+        `${API_BASE_URL}/api/events/stream?ticket=${encodeURIComponent(ticket)}`
+    );
+    eventSource.addEventListener('wallet.balance', (event) => {
+        const data = JSON.parse(event.data);
+        document.getElementById('walletBalance').textContent = formatCurrency(data.balance);
+        scheduleDashboardRefresh();
+    });
+    eventSource.addEventListener('loan.status', scheduleDashboardRefresh);
+    // Events were dropped: fetch the full state again
+    eventSource.addEventListener('resync', scheduleDashboardRefresh);
+    // Too many open streams: back off before trying again
+    eventSource.addEventListener('unavailable', () => {
+        closeEventStream();
+        scheduleEventStreamReconnect(30000);
+    });
+    // The browser's own reconnect would reuse the expired ticket
+    eventSource.onerror = () => {
+        closeEventStream();
+        scheduleEventStreamReconnect();
+    };
+}
 
-        const loans = await response.json();
-        displayLoans(loans);
-    } catch (error) {
-        showToast('Failed to load loans', 'error');
-    } finally {
-        hideLoading();
+function scheduleEventStreamReconnect(delay = 3000) {
+    clearTimeout(eventStreamReconnect);
+    eventStreamReconnect = setTimeout(() => {
+        if (authToken) {
+            // Catch up on anything missed while disconnected
+            scheduleDashboardRefresh();
+            openEventStream();
+        }
+    }, delay);
+}
+
+function closeEventStream() {
+    clearTimeout(eventStreamReconnect);
+    if (eventSource) {
+        eventSource.onerror = null;
+        eventSource.close();
+        eventSource = null;
     }
 }
 
+function scheduleDashboardRefresh() {
+    // Coalesce a burst of events (e.g. disbursement + balance) into one fetch
+    clearTimeout(dashboardRefresh);
+    dashboardRefresh = setTimeout(loadDashboard, 300);
+}
+
+function displayNextEmi(nextEmi) {
+    const nextEmiLine = document.getElementById('nextEmi');
+    if (!nextEmi) {
+        nextEmiLine.textContent = '';
+        return;
+    }
+    const dueDate = new Date(nextEmi.due_date).toLocaleDateString('en-IN', {
+        year: 'numeric',
+        month: 'short',
+        day: 'numeric'
+    });
+    nextEmiLine.textContent = `Next EMI: ₹${formatCurrency(nextEmi.amount)} on ${dueDate} (Loan #${nextEmi.loan_id})`;
+}
+
+// Loan Functions
+
 function displayLoans(loans) {
     const loansList = document.getElementById('loansList');
 
@@ -302,7 +385,8 @@ async function calculateEMI() {
     }
 
     try {
-        const response = await fetch(`${API_BASE_URL}/api/loans/calculate-emi`, {
+        // Schedules are memoised server-side, so repeated quotes are cheap
+        const response = await fetch(`${API_BASE_URL}/api/loans/schedule`, {
             method: 'POST',
             headers: {
                 'Authorization': `Bearer ${authToken}`,
@@ -355,6 +439,7 @@ async function handleLoanApplication(event) {
 
         showToast('Loan application submitted successfully!', 'success');
         switchDashboardTab('loans', null);
+        loadDashboard();
         event.target.reset();
     } catch (error) {
         showToast(error.message || 'Application failed', 'error');
@@ -406,9 +491,7 @@ async function handleRepayment(event) {
         const data = await response.json();
         closeRepaymentModal();
         showToast(`Payment successful! ${data.loan_closed ? 'Loan closed!' : ''}`, 'success');
-        refreshBalance();
-        loadMyLoans();
-        loadTransactions();
+        loadDashboard();
     } catch (error) {
         showToast(error.message || 'Payment failed', 'error');
     } finally {
@@ -417,26 +500,6 @@ async function handleRepayment(event) {
 }
 
 // Transaction Functions
-async function loadTransactions() {
-    showLoading();
-    try {
-        const response = await fetch(`${API_BASE_URL}/api/wallet/transactions?limit=50`, {
-            headers: {
-                'Authorization': `Bearer ${authToken}`
-            }
-        });
-
-        if (!response.ok) throw new Error('Failed to fetch transactions');
-
-        const transactions = await response.json();
-        displayTransactions(transactions);
-    } catch (error) {
-        showToast('Failed to load transactions', 'error');
-    } finally {
-        hideLoading();
-    }
-}
-
 function displayTransactions(transactions) {
     const transactionsList = document.getElementById('transactionsList');
 
@@ -593,20 +656,8 @@ window.addEventListener('DOMContentLoaded', () => {
         authToken = savedToken;
         currentUser = JSON.parse(savedUser);
         
-        // Validate token is still valid by calling /api/auth/me
-        fetch(`${API_BASE_URL}/api/auth/me`, {
-            headers: { 'Authorization': `Bearer ${authToken}` }
-        }).then(response => {
-            if (response.ok) {
-                showDashboard();
-            } else {
-                // Token expired or invalid — clear and show login
-                handleLogout();
-            }
-        }).catch(() => {
-            // Network error — show login
-            handleLogout();
-        });
+        // The dashboard request validates the token (401 -> login)
+        showDashboard();
     }
 });
 
@@ -1,24 +1,218 @@
 #!/usr/bin/env python3
 """
-Simple HTTP server to serve the frontend files.
+HTTP server for the frontend files.
 Run this script to start the frontend on http://localhost:3000
 
+Serves the static assets (index.html, app.js, styles.css, images) with
+one thread per keep-alive connection:
+
+    - gzip (and brotli, when the `brotli` package is installed) variants
+      are compressed once at startup, not per request
+    - strong ETags per variant; If-None-Match answers 304
+    - index.html references app.js/styles.css as ?v=<content hash>, so
+      those can be cached for a year and still update on the next deploy
+    - bodies go out with sendfile() (zero-copy) where the OS supports it
+    - files edited while the server runs are rebuilt on the next request
+
 Usage:
-    python serve.py
+    python serve.py [--port 3000] [--bind 0.0.0.0] [--quiet]
 """
 
+import argparse
+import atexit
+import gzip
+import hashlib
 import http.server
-import socketserver
 import os
+import re
+import shutil
+import tempfile
+import threading
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
 
 # Configuration
 PORT = 3000
 DIRECTORY = os.path.dirname(os.path.abspath(__file__))
 
-class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=DIRECTORY, **kwargs)
-    
+# Served files, by extension; anything else (serve.py, *.sh, *.md) is not
+CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".json": "application/json",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".ico": "image/x-icon",
+}
+COMPRESSIBLE = {".html", ".js", ".css", ".json", ".svg"}
+
+# index.html must be revalidated so a deploy is picked up on the next load;
+# fingerprinted (?v=) assets never change under the same URL
+CACHE_REVALIDATE = "no-cache"
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Asset references in index.html that get a ?v=<hash> fingerprint
+ASSET_REFERENCE = re.compile(r'(?P<attr>(?:src|href)=")(?P<name>[\w.-]+\.(?:js|css))(?P<end>")')
+
+
+class Asset:
+    """One file and its precompressed variants (encoding -> (path, size, etag))"""
+
+    def __init__(self, name: str, source: str, stamp: tuple):
+        self.name = name
+        self.source = source
+        self.stamp = stamp
+        self.content_type = CONTENT_TYPES[os.path.splitext(name)[1]]
+        self.fingerprint = ""
+        self.variants = {}
+        self.raw = None
+
+
+class AssetStore:
+    """
+    Startup-built index of the servable files
+
+    Key Principles:
+    1. Compression happens once per file version, never per request
+    2. Variants live as files in a private temp directory, so every
+       encoding can be sent with sendfile()
+    3. A request stats its source file; a changed file (development) is
+       rebuilt under a lock, an unchanged one costs nothing more
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.cache_dir = tempfile.mkdtemp(prefix="frontend-assets-")
+        atexit.register(shutil.rmtree, self.cache_dir, True)
+        self.assets = {}
+        self._lock = threading.Lock()
+        for name in sorted(os.listdir(directory)):
+            if os.path.splitext(name)[1] in CONTENT_TYPES and os.path.isfile(os.path.join(directory, name)):
+                self._build(name)
+        self._build_index()
+
+    @staticmethod
+    def _stamp(path: str) -> tuple:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _write_variant(self, encoding: str, body: bytes) -> tuple:
+        digest = hashlib.sha256(body).hexdigest()[:20]
+        path = os.path.join(self.cache_dir, f"{digest}.{encoding}")
+        with open(path, "wb") as out:
+            out.write(body)
+        return path, len(body), f'"{digest}-{encoding}"'
+
+    def _build(self, name: str) -> Asset:
+        source = os.path.join(self.directory, name)
+        stamp = self._stamp(source)
+        with open(source, "rb") as f:
+            body = f.read()
+        asset = Asset(name, source, stamp)
+        if name == "index.html":
+            # Fingerprinted again by __init__ once every asset is known
+            asset.raw = body
+            self._build_index(asset)
+        else:
+            self._add_variants(asset, body)
+        self.assets[name] = asset
+        return asset
+
+    def _add_variants(self, asset: Asset, body: bytes) -> None:
+        fingerprint = hashlib.sha256(body).hexdigest()[:12]
+        if asset.raw is not None:
+            variants = {"identity": self._write_variant("identity", body)}
+        else:
+            # The identity variant is the source file itself
+            variants = {"identity": (asset.source, len(body), f'"{fingerprint}-identity"')}
+        if os.path.splitext(asset.name)[1] in COMPRESSIBLE:
+            compressed = [("gzip", gzip.compress(body, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                compressed.append(("br", brotli.compress(body, quality=11)))
+            for encoding, payload in compressed:
+                if len(payload) < len(body):
+                    variants[encoding] = self._write_variant(encoding, payload)
+        # Swapped in whole: request threads read these without the lock
+        asset.fingerprint, asset.variants = fingerprint, variants
+
+    def _build_index(self, index: Asset = None) -> None:
+        index = index or self.assets.get("index.html")
+        if index is None:
+            return
+
+        def fingerprint(match):
+            asset = self.assets.get(match.group("name"))
+            if asset is None:
+                return match.group(0)
+            return f'{match.group("attr")}{asset.name}?v={asset.fingerprint}{match.group("end")}'
+
+        body = ASSET_REFERENCE.sub(fingerprint, index.raw.decode("utf-8")).encode("utf-8")
+        self._add_variants(index, body)
+
+    def get(self, name: str):
+        """Current asset for a file name, rebuilding it if the file changed"""
+        asset = self.assets.get(name)
+        if asset is None:
+            return None
+        try:
+            stamp = self._stamp(asset.source)
+        except OSError:
+            return asset  # deleted while running: keep serving the last build
+        if stamp != asset.stamp:
+            with self._lock:
+                asset = self.assets[name]
+                if self._stamp(asset.source) != asset.stamp:
+                    asset = self._build(name)
+                    if name != "index.html":
+                        # index.html embeds every fingerprint
+                        self._build_index()
+        return asset
+
+
+def accepted_encodings(header: str) -> set:
+    """Codings the client accepts (those with q=0 excluded)"""
+    accepted = set()
+    for item in header.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored"""
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag[:2] == "W/":
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+class FrontendRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    # Headers and the sendfile() body are separate writes; with Nagle the
+    # body waits for the client's delayed ACK of the headers (~40 ms)
+    disable_nagle_algorithm = True
+    server_version = "FrontendServer"
+    store: AssetStore = None
+    quiet = False
+
     def end_headers(self):
         # Add CORS headers
         self.send_header('Access-Control-Allow-Origin', '*')
@@ -26,21 +220,92 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
         super().end_headers()
 
-if __name__ == '__main__':
-    os.chdir(DIRECTORY)
-    
-    with socketserver.TCPServer(("", PORT), MyHTTPRequestHandler) as httpd:
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+    def do_GET(self, head: bool = False):
+        path, _, query = self.path.partition("?")
+        name = path.lstrip("/") or "index.html"
+        asset = self.store.get(name) if "/" not in name else None
+        if asset is None:
+            self.send_error(404, "File not found")
+            return
+
+        accepted = accepted_encodings(self.headers.get("Accept-Encoding", ""))
+        encoding = next((e for e in ("br", "gzip") if e in accepted and e in asset.variants), "identity")
+        file_path, size, etag = asset.variants[encoding]
+
+        if asset.name == "index.html" or query != f"v={asset.fingerprint}":
+            cache_control = CACHE_REVALIDATE
+        else:
+            cache_control = CACHE_IMMUTABLE
+
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None and etag_matches(if_none_match, etag):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control)
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", asset.content_type)
+        self.send_header("Content-Length", str(size))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control)
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        if head:
+            return
+        with open(file_path, "rb") as body:
+            # os.sendfile where available, plain read/send otherwise
+            self.connection.sendfile(body)
+
+
+class FrontendServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the frontend")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--bind", default="", help="Address to listen on (default: all interfaces)")
+    parser.add_argument("--quiet", action="store_true", help="Don't log every request")
+    args = parser.parse_args()
+
+    FrontendRequestHandler.store = AssetStore(DIRECTORY)
+    FrontendRequestHandler.quiet = args.quiet
+
+    with FrontendServer((args.bind, args.port), FrontendRequestHandler) as httpd:
         print(f"╔════════════════════════════════════════════╗")
         print(f"║   Frontend Server Running                 ║")
         print(f"╠════════════════════════════════════════════╣")
-        print(f"║   URL: http://localhost:{PORT}            ║")
+        print(f"║   URL: http://localhost:{args.port}            ║")
         print(f"║   Press Ctrl+C to stop                     ║")
         print(f"╚════════════════════════════════════════════╝")
         print()
+        print(f"Compression: gzip{', br' if brotli is not None else ' (pip install brotli for br)'}")
         print("Make sure the backend is running on http://localhost:8000")
         print()
-        
+
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
             print("\nServer stopped.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""
+Add the ledger hash chain to an existing database
+
+New databases get the columns from init_db(). For a database created
+before the hash chain, this:
+
+    1. Adds transactions.prev_hash, transactions.hash and
+       wallets.last_hash (ALTER TABLE ... ADD COLUMN)
+    2. Chains every user's existing ledger rows in id order and stores
+       the head in wallets.last_hash
+
+A database chained before created_at became part of the hash
+(ledger_hash_created_at) is re-chained over the same fields as
+ledger_hash now covers, and its ledger seals are dropped: they point at
+the old heads.
+
+Completion is recorded in the schema_migrations table, so running it
+twice is safe. Stop the API while it runs: a ledger entry written by
+the old code mid-backfill would not be chained. Afterwards, run
+verify_ledger.py once to write the first signed seals.
+
+Usage:
+    python migrate_ledger_hash_chain.py [--dry-run] [--batch-size 1000]
+"""
+
+import argparse
+
+from sqlalchemy import bindparam, inspect, select, text, update
+
+from app.database import engine
+from app.models.ledger_seal import LedgerSeal
+from app.models.transaction import Transaction
+from app.models.wallet import Wallet
+from app.services.transaction_service import ledger_hash
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+MIGRATION = "ledger_hash_chain"
+# created_at joined the hashed fields
+RECHAIN_MIGRATION = "ledger_hash_created_at"
+NEW_COLUMNS = (
+    ("transactions", "prev_hash"),
+    ("transactions", "hash"),
+    ("wallets", "last_hash"),
+)
+
+
+def existing_columns(conn, table: str) -> set:
+    if conn.dialect.name == "sqlite":
+        return {row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info("{table}")')}
+    rows = conn.execute(
+        text("SELECT column_name FROM information_schema.columns WHERE table_name = :table"),
+        {"table": table},
+    )
+    return {row[0] for row in rows}
+
+
+def backfill(conn, batch_size: int) -> tuple:
+    """Chain the ledger of every user, batch by batch; returns (users, rows)"""
+    transactions = Transaction.__table__
+    wallets = Wallet.__table__
+    users = rows = 0
+    after_id = 0
+    while True:
+        user_ids = conn.execute(
+            select(transactions.c.user_id)
+            .where(transactions.c.user_id > after_id)
+            .group_by(transactions.c.user_id)
+            .order_by(transactions.c.user_id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not user_ids:
+            break
+        after_id = user_ids[-1]
+
+        heads, links = {}, []
+        for row in conn.execute(
+            select(
+                transactions.c.id, transactions.c.user_id, transactions.c.amount, transactions.c.type,
+                transactions.c.source, transactions.c.reference_id, transactions.c.description,
+                transactions.c.created_at,
+            )
+            .where(transactions.c.user_id.between(user_ids[0], user_ids[-1]))
+            .order_by(transactions.c.user_id, transactions.c.id)
+        ):
+            prev_hash = heads.get(row.user_id)
+            heads[row.user_id] = ledger_hash(
+                prev_hash, row.user_id, row.amount, row.type,
+                row.source, row.reference_id, row.description, row.created_at
+            )
+            links.append({"row_id": row.id, "new_prev_hash": prev_hash, "new_hash": heads[row.user_id]})
+
+        conn.execute(
+            update(transactions)
+            .where(transactions.c.id == bindparam("row_id"))
+            .values(prev_hash=bindparam("new_prev_hash"), hash=bindparam("new_hash")),
+            links,
+        )
+        conn.execute(
+            update(wallets)
+            .where(wallets.c.user_id == bindparam("wallet_user_id"))
+            .values(last_hash=bindparam("new_last_hash")),
+            [{"wallet_user_id": user_id, "new_last_hash": head} for user_id, head in heads.items()],
+        )
+        users += len(heads)
+        rows += len(links)
+    return users, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add and backfill the ledger hash chain")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Users chained per batch")
+    args = parser.parse_args()
+
+    dialect = engine.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        raise SystemExit(f"Unsupported database dialect: {dialect}")
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version VARCHAR(64) PRIMARY KEY, "
+            "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        )
+        applied = {
+            version for (version,) in conn.execute(
+                text("SELECT version FROM schema_migrations WHERE version IN (:chain, :rechain)"),
+                {"chain": MIGRATION, "rechain": RECHAIN_MIGRATION},
+            )
+        }
+        if RECHAIN_MIGRATION in applied:
+            print(f"✅ {MIGRATION} and {RECHAIN_MIGRATION} already applied")
+            return
+
+        if MIGRATION in applied:
+            print(f"🔁 Re-chaining ledger rows with created_at ({RECHAIN_MIGRATION})")
+            if args.dry_run:
+                conn.rollback()
+                return
+            users, rows = backfill(conn, args.batch_size)
+            print(f"🔗 Re-chained {rows} ledger rows of {users} users")
+            if inspect(conn).has_table(LedgerSeal.__tablename__):
+                dropped = conn.execute(LedgerSeal.__table__.delete()).rowcount
+                print(f"🗑️  Dropped {dropped} ledger seals")
+        else:
+            missing = [
+                (table, column) for table, column in NEW_COLUMNS
+                if column not in existing_columns(conn, table)
+            ]
+            for table, column in missing:
+                print(f"➕ {table}.{column}")
+            if args.dry_run:
+                conn.rollback()
+                return
+
+            for table, column in missing:
+                conn.exec_driver_sql(f'ALTER TABLE "{table}" ADD COLUMN "{column}" VARCHAR(64)')
+            users, rows = backfill(conn, args.batch_size)
+            print(f"🔗 Chained {rows} ledger rows of {users} users")
+
+        for version in (MIGRATION, RECHAIN_MIGRATION):
+            if version not in applied:
+                conn.execute(
+                    text("INSERT INTO schema_migrations (version) VALUES (:version)"),
+                    {"version": version},
+                )
+    print(f"✅ {RECHAIN_MIGRATION} applied")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Migrate money columns from NUMERIC(15, 2) to integer minor units
+
+Money is stored as BIGINT paise/cents (see app/money.py). This converts
+every existing money column (wallet balances, loan principal and
+outstanding, repayment and transaction amounts) in place:
+
+    PostgreSQL: ALTER COLUMN ... TYPE BIGINT USING ROUND(col * 100)
+    SQLite:     rebuild each table (SQLite cannot change a column type),
+                copying ROUND(col * 100) into the new BIGINT column
+
+Only columns still declared NUMERIC/DECIMAL are converted, everything
+runs in one transaction, and completion is recorded in the
+schema_migrations table, so running it twice is safe.
+
+Back up the database first.
+
+Usage:
+    python migrate_money_to_minor_units.py [--dry-run]
+"""
+
+import argparse
+
+from sqlalchemy import MetaData, text
+from sqlalchemy.schema import CreateTable
+
+from app.database import Base, engine
+from app.money import MoneyType
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+MIGRATION = "money_minor_units"
+
+
+def money_columns() -> dict:
+    """{table name: [money column names]} from the models"""
+    columns = {}
+    for table in Base.metadata.sorted_tables:
+        names = [column.name for column in table.columns if isinstance(column.type, MoneyType)]
+        if names:
+            columns[table.name] = names
+    return columns
+
+
+def declared_types(conn, table: str) -> dict:
+    """{column: declared type (upper case)} for an existing table, {} if missing"""
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql(f'PRAGMA table_info("{table}")').all()
+        return {row[1]: (row[2] or "").upper() for row in rows}
+    rows = conn.execute(
+        text("SELECT column_name, data_type FROM information_schema.columns WHERE table_name = :table"),
+        {"table": table},
+    ).all()
+    return {row[0]: row[1].upper() for row in rows}
+
+
+def pending_columns(conn) -> dict:
+    pending = {}
+    for table, columns in money_columns().items():
+        types = declared_types(conn, table)
+        decimal_columns = [
+            column for column in columns
+            if types.get(column, "").startswith(("NUMERIC", "DECIMAL"))
+        ]
+        if decimal_columns:
+            pending[table] = decimal_columns
+    return pending
+
+
+def migrate_postgresql(conn, table: str, columns: list) -> None:
+    for column in columns:
+        conn.exec_driver_sql(
+            f'ALTER TABLE "{table}" ALTER COLUMN "{column}" TYPE BIGINT '
+            f'USING ROUND("{column}" * 100)::bigint'
+        )
+
+
+def migrate_sqlite(conn, table: str, columns: list) -> None:
+    # Build the new table from the models (copies of every table, so
+    # foreign keys resolve), under a temporary name
+    scratch = MetaData()
+    for model_table in Base.metadata.sorted_tables:
+        model_table.to_metadata(scratch)
+    new_name = f"{table}__minor_units"
+    new_table = Base.metadata.tables[table].to_metadata(scratch, name=new_name)
+    conn.execute(CreateTable(new_table))
+
+    existing = declared_types(conn, table)
+    names = [column.name for column in new_table.columns if column.name in existing]
+    select_list = ", ".join(
+        f'CAST(ROUND("{name}" * 100) AS INTEGER)' if name in columns else f'"{name}"'
+        for name in names
+    )
+    column_list = ", ".join(f'"{name}"' for name in names)
+    conn.exec_driver_sql(
+        f'INSERT INTO "{new_name}" ({column_list}) SELECT {select_list} FROM "{table}"'
+    )
+    # Foreign keys are not enforced on these connections, so the old
+    # table can be dropped while other tables still reference its name
+    conn.exec_driver_sql(f'DROP TABLE "{table}"')
+    conn.exec_driver_sql(f'ALTER TABLE "{new_name}" RENAME TO "{table}"')
+
+    # Dropping the old table dropped its indexes too
+    for index in Base.metadata.tables[table].indexes:
+        index.create(conn, checkfirst=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert money columns to integer minor units")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    args = parser.parse_args()
+
+    dialect = engine.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        raise SystemExit(f"Unsupported database dialect: {dialect}")
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version VARCHAR(64) PRIMARY KEY, "
+            "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        )
+        applied = conn.execute(
+            text("SELECT 1 FROM schema_migrations WHERE version = :version"),
+            {"version": MIGRATION},
+        ).first()
+        if applied:
+            print(f"✅ {MIGRATION} already applied")
+            return
+
+        pending = pending_columns(conn)
+        for table, columns in pending.items():
+            print(f"🔁 {table}: {', '.join(columns)}")
+        if not pending:
+            print("No NUMERIC money columns found (new or already converted database)")
+        if args.dry_run:
+            conn.rollback()
+            return
+
+        for table, columns in pending.items():
+            if dialect == "postgresql":
+                migrate_postgresql(conn, table, columns)
+            else:
+                migrate_sqlite(conn, table, columns)
+
+        conn.execute(
+            text("INSERT INTO schema_migrations (version) VALUES (:version)"),
+            {"version": MIGRATION},
+        )
+    print(f"✅ {MIGRATION} applied")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Ledger vs wallet reconciliation
+
+Checks that every wallet balance equals CREDIT - DEBIT over the user's
+transactions. Incremental by default: each run folds in only the
+transactions added since the previous run. --full ignores the stored
+high-water marks and refolds the whole ledger (audits).
+
+Exits with status 1 when drift is found, so cron/CI can alert on it.
+
+Usage:
+    python reconcile_ledger.py [--workers 4] [--full] [--batch-size 1000] [--json]
+"""
+
+import argparse
+import json
+import sys
+
+from app.database import init_db
+from app.services.reconciliation_service import ReconciliationService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile wallet balances against the ledger")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Worker processes; users are split into id ranges")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore high-water marks and refold the whole ledger")
+    parser.add_argument("--batch-size", type=int, default=ReconciliationService.BATCH_SIZE,
+                        help="Users read per snapshot")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    init_db()
+    if not args.json:
+        mode = "full rebuild" if args.full else "incremental"
+        print(f"🔎 Reconciling wallets against the ledger ({mode}, {args.workers} workers)...")
+    report = ReconciliationService.run(workers=args.workers, full=args.full, batch_size=args.batch_size)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'❌' if report['drift_count'] else '✅'} Reconciliation complete")
+        print(f"   Users checked:        {report['users_checked']}")
+        print(f"   Ledger rows folded:   {report['transactions_folded']}")
+        print(f"   Users refolded:       {report['users_refolded']}")
+        print(f"   Users with drift:     {report['drift_count']}")
+        print(f"   Throughput:           {report['rows_per_second']} rows/s ({report['elapsed_seconds']}s)")
+        for entry in report["drift"]:
+            print(
+                f"   ⚠️  user {entry['user_id']}: wallet {entry['wallet_balance']}, "
+                f"ledger {entry['ledger_balance']}, drift {entry['drift']} "
+                f"(through transaction {entry['last_transaction_id']})"
+            )
+
+    sys.exit(1 if report["drift_count"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -140,13 +140,58 @@ def test_complete_flow():
     print("\n🔄 Testing Idempotency...")
     response = requests.post(f"{BASE_URL}/api/repayments/make-payment", json=repayment_data, headers=headers)
     print_response("15. Retry Same Payment (Should Return Same Result)", response)
-    
+
+    # 16. Invalid Amount (JSON true is not money)
+    invalid_repayment = {
+        "loan_id": loan_id,
+        "amount": True,
+        "idempotency_key": f"payment-{uuid4()}"
+    }
+
+    response = requests.post(f"{BASE_URL}/api/repayments/make-payment", json=invalid_repayment, headers=headers)
+    print_response("16. Boolean Amount (Should Be 422)", response)
+
+    if response.status_code != 422:
+        print("❌ Boolean amount was not rejected with 422!")
+        return
+
+    # 17. Zero-Rate EMI (repays exactly the principal)
+    zero_rate_loan = {
+        "principal_amount": 10000,
+        "tenure_months": 12,
+        "interest_rate": 0
+    }
+
+    response = requests.post(f"{BASE_URL}/api/loans/calculate-emi", json=zero_rate_loan, headers=headers)
+    print_response("17. Calculate EMI at 0% (No Interest Charged)", response)
+
+    if response.json()["total_interest"] != "0.00" or response.json()["total_amount"] != "10000.00":
+        print("❌ Zero-rate loan was charged interest!")
+        return
+
     print("\n" + "="*60)
     print("✅ Complete API Test Flow Finished!")
     print("="*60)
 
 
+def test_auto_debit_catch_up():
+    """A run the day after an EMI's due date still collects it (no server needed)"""
+    from datetime import date, datetime
+    from app.services.auto_debit_service import AutoDebitService
+
+    created_at = datetime(2026, 1, 15, 10, 30)
+    due_date = AutoDebitService.due_date(created_at, date(2026, 3, 16))
+    assert due_date == date(2026, 3, 15)
+    assert AutoDebitService.idempotency_key(7, due_date) == "autodebit-7-2026-03"
+    # The same month's key on the due date itself: caught up at most once
+    assert AutoDebitService.idempotency_key(7, AutoDebitService.due_date(created_at, date(2026, 3, 15))) == "autodebit-7-2026-03"
+    # Nothing is due in the month the loan was taken
+    assert AutoDebitService.due_date(created_at, date(2026, 2, 14)) is None
+    print("✅ Auto-debit catch-up check passed")
+
+
 if __name__ == "__main__":
+    test_auto_debit_catch_up()
     try:
         # Check if server is running
         response = requests.get(f"{BASE_URL}/health", timeout=2)
@@ -0,0 +1,59 @@
+"""
+Ledger hash-chain verification
+
+Every transaction is hash-chained to the user's previous one. This
+re-hashes each user's chain and checks every link and the chain head
+cached on the wallet, so an edited, inserted or deleted ledger row is
+detected. Incremental by default: each user is verified from their last
+signed seal, and clean chains are re-sealed. --full ignores the seals
+and re-hashes every row (audits).
+
+Exits with status 1 when a broken chain is found, so cron/CI can alert.
+
+Usage:
+    python verify_ledger.py [--workers 4] [--full] [--batch-size 1000] [--json]
+"""
+
+import argparse
+import json
+import sys
+
+from app.database import init_db
+from app.services.ledger_audit_service import LedgerAuditService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify the ledger hash chains")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Worker processes; users are split into id ranges")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore seals and re-hash every ledger row")
+    parser.add_argument("--batch-size", type=int, default=LedgerAuditService.BATCH_SIZE,
+                        help="Users read per snapshot")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    init_db()
+    if not args.json:
+        mode = "full" if args.full else "incremental"
+        print(f"🔐 Verifying ledger hash chains ({mode}, {args.workers} workers)...")
+    report = LedgerAuditService.run(workers=args.workers, full=args.full, batch_size=args.batch_size)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'❌' if report['problem_count'] else '✅'} Verification complete")
+        print(f"   Users checked:        {report['users_checked']}")
+        print(f"   Ledger rows hashed:   {report['rows_verified']}")
+        print(f"   Invalid seals:        {report['users_reverified']}")
+        print(f"   Seals written:        {report['seals_written']}")
+        print(f"   Broken chains:        {report['problem_count']}")
+        print(f"   Throughput:           {report['rows_per_second']} rows/s ({report['elapsed_seconds']}s)")
+        for entry in report["problems"]:
+            print(f"   ⚠️  user {entry['user_id']}: {entry['problem']} at transaction {entry['transaction_id']}")
+
+    sys.exit(1 if report["problem_count"] else 0)
+
+
+if __name__ == "__main__":
+    main()